@@ -52,19 +52,20 @@ graph_runnable = graph.compile()
 
 # 7. Run the Graph
 
-# Create an initial state for the graph to start with.
-initial_state = {
-    "messages": []
-}
+if __name__ == "__main__":
+    # Create an initial state for the graph to start with.
+    initial_state = {
+        "messages": []
+    }
 
-final_state = graph_runnable.invoke(initial_state)
+    final_state = graph_runnable.invoke(initial_state)
 
-print("\n---- Final State ----")
-print(final_state)
+    print("\n---- Final State ----")
+    print(final_state)
 
-# Print out the messages
-string_messages = [message.content for message in final_state['messages']]
-print(f"\n Final list of messages: {string_messages}")
+    # Print out the messages
+    string_messages = [message.content for message in final_state['messages']]
+    print(f"\n Final list of messages: {string_messages}")
 
-# Draw Graph (install grandalf first)
-print(graph_runnable.get_graph().draw_ascii())
\ No newline at end of file
+    # Draw Graph (install grandalf first)
+    print(graph_runnable.get_graph().draw_ascii())
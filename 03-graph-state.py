@@ -46,9 +46,7 @@ def node_b(state):
         "step_count": 1
     }
 
-def build_and_run_graph(state_schema, initial_state):
-    print(f"\n--- Building and Running graph with state schema: {state_schema.__name__ if hasattr(state_schema, '__name__') else 'Dictionary'}")
-
+def build_graph(state_schema):
     # Initiate the Graph
     graph = StateGraph(state_schema)
 
@@ -61,7 +59,13 @@ def build_and_run_graph(state_schema, initial_state):
     graph.add_edge("node_a", "node_b")
     graph.add_edge("node_b", END)
 
-    agent = graph.compile()
+    return graph.compile()
+
+
+def build_and_run_graph(state_schema, initial_state):
+    print(f"\n--- Building and Running graph with state schema: {state_schema.__name__ if hasattr(state_schema, '__name__') else 'Dictionary'}")
+
+    agent = build_graph(state_schema)
 
     final_state = agent.invoke(initial_state)
 
@@ -87,7 +91,8 @@ def create_dict_state():
     }
 
 
-build_and_run_graph(dict, create_dict_state()) 
+if __name__ == "__main__":
+    build_and_run_graph(dict, create_dict_state())
 
 
 """
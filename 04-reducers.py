@@ -4,17 +4,22 @@ from operator import add
 from langchain_core.messages import HumanMessage
 from langgraph.graph.message import add_messages
 
-def run_example(name: str, state_schema: type, node_func: callable, initial_state: dict):
+def build_graph(state_schema: type, node_func: callable):
     """
-    Builds and runs a simple graph with a given state schema, node, and initial state.
+    Builds a single-node graph: START -> update_node -> END.
     """
-    print(f"--- Running Example: {name} ---")
     graph = StateGraph(state_schema)
     graph.add_node("update_node", node_func)
     graph.add_edge(START, "update_node")
     graph.add_edge("update_node", END)
+    return graph.compile()
 
-    app = graph.compile()
+def run_example(name: str, state_schema: type, node_func: callable, initial_state: dict):
+    """
+    Builds and runs a simple graph with a given state schema, node, and initial state.
+    """
+    print(f"--- Running Example: {name} ---")
+    app = build_graph(state_schema, node_func)
 
     final_state = app.invoke(initial_state)
 
@@ -80,9 +85,10 @@ run_example(
 """
 
 # Run Messages example
-run_example(
-    name="`add_messages` Reducer",
-    state_schema=StateWithMessages,
-    node_func=node_messages_reducer,
-    initial_state={"messages": [HumanMessage(content="Initial message.")]}
-)
+if __name__ == "__main__":
+    run_example(
+        name="`add_messages` Reducer",
+        state_schema=StateWithMessages,
+        node_func=node_messages_reducer,
+        initial_state={"messages": [HumanMessage(content="Initial message.")]}
+    )
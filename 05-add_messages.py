@@ -43,26 +43,27 @@ agent = agent_graph.compile()
 ---- Running Conversational Turns ----
 """
 
-# Send your first messsage
-message1 = HumanMessage(content="Hello there! My name is FK")
-
-# Invoke the graph to get the final state (resulting state)
-turn1_state = agent.invoke({
-    "messages": message1
-})
-
-print("--- Graph State after first turn ---")
-print(turn1_state)
-print("-"* 30)
-
-# Send your second messsage
-message2 = HumanMessage(content="What is your favorite color?")
-
-# Invoke the graph with the current conversation history + the new message
-turn2_state = agent.invoke({
-    "messages": turn1_state["messages"] + [message2]
-})
-
-print("--- Graph State after second turn ---")
-print(turn2_state)
-print("-"* 30)
\ No newline at end of file
+if __name__ == "__main__":
+    # Send your first messsage
+    message1 = HumanMessage(content="Hello there! My name is FK")
+
+    # Invoke the graph to get the final state (resulting state)
+    turn1_state = agent.invoke({
+        "messages": message1
+    })
+
+    print("--- Graph State after first turn ---")
+    print(turn1_state)
+    print("-"* 30)
+
+    # Send your second messsage
+    message2 = HumanMessage(content="What is your favorite color?")
+
+    # Invoke the graph with the current conversation history + the new message
+    turn2_state = agent.invoke({
+        "messages": turn1_state["messages"] + [message2]
+    })
+
+    print("--- Graph State after second turn ---")
+    print(turn2_state)
+    print("-"* 30)
@@ -57,11 +57,12 @@ graph.add_edge("increment_counter", END)
 
 agent = graph.compile()
 
-# Invoke the graph with an initial state.
-initial_state = {"turn_count": 0}
-    
-final_state = agent.invoke(initial_state)
+if __name__ == "__main__":
+    # Invoke the graph with an initial state.
+    initial_state = {"turn_count": 0}
+
+    final_state = agent.invoke(initial_state)
 
-print("\n--- Final State of the Graph ---")
-print(final_state)
-print("\n")
\ No newline at end of file
+    print("\n--- Final State of the Graph ---")
+    print(final_state)
+    print("\n")
@@ -81,16 +81,17 @@ builder.add_edge("node_d", END)
 
 graph = builder.compile()
 
-# First invocation: The input does NOT contain 'go_to_c', so the path is A -> B -> D.
-initial_state_1 = {"input": "Hello, this is a message."}
-final_state_1 = graph.invoke(initial_state_1)
-print("\nFinal State (Path A->B->D):", final_state_1)
+if __name__ == "__main__":
+    # First invocation: The input does NOT contain 'go_to_c', so the path is A -> B -> D.
+    initial_state_1 = {"input": "Hello, this is a message."}
+    final_state_1 = graph.invoke(initial_state_1)
+    print("\nFinal State (Path A->B->D):", final_state_1)
 
-print("\n" + "="*50 + "\n")
+    print("\n" + "="*50 + "\n")
 
-print("--- Example 2: Path is A -> B -> C ---")
+    print("--- Example 2: Path is A -> B -> C ---")
 
-# Second invocation: The input DOES contain 'go_to_c', so the path is A ->B -> C.
-initial_state_2 = {"input": "Hello, go_to_c to continue."}
-final_state_2 = graph.invoke(initial_state_2)
-print("\nFinal State (Path A->B->C):", final_state_2)
\ No newline at end of file
+    # Second invocation: The input DOES contain 'go_to_c', so the path is A ->B -> C.
+    initial_state_2 = {"input": "Hello, go_to_c to continue."}
+    final_state_2 = graph.invoke(initial_state_2)
+    print("\nFinal State (Path A->B->C):", final_state_2)
@@ -51,32 +51,33 @@ graph = builder.compile()
 
 # 5. Run Graph
 
-initial_state = {"input": "Start Process"}
-
-# Example 1
-print("="* 50)
-print("Running Example 1: Using Context Defaults (DB connection is default)")
-print("="* 50)
-
-final_state_1 = graph.invoke(
-    input=initial_state,
-    context= {"user_agent": "Default-Run"}
-)
-
-print(f"\nFinal State 1: {final_state_1}")
-
-# Example 2
-print("\n\n" + "=" * 50)
-print("Running Example 2: Overriding Context (DB connection is new)")
-print("=" * 50)
-
-final_state_2 = graph.invoke(
-    input=initial_state,
-    context={
-        "user_agent": "Override-Run",
-        # Override the defautl db connection for this run
-        "db_connection": "postgres://new_user@remote_host:5432/production"
-    }
-)
-
-print(f"\nFinal State 2: {final_state_2}")
+if __name__ == "__main__":
+    initial_state = {"input": "Start Process"}
+
+    # Example 1
+    print("="* 50)
+    print("Running Example 1: Using Context Defaults (DB connection is default)")
+    print("="* 50)
+
+    final_state_1 = graph.invoke(
+        input=initial_state,
+        context= {"user_agent": "Default-Run"}
+    )
+
+    print(f"\nFinal State 1: {final_state_1}")
+
+    # Example 2
+    print("\n\n" + "=" * 50)
+    print("Running Example 2: Overriding Context (DB connection is new)")
+    print("=" * 50)
+
+    final_state_2 = graph.invoke(
+        input=initial_state,
+        context={
+            "user_agent": "Override-Run",
+            # Override the defautl db connection for this run
+            "db_connection": "postgres://new_user@remote_host:5432/production"
+        }
+    )
+
+    print(f"\nFinal State 2: {final_state_2}")
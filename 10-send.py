@@ -89,11 +89,12 @@ graph = builder.compile()
 
 """Run the Graph"""
 
-result = graph.invoke({
-    "topic": "Artificial Intelligence",
-    "subtopics": [],
-    "research_results": [],
-    "final_report": ""
-})
-
-print(result['final_report'])
+if __name__ == "__main__":
+    result = graph.invoke({
+        "topic": "Artificial Intelligence",
+        "subtopics": [],
+        "research_results": [],
+        "final_report": ""
+    })
+
+    print(result['final_report'])
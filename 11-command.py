@@ -73,25 +73,26 @@ graph = builder.compile()
 
 """Testing the Graph"""
 
-# Test 1: High Temperature
+if __name__ == "__main__":
+    # Test 1: High Temperature
 
-high_temp_initial_state = {
-    "temperature": 100
-}
+    high_temp_initial_state = {
+        "temperature": 100
+    }
 
-final_state_1 = graph.invoke(high_temp_initial_state)
+    final_state_1 = graph.invoke(high_temp_initial_state)
 
-print("High Temperature Final State:")
-print(final_state_1)
-print("="* 50)
-print()
+    print("High Temperature Final State:")
+    print(final_state_1)
+    print("="* 50)
+    print()
 
-# Test 2: Low Temperature
-low_temp_initial_state = {
-    "temperature": 40
-}
+    # Test 2: Low Temperature
+    low_temp_initial_state = {
+        "temperature": 40
+    }
 
-final_state_2 = graph.invoke(low_temp_initial_state)
+    final_state_2 = graph.invoke(low_temp_initial_state)
 
-print("Low Temperature Final State:")
-print(final_state_2)
\ No newline at end of file
+    print("Low Temperature Final State:")
+    print(final_state_2)
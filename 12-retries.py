@@ -78,15 +78,16 @@ builder.add_edge("format_result", END)
 graph = builder.compile()
 
 """Test out the Graph"""
-# Use try...except just in case all attempts failed
-try:
-    result = graph.invoke({
-        "city": "San Francisco",
-        "temperature": 0.0,
-        "conditions": ""
-    })
-
-    print(f"\n✨ Final Result: {result}")
-
-except Exception as e:
-    print(f"\n💥 All retry attempts exhausted: {e}")
\ No newline at end of file
+if __name__ == "__main__":
+    # Use try...except just in case all attempts failed
+    try:
+        result = graph.invoke({
+            "city": "San Francisco",
+            "temperature": 0.0,
+            "conditions": ""
+        })
+
+        print(f"\n✨ Final Result: {result}")
+
+    except Exception as e:
+        print(f"\n💥 All retry attempts exhausted: {e}")
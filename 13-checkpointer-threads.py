@@ -0,0 +1,193 @@
+"""
+Conversation threads backed by a checkpointer.
+
+In 05-add_messages.py the second turn is sent as
+    agent.invoke({"messages": turn1_state["messages"] + [message2]})
+so the caller rebuilds and resends the whole history on every turn.
+
+Compiling the graph with a checkpointer lets LangGraph keep the history for us.
+Each turn only passes the NEW HumanMessage plus a `thread_id`, and the
+`add_messages` reducer merges it against the state stored for that thread.
+
+Two checkpointers are shown:
+    - InMemorySaver: lives as long as the Python process
+    - SqliteSaver:   a local SQLite file that survives restarts
+                     (pip install langgraph-checkpoint-sqlite)
+
+The caller now sends a constant-size input, but the stock checkpointers still
+load, deserialize and re-save the whole message list on every turn (and
+InMemorySaver keeps a full copy of it for every turn). Over a long thread that
+costs more than resending the history: per-turn latency keeps growing and ends
+above the stateless baseline.
+
+`build_agent(checkpointer, history_window=N)` bounds the thread instead: the
+model sees the last N messages, and older ones are removed from the stored
+state with RemoveMessage. What is loaded, saved and sent per turn then stays
+the same size, and so does the per-turn latency. (For a summary of the removed
+messages instead of dropping them, see 15-history-windowing.py.)
+"""
+import itertools
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import TypedDict, List, Annotated
+
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+
+# Setup Model
+# A fake model keeps this example (and its benchmark) offline.
+# Swap in ChatOpenAI(model="gpt-4o") from 05-add_messages.py for real responses.
+llm = GenericFakeChatModel(messages=itertools.cycle(["Nice to meet you!", "I like blue."]))
+
+# Number of turns used by the benchmark at the bottom of this file
+NUM_TURNS = 1000
+# Messages kept per thread by the windowed agent in the benchmark
+HISTORY_WINDOW = 20
+
+
+# --- 1. Define State ---
+# Exactly the same state as 05-add_messages.py
+class AgentState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+
+
+# --- 2. Define the LLM node ---
+def chat_node(state: AgentState) -> dict:
+    """A node that invokes the llm to get a response"""
+    response = llm.invoke(state["messages"])
+    return {"messages": response}
+
+
+def windowed_chat_node(history_window: int):
+    """chat_node on the last `history_window` messages; older ones are removed from state"""
+    def node(state: AgentState) -> dict:
+        messages = state["messages"]
+        response = llm.invoke(messages[-history_window:])
+        # Leave room for the response
+        stale = messages[:max(0, len(messages) + 1 - history_window)]
+        return {"messages": [RemoveMessage(id=m.id) for m in stale] + [response]}
+    return node
+
+
+# --- 3. Build the Graph ---
+def build_agent(checkpointer=None, history_window: int = None):
+    """
+    Builds the chat agent.
+
+    Without a checkpointer the graph is stateless and the caller must send
+    the full history. With one, the history is stored per `thread_id`.
+    With a `history_window`, at most that many messages are kept.
+    """
+    agent_graph = StateGraph(AgentState)
+
+    node = chat_node if history_window is None else windowed_chat_node(history_window)
+    agent_graph.add_node("chat_node", node)
+
+    agent_graph.add_edge(START, "chat_node")
+    agent_graph.add_edge("chat_node", END)
+
+    return agent_graph.compile(checkpointer=checkpointer)
+
+
+def sqlite_checkpointer(db_path: str) -> SqliteSaver:
+    """Creates a SqliteSaver backed by a local file"""
+    # LangGraph may run nodes on worker threads, so the connection must be shareable
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    return SqliteSaver(conn)
+
+
+def send_turn(agent, thread_id: str, text: str) -> dict:
+    """Send a single new message on a thread - no history is passed in"""
+    config = {"configurable": {"thread_id": thread_id}}
+    return agent.invoke({"messages": [HumanMessage(content=text)]}, config)
+
+
+# --- 4. Benchmark ---
+def run_stateless_turns(agent, num_turns: int) -> list[float]:
+    """The 05-add_messages.py approach: resend the whole history every turn"""
+    history = []
+    latencies = []
+    for i in range(num_turns):
+        start = time.perf_counter()
+        state = agent.invoke({"messages": history + [HumanMessage(content=f"Message {i}")]})
+        latencies.append(time.perf_counter() - start)
+        history = state["messages"]
+    return latencies
+
+
+def run_threaded_turns(agent, num_turns: int, thread_id: str) -> list[float]:
+    """The threaded approach: only the new message and a thread_id are sent"""
+    latencies = []
+    for i in range(num_turns):
+        start = time.perf_counter()
+        send_turn(agent, thread_id, f"Message {i}")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(name: str, latencies: list[float], buckets: int = 10):
+    """Print the mean per-turn latency for each slice of the conversation"""
+    size = max(1, len(latencies) // buckets)
+    print(f"\n{name}")
+    print(f"{'turns':>13} | {'mean ms/turn':>12}")
+    for start in range(0, len(latencies), size):
+        chunk = latencies[start:start + size]
+        print(f"{start + 1:>5}-{start + len(chunk):<7} | {1000 * sum(chunk) / len(chunk):>12.3f}")
+
+    first = sum(latencies[:size]) / size
+    last = sum(latencies[-size:]) / size
+    print(f"last/first slice ratio: {last / first:.2f}x")
+
+
+if __name__ == "__main__":
+    """
+    ---- Running Conversational Turns on a thread ----
+    """
+    agent = build_agent(checkpointer=InMemorySaver())
+
+    turn1_state = send_turn(agent, "thread-fk", "Hello there! My name is FK")
+    print("--- Graph State after first turn ---")
+    print(turn1_state)
+    print("-" * 30)
+
+    # Only the new message is sent, the checkpointer supplies the history
+    turn2_state = send_turn(agent, "thread-fk", "What is your favorite color?")
+    print("--- Graph State after second turn ---")
+    print(turn2_state)
+    print("-" * 30)
+
+    """
+    ---- Benchmark: per-turn latency over a long conversation ----
+    """
+    print(f"\n--- Benchmark: {NUM_TURNS} turns ---")
+
+    report("Stateless (resend full history)", run_stateless_turns(build_agent(), NUM_TURNS))
+    report(
+        "Threaded (InMemorySaver)",
+        run_threaded_turns(build_agent(InMemorySaver()), NUM_TURNS, "bench-memory"),
+    )
+    windowed = build_agent(InMemorySaver(), history_window=HISTORY_WINDOW)
+    report(
+        f"Threaded, last {HISTORY_WINDOW} messages (InMemorySaver)",
+        run_threaded_turns(windowed, NUM_TURNS, "bench-memory-windowed"),
+    )
+    stored = windowed.get_state({"configurable": {"thread_id": "bench-memory-windowed"}}).values["messages"]
+    assert len(stored) == HISTORY_WINDOW and stored[-2].content == f"Message {NUM_TURNS - 1}"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        saver = sqlite_checkpointer(str(Path(tmp_dir) / "threads.sqlite"))
+        report(
+            "Threaded (SqliteSaver)",
+            run_threaded_turns(build_agent(saver), NUM_TURNS, "bench-sqlite"),
+        )
+        report(
+            f"Threaded, last {HISTORY_WINDOW} messages (SqliteSaver)",
+            run_threaded_turns(build_agent(saver, history_window=HISTORY_WINDOW), NUM_TURNS, "bench-sqlite-windowed"),
+        )
+        saver.conn.close()
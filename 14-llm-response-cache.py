@@ -0,0 +1,297 @@
+"""
+Exact-match response cache in front of the LLM call.
+
+`chat_node` in 05-add_messages.py calls `llm.invoke(conversation_history)` on
+every run, even when the exact same history has been answered before
+(regression replays, retried requests...).
+
+Here the node first looks the history up in a response cache:
+    - the key is a stable hash of the messages + the model parameters
+    - the in-memory backend is a bounded LRU with an optional TTL
+    - the SQLite backend stores entries on disk so they survive restarts
+    - both keep hit/miss counters
+
+A counting fake model is used so we can see that cache hits never reach the model.
+"""
+import hashlib
+import itertools
+import json
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TypedDict, List, Annotated, Optional
+
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+
+# Share of the SQLite cache's max_size evicted at once when it is full
+EVICT_FRACTION = 0.1
+
+# --- 1. A fake model that counts how often it is really called ---
+class CountingFakeChatModel(GenericFakeChatModel):
+    """GenericFakeChatModel that records the number of model calls"""
+    calls: int = 0
+
+    def _generate(self, *args, **kwargs):
+        self.calls += 1
+        return super()._generate(*args, **kwargs)
+
+
+# --- 2. Cache key ---
+def cache_key(messages: List[BaseMessage], model_params: dict) -> str:
+    """
+    Stable hash of a message list plus the model parameters.
+
+    Message ids are left out on purpose: add_messages gives every message a
+    fresh uuid, so two replays of the same conversation would never match.
+    """
+    payload = {
+        "model": model_params,
+        "messages": [
+            {
+                "type": m.type,
+                "content": m.content,
+                "name": m.name,
+                "tool_calls": getattr(m, "tool_calls", None),
+                "tool_call_id": getattr(m, "tool_call_id", None),
+            }
+            for m in messages
+        ],
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def model_params_of(llm) -> dict:
+    """The parameters that change a model's answer (model name, temperature...)"""
+    return {"llm_type": llm._llm_type, **llm._identifying_params}
+
+
+# --- 3. Cache backends ---
+class InMemoryResponseCache:
+    """Bounded LRU cache with an optional time-to-live (in seconds)"""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, BaseMessage]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+            # Expired - drop it and treat it as a miss
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, response: BaseMessage):
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            # Evict the least recently used entry
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class SqliteResponseCache:
+    """
+    On-disk cache that survives restarts.
+
+    Wall-clock time is used for the TTL because monotonic clocks reset between processes.
+    LRU order is kept with a `last_used` column. Eviction runs in batches: once
+    there are more than `max_size` rows, the least recently used ones are
+    deleted down to (1 - EVICT_FRACTION) * max_size, so most puts don't evict.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 10_000, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                response TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used)")
+        self.conn.commit()
+        # Row count, kept up to date by this object (and recounted before evicting)
+        self._size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[BaseMessage]:
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT created, response FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None and self.ttl is not None and now - row[0] > self.ttl:
+            self._size -= self.conn.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount
+            self.conn.commit()
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        return messages_from_dict([json.loads(row[1])])[0]
+
+    def put(self, key: str, response: BaseMessage):
+        now = time.time()
+        is_new = self.conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, created, last_used, response) VALUES (?, ?, ?, ?)",
+            (key, now, now, json.dumps(message_to_dict(response))),
+        )
+        self._size += is_new
+        if self._size > self.max_size:
+            self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        """Deletes the least recently used rows, down to (1 - EVICT_FRACTION) * max_size"""
+        # Other processes may share the file
+        self._size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if self._size <= self.max_size:
+            return
+        keep = max(1, int(self.max_size * (1 - EVICT_FRACTION)))
+        self._size -= self.conn.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+            (self._size - keep,),
+        ).rowcount
+
+    def stats(self) -> dict:
+        size = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+    def close(self):
+        self.conn.close()
+
+
+def cached_invoke(llm, messages: List[BaseMessage], cache) -> BaseMessage:
+    """Invoke the llm only if this exact history has not been answered before"""
+    key = cache_key(messages, model_params_of(llm))
+    response = cache.get(key)
+    if response is None:
+        response = llm.invoke(messages)
+        cache.put(key, response)
+        return response
+
+    # Hand out a copy without the id, add_messages gives it a fresh one
+    return response.model_copy(update={"id": None})
+
+
+# --- 4. Define State (same as 05-add_messages.py) ---
+class AgentState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+
+
+# --- 5. Build the Graph ---
+def build_agent(llm, cache):
+    """Builds the chat agent with a cache in front of the model call"""
+
+    def chat_node(state: AgentState) -> dict:
+        """A node that invokes the llm (or the cache) to get a response"""
+        response = cached_invoke(llm, state["messages"], cache)
+        return {"messages": response}
+
+    agent_graph = StateGraph(AgentState)
+    agent_graph.add_node("chat_node", chat_node)
+    agent_graph.add_edge(START, "chat_node")
+    agent_graph.add_edge("chat_node", END)
+    return agent_graph.compile()
+
+
+def new_fake_llm() -> CountingFakeChatModel:
+    return CountingFakeChatModel(messages=itertools.cycle(["Hello FK!", "Blue, obviously."]))
+
+
+if __name__ == "__main__":
+    conversation = [HumanMessage(content="Hello there! My name is FK")]
+
+    """
+    ---- In-memory LRU cache ----
+    """
+    print("--- In-memory LRU cache ---")
+    llm = new_fake_llm()
+    memory_cache = InMemoryResponseCache(max_size=2, ttl=60)
+    agent = build_agent(llm, memory_cache)
+
+    # The first run misses and calls the model, the replays are served by the cache
+    for replay in range(3):
+        state = agent.invoke({"messages": conversation})
+        print(f"Replay {replay + 1}: {state['messages'][-1].content!r} | model calls: {llm.calls}")
+    assert llm.calls == 1
+    print(f"Stats: {memory_cache.stats()}")
+
+    # Fill the cache past max_size - the original conversation gets evicted
+    agent.invoke({"messages": [HumanMessage(content="What is your favorite color?")]})
+    agent.invoke({"messages": [HumanMessage(content="And your favorite food?")]})
+    agent.invoke({"messages": conversation})
+    print(f"After eviction the original history calls the model again | model calls: {llm.calls}")
+    assert llm.calls == 4
+
+    # A short TTL expires entries
+    ttl_cache = InMemoryResponseCache(ttl=0.05)
+    ttl_agent = build_agent(llm, ttl_cache)
+    ttl_agent.invoke({"messages": conversation})
+    time.sleep(0.1)
+    ttl_agent.invoke({"messages": conversation})
+    print(f"TTL cache stats after expiry: {ttl_cache.stats()}")
+    assert ttl_cache.hits == 0
+
+    """
+    ---- SQLite cache that survives a restart ----
+    """
+    print("\n--- SQLite cache ---")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = str(Path(tmp_dir) / "responses.sqlite")
+
+        first_llm = new_fake_llm()
+        first_cache = SqliteResponseCache(db_path)
+        build_agent(first_llm, first_cache).invoke({"messages": conversation})
+        first_cache.close()
+
+        # "Restart": a fresh model and a fresh cache object over the same file
+        second_llm = new_fake_llm()
+        second_cache = SqliteResponseCache(db_path)
+        state = build_agent(second_llm, second_cache).invoke({"messages": conversation})
+        print(f"After restart: {state['messages'][-1].content!r} | model calls: {second_llm.calls}")
+        print(f"Stats: {second_cache.stats()}")
+        assert second_llm.calls == 0
+        second_cache.close()
+
+        # Past max_size, the least recently used rows go in one batch
+        small_cache = SqliteResponseCache(str(Path(tmp_dir) / "small.sqlite"), max_size=10)
+        for i in range(25):
+            small_cache.put(f"key {i}", HumanMessage(content=str(i)))
+        assert small_cache.stats()["size"] <= 10 and small_cache.get("key 24") is not None
+        assert small_cache.get("key 0") is None
+        small_cache.close()
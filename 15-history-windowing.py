@@ -0,0 +1,222 @@
+"""
+Keeping the prompt inside a token budget with a sliding window + rolling summary.
+
+`AgentState.messages` (05-add_messages.py) and `MyGraphState` (06-graph-messages.py)
+grow without limit, so every `chat_node` call ships the entire history.
+
+Here a pre-model node, `manage_history`, runs before the model:
+    - while the history (plus the summary) fits in MAX_PROMPT_TOKENS nothing happens
+    - once it goes over, the most recent KEEP_TOKENS worth of turns are kept and
+      everything older is folded into a running summary stored in state
+      (the latest human turn is always kept, even when it alone is over KEEP_TOKENS)
+    - the folded messages are deleted from state with RemoveMessage
+
+KEEP_TOKENS is lower than MAX_PROMPT_TOKENS so we only summarise every few turns.
+"""
+import itertools
+import time
+from typing import TypedDict, List, Annotated
+
+from langgraph.graph import StateGraph, START, END, MessagesState
+from langgraph.graph.message import add_messages
+from langgraph.checkpoint.memory import InMemorySaver
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+
+# Setup Models
+# Fake models keep this example offline. Swap in ChatOpenAI(model="gpt-4o") for real use,
+# a smaller/cheaper model is usually fine for the summariser.
+llm = GenericFakeChatModel(messages=itertools.cycle(["Sure, tell me more about that."]))
+summarizer_llm = GenericFakeChatModel(
+    messages=itertools.cycle(["FK introduced themselves and we have been chatting about their day."])
+)
+
+# Token budget for everything sent to the model
+MAX_PROMPT_TOKENS = 1000
+# How much recent history to keep verbatim once the budget is exceeded
+KEEP_TOKENS = 500
+
+# Number of turns used by the benchmark
+NUM_TURNS = 1000
+
+
+# --- 1. Define State ---
+# Same as 05-add_messages.py, plus the running summary
+class AgentState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+    summary: str
+
+
+# Same as 06-graph-messages.py, plus the running summary
+class MyGraphState(MessagesState):
+    turn_count: int
+    summary: str
+
+
+# --- 2. The pre-model stage ---
+def summary_message(summary: str) -> List[BaseMessage]:
+    """The summary is prepended to the prompt as a system message"""
+    if not summary:
+        return []
+    return [SystemMessage(content=f"Summary of the conversation so far: {summary}")]
+
+
+def summarize(summary: str, folded: List[BaseMessage]) -> str:
+    """Folds older messages into the running summary"""
+    instruction = (
+        f"This is the summary of the conversation so far: {summary}\n"
+        "Extend the summary with the new messages above. Keep it short."
+        if summary
+        else "Summarise the conversation above. Keep it short."
+    )
+    response = summarizer_llm.invoke(folded + [HumanMessage(content=instruction)])
+    return response.content
+
+
+def manage_history(state) -> dict:
+    """
+    Keeps messages + summary inside MAX_PROMPT_TOKENS.
+
+    Works with any state that has `messages` (with add_messages) and `summary` keys.
+    """
+    messages = state["messages"]
+    summary = state.get("summary", "")
+
+    if count_tokens_approximately(summary_message(summary) + messages) <= MAX_PROMPT_TOKENS:
+        return {}
+
+    # The newest KEEP_TOKENS worth of messages, starting on a human turn
+    kept = trim_messages(
+        messages,
+        max_tokens=KEEP_TOKENS,
+        token_counter=count_tokens_approximately,
+        strategy="last",
+        start_on="human",
+    )
+    if not kept:
+        # The newest turn alone is over KEEP_TOKENS: keep it whole rather than fold it away
+        human_turns = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        kept = messages[human_turns[-1] if human_turns else -1:]
+    folded = messages[:len(messages) - len(kept)]
+    if not folded:
+        return {}
+
+    return {
+        "summary": summarize(summary, folded),
+        "messages": [RemoveMessage(id=m.id) for m in folded],
+    }
+
+
+# --- 3. Chat agent (05-add_messages.py) with the pre-model stage ---
+# Records the prompt size of every model call for the benchmark
+prompt_token_log: List[int] = []
+
+
+def chat_node(state: AgentState) -> dict:
+    """A node that invokes the llm with the summary + the recent window"""
+    prompt = summary_message(state.get("summary", "")) + state["messages"]
+    prompt_token_log.append(count_tokens_approximately(prompt))
+
+    response = llm.invoke(prompt)
+    return {"messages": response}
+
+
+def build_agent(windowed: bool = True):
+    """Builds the chat agent, optionally with the manage_history stage in front"""
+    agent_graph = StateGraph(AgentState)
+    agent_graph.add_node("chat_node", chat_node)
+
+    if windowed:
+        agent_graph.add_node("manage_history", manage_history)
+        agent_graph.add_edge(START, "manage_history")
+        agent_graph.add_edge("manage_history", "chat_node")
+    else:
+        agent_graph.add_edge(START, "chat_node")
+
+    agent_graph.add_edge("chat_node", END)
+    return agent_graph.compile(checkpointer=InMemorySaver())
+
+
+# --- 4. MessagesState graph (06-graph-messages.py) with the pre-model stage ---
+def user_node(state: MyGraphState) -> dict:
+    return {"messages": HumanMessage(content="What's the weather like today? " * 5)}
+
+
+def ai_node(state: MyGraphState) -> dict:
+    last_human_message = state["messages"][-1]
+    return {"messages": AIMessage(content=f"I've received your query: '{last_human_message.content}'.")}
+
+
+def counter_node(state: MyGraphState) -> dict:
+    return {"turn_count": state.get("turn_count", 0) + 1}
+
+
+def build_messages_graph():
+    graph = StateGraph(MyGraphState)
+
+    graph.add_node("user_input", user_node)
+    graph.add_node("manage_history", manage_history)
+    graph.add_node("ai_response", ai_node)
+    graph.add_node("increment_counter", counter_node)
+
+    # START -> user -> manage_history -> ai -> counter -> END
+    graph.add_edge(START, "user_input")
+    graph.add_edge("user_input", "manage_history")
+    graph.add_edge("manage_history", "ai_response")
+    graph.add_edge("ai_response", "increment_counter")
+    graph.add_edge("increment_counter", END)
+
+    return graph.compile(checkpointer=InMemorySaver())
+
+
+# --- 5. Benchmark ---
+def run_long_thread(agent, num_turns: int, buckets: int = 10):
+    """Runs a long thread and prints prompt size and per-turn time per slice"""
+    prompt_token_log.clear()
+    config = {"configurable": {"thread_id": "long-thread"}}
+    latencies = []
+
+    for i in range(num_turns):
+        start = time.perf_counter()
+        agent.invoke({"messages": [HumanMessage(content=f"Here is message number {i} about my day.")]}, config)
+        latencies.append(time.perf_counter() - start)
+
+    size = max(1, num_turns // buckets)
+    print(f"{'turns':>13} | {'max prompt tokens':>17} | {'mean ms/turn':>12}")
+    for start in range(0, num_turns, size):
+        tokens = prompt_token_log[start:start + size]
+        chunk = latencies[start:start + size]
+        print(f"{start + 1:>5}-{start + len(chunk):<7} | {max(tokens):>17} | {1000 * sum(chunk) / len(chunk):>12.3f}")
+
+    final_state = agent.get_state(config).values
+    print(f"Messages held in state at the end: {len(final_state['messages'])}")
+
+
+if __name__ == "__main__":
+    print("--- MessagesState graph with a token budget ---")
+    messages_graph = build_messages_graph()
+    config = {"configurable": {"thread_id": "weather-thread"}}
+    for _ in range(50):
+        final_state = messages_graph.invoke({}, config)
+    print(f"Turns: {final_state['turn_count']} | messages in state: {len(final_state['messages'])}")
+    print(f"Summary: {final_state['summary']}")
+
+    # A single message over KEEP_TOKENS is kept, not folded into the summary
+    long_question = HumanMessage(content="Please read this carefully. " * 500, id="long-question")
+    update = manage_history({"messages": final_state["messages"] + [long_question],
+                             "summary": final_state["summary"]})
+    assert "long-question" not in {m.id for m in update["messages"]}
+    assert manage_history({"messages": [long_question], "summary": ""}) == {}
+
+    print(f"\n--- Benchmark: {NUM_TURNS} turns, unbounded history ---")
+    run_long_thread(build_agent(windowed=False), NUM_TURNS)
+
+    print(f"\n--- Benchmark: {NUM_TURNS} turns, budget of {MAX_PROMPT_TOKENS} tokens ---")
+    run_long_thread(build_agent(windowed=True), NUM_TURNS)
@@ -0,0 +1,161 @@
+"""
+Streaming tokens out of the chat graph with time-to-first-token metrics.
+
+Both invocations in 05-add_messages.py use the blocking `agent.invoke`, so the
+user waits for the full completion.
+
+`agent.stream(..., stream_mode="messages")` instead yields (message_chunk, metadata)
+pairs as the LLM produces tokens - even though `chat_node` still calls `llm.invoke`.
+The metadata tells us which node the tokens came from, so we only forward the
+chunks produced by `chat_node`.
+
+For every run we record:
+    - time to first token (TTFT)
+    - tokens per second (counted as streamed chunks, one chunk ~ one token)
+"""
+import itertools
+import re
+import time
+from dataclasses import dataclass, field
+from typing import TypedDict, List, Annotated, Iterator, Optional
+
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+# --- 1. A local fake streaming model ---
+class SlowFakeChatModel(BaseChatModel):
+    """
+    Replies with the next string from `messages`, one word per chunk (with the
+    whitespace before it, so every chunk counts as one token).
+
+    It waits `first_token_delay` before the first chunk and `token_delay`
+    between chunks, like a real model would.
+    """
+    messages: Iterator[str]
+    first_token_delay: float = 0.2
+    token_delay: float = 0.02
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake-chat-model"
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = re.findall(r"\s*\S+", next(self.messages))
+
+        time.sleep(self.first_token_delay)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        # A blocking call waits for every chunk before returning anything
+        text = "".join(chunk.text for chunk in self._stream(messages, stop=stop, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+# Setup Model
+# Swap in ChatOpenAI(model="gpt-4o") - it streams the same way.
+llm = SlowFakeChatModel(
+    messages=itertools.cycle([
+        "Hello FK! It is nice to meet you. How can I help you today?",
+        "I don't have a favorite color, but many people love blue because it is calm.",
+    ])
+)
+
+
+# --- 2. Define State and the LLM node (same as 05-add_messages.py) ---
+class AgentState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+
+
+def chat_node(state: AgentState) -> dict:
+    """A node that invokes the llm to get a response"""
+    response = llm.invoke(state["messages"])
+    return {"messages": response}
+
+
+agent_graph = StateGraph(AgentState)
+agent_graph.add_node("chat_node", chat_node)
+agent_graph.add_edge(START, "chat_node")
+agent_graph.add_edge("chat_node", END)
+
+agent = agent_graph.compile()
+
+
+# --- 3. The streaming entry point ---
+@dataclass
+class StreamMetrics:
+    """Timing information for one streamed run"""
+    started: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    tokens: int = 0
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        # Generation speed, measured from the first token to the last one
+        if self.first_token_at is None or self.finished_at is None or self.tokens < 2:
+            return None
+        return (self.tokens - 1) / (self.finished_at - self.first_token_at)
+
+
+def stream_chat(agent, inputs: dict, metrics: StreamMetrics, config: Optional[dict] = None,
+                node: str = "chat_node") -> Iterator[str]:
+    """
+    Yields the text of every token chunk produced by `node` as it arrives.
+
+    `metrics` is filled in while the generator is consumed; anything it held
+    from an earlier run is reset.
+    """
+    metrics.started = time.perf_counter()
+    metrics.first_token_at = metrics.finished_at = None
+    metrics.tokens = 0
+    for chunk, metadata in agent.stream(inputs, config, stream_mode="messages"):
+        if metadata.get("langgraph_node") != node or not chunk.content:
+            continue
+
+        now = time.perf_counter()
+        if metrics.first_token_at is None:
+            metrics.first_token_at = now
+        metrics.finished_at = now
+        metrics.tokens += 1
+        yield chunk.content
+
+
+if __name__ == "__main__":
+    """
+    ---- Blocking invoke vs streaming ----
+    """
+    message = HumanMessage(content="Hello there! My name is FK")
+
+    start = time.perf_counter()
+    state = agent.invoke({"messages": message})
+    print(f"invoke: first text visible after {time.perf_counter() - start:.3f}s")
+    print(state["messages"][-1].content)
+
+    print("\nstream:")
+    metrics = StreamMetrics()
+    for text in stream_chat(agent, {"messages": message}, metrics):
+        print(text, end="", flush=True)
+    print()
+    print(f"time to first token: {metrics.time_to_first_token:.3f}s")
+    print(f"tokens: {metrics.tokens} | tokens/sec: {metrics.tokens_per_second:.1f}")
+
+    # Reusing the metrics for the next turn measures that turn only
+    reply = "".join(stream_chat(agent, {"messages": message}, metrics))
+    assert metrics.tokens == len(reply.split())
+    assert metrics.time_to_first_token >= llm.first_token_delay
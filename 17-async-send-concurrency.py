@@ -0,0 +1,170 @@
+"""
+Bounded-concurrency async fan-out for Send workers.
+
+`continue_to_research` in 10-send.py emits one Send per subtopic and every
+worker starts at once. With thousands of subtopics hitting a rate-limited
+backend that is not what we want.
+
+Here:
+    - `research_subtopic` is async, so waiting on I/O does not block a thread
+    - the graph is run with `ainvoke` / `astream`
+    - `max_concurrency` in the config caps how many workers run at the same time.
+      LangGraph keeps the remaining Send tasks queued and starts a new one
+      each time a running worker finishes.
+"""
+import asyncio
+import time
+import tracemalloc
+from typing import TypedDict, Annotated, List
+from operator import add
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+
+# Simulated latency of one call to the research backend (seconds)
+IO_LATENCY = 0.05
+# Maximum number of workers allowed to run at the same time
+MAX_CONCURRENCY = 100
+
+
+# 1. Create the main State for the Graph (same as 10-send.py + the number of subtopics to generate)
+class OverallState(TypedDict):
+    topic: str
+    num_subtopics: int
+    subtopics: List[str]
+    research_results: Annotated[List[str], add]
+    final_report: str
+
+
+# 2. Private state for the mapped nodes
+class ResearchState(TypedDict):
+    subtopic: str
+
+
+# Tracks how many workers are running so we can check the cap is respected
+class InFlight:
+    current = 0
+    peak = 0
+
+
+# 3. Create the node that generates the subtopics to research
+def generate_subtopics(state: OverallState):
+    """Generate subtopics to research"""
+    topic = state["topic"]
+    subtopics = [f"{topic} - Subtopic {i}" for i in range(state["num_subtopics"])]
+    return {"subtopics": subtopics}
+
+
+# 4. The async worker node
+async def research_subtopic(state: ResearchState):
+    """Research a single subtopic - awaits the (simulated) backend without blocking"""
+    subtopic = state["subtopic"]
+
+    InFlight.current += 1
+    InFlight.peak = max(InFlight.peak, InFlight.current)
+    try:
+        # Simulate the call to the rate-limited research backend
+        await asyncio.sleep(IO_LATENCY)
+    finally:
+        InFlight.current -= 1
+
+    result = f"Research findings on '{subtopic}': [detailed analysis, data, insights...]"
+    return {"research_results": [result]}
+
+
+# 5. Create the node that compiles all the results
+def compile_report(state: OverallState):
+    """Combine all research into final report"""
+    results = state["research_results"]
+    lines = ["=" * 50, "COMPREHENSIVE RESEARCH REPORT", "=" * 50, ""]
+    lines += [f"{i}. {result}\n" for i, result in enumerate(results, 1)]
+    return {"final_report": "\n".join(lines)}
+
+
+# 6. The conditional edge that maps to the worker node
+def continue_to_research(state: OverallState):
+    """Create research tasks via Send - max_concurrency decides how many run at once"""
+    return [Send("research_subtopic", {"subtopic": s}) for s in state["subtopics"]]
+
+
+"""Build the Graph"""
+builder = StateGraph(OverallState)
+
+builder.add_node("generate_subtopics", generate_subtopics)
+builder.add_node("research_subtopic", research_subtopic)
+builder.add_node("compile_report", compile_report)
+
+builder.add_edge(START, "generate_subtopics")
+builder.add_conditional_edges("generate_subtopics", continue_to_research)
+builder.add_edge("research_subtopic", "compile_report")
+builder.add_edge("compile_report", END)
+
+graph = builder.compile()
+
+
+def initial_state(topic: str, num_subtopics: int) -> dict:
+    return {
+        "topic": topic,
+        "num_subtopics": num_subtopics,
+        "subtopics": [],
+        "research_results": [],
+        "final_report": "",
+    }
+
+
+async def run_research(topic: str, num_subtopics: int, max_concurrency: int = MAX_CONCURRENCY) -> dict:
+    """Runs the research graph with at most `max_concurrency` workers at a time"""
+    return await graph.ainvoke(
+        initial_state(topic, num_subtopics),
+        config={"max_concurrency": max_concurrency},
+    )
+
+
+async def stream_research(topic: str, num_subtopics: int, max_concurrency: int = MAX_CONCURRENCY):
+    """Same as run_research, but reports progress as workers finish"""
+    done = 0
+    async for update in graph.astream(
+        initial_state(topic, num_subtopics),
+        config={"max_concurrency": max_concurrency},
+        stream_mode="updates",
+    ):
+        if "research_subtopic" in update:
+            done += 1
+            if done % 5 == 0 or done == num_subtopics:
+                print(f"  {done}/{num_subtopics} subtopics researched")
+        if "compile_report" in update:
+            return update["compile_report"]["final_report"]
+
+
+"""Benchmark"""
+
+
+async def benchmark(sizes=(10, 1_000, 10_000), max_concurrency: int = MAX_CONCURRENCY):
+    print(f"\n--- Benchmark: IO latency {IO_LATENCY * 1000:.0f} ms, max_concurrency={max_concurrency} ---")
+    print(f"{'subtopics':>9} | {'wall s':>7} | {'subtopics/s':>11} | {'ideal s':>7} | {'peak in-flight':>14} | {'peak MiB':>8}")
+
+    for size in sizes:
+        InFlight.peak = 0
+        start = time.perf_counter()
+        result = await run_research("Artificial Intelligence", size, max_concurrency)
+        wall = time.perf_counter() - start
+        assert len(result["research_results"]) == size
+
+        # Memory is measured in a second run, tracemalloc slows everything down
+        tracemalloc.start()
+        await run_research("Artificial Intelligence", size, max_concurrency)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        ideal = -(-size // max_concurrency) * IO_LATENCY
+        print(
+            f"{size:>9} | {wall:>7.2f} | {size / wall:>11.0f} | {ideal:>7.2f} | "
+            f"{InFlight.peak:>14} | {peak_memory / 2**20:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    print("--- Streaming a small run (max 3 workers at a time) ---")
+    report = asyncio.run(stream_research("Artificial Intelligence", 10, max_concurrency=3))
+    print(report[:200] + "...")
+
+    asyncio.run(benchmark())
@@ -0,0 +1,218 @@
+"""
+A linear-time accumulator reducer for fan-in list fields.
+
+In 10-send.py `research_results` is `Annotated[List[str], add]`.
+LangGraph calls the reducer once per worker write, and `operator.add` builds a
+brand new list every time:
+    [] + [r1] -> [r1] + [r2] -> [r1, r2] + [r3] -> ...
+so fanning in N workers copies 1 + 2 + ... + N = O(N²) elements.
+
+`AccumulatorChannel` replaces `add` on list fields:
+    research_results: Annotated[List[str], AccumulatorChannel]
+It is LangGraph's reducer channel with the `accumulate` reducer below.
+
+The first time it runs on a field it copies the current value into an
+`AccumulatedList` - a plain `list` subclass that belongs to the reducer - and
+from then on it extends that list in place: O(1) amortized per appended item,
+nothing is copied again. The value is a real list, so nodes read it without
+any conversion and the graph returns it as a list.
+
+Checkpointers may serialize a checkpoint in the background while later steps
+run (the default `durability="async"`), so each checkpoint must not see later
+appends. `AccumulatorChannel.checkpoint()` hands out a plain-list copy, taken
+once per step that grew the list and reused while it doesn't change. That is
+O(n) per such step, only with a checkpointer, which serializes the whole list
+anyway. A restored value comes back as a plain list, and the reducer takes
+ownership of a fresh copy on the next write.
+
+Because the list is extended in place, a reference kept from earlier in the
+run (e.g. a value yielded by `stream_mode="values"`) sees the later appends:
+copy it if you need a snapshot. For the same reason, don't write one
+accumulated field's value into another accumulated field.
+
+Don't pass `accumulate` on its own as a reducer (`Annotated[List[str], accumulate]`):
+conditional edges read a copy of the channels with the node's writes applied,
+and a plain reducer channel's copy shares the list, so those writes would be
+appended twice. `AccumulatorChannel` gives each copy its own list (one O(n)
+copy per conditional edge that runs, not per write).
+"""
+import time
+from operator import add
+from typing import TypedDict, Annotated, List
+from langgraph.channels.binop import BinaryOperatorAggregate
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import Send
+
+
+# --- 1. The accumulator ---
+class AccumulatedList(list):
+    """A list owned by the `accumulate` reducer, which may extend it in place"""
+    __slots__ = ()
+
+
+def accumulate(current, new):
+    """
+    Append-only list reducer with amortized O(1) appends.
+
+    Same result as `operator.add` for lists. `current` is copied once, the
+    first time it is not already an AccumulatedList; `new` is never modified.
+    """
+    if not isinstance(current, AccumulatedList):
+        current = AccumulatedList(current or [])
+    if new:
+        current.extend(new)
+    return current
+
+
+class AccumulatorChannel(BinaryOperatorAggregate):
+    """Reducer channel for `accumulate`; its copies and checkpoints don't share the accumulated list"""
+    __slots__ = ("_snapshot",)
+
+    def __init__(self, typ, operator=accumulate):
+        super().__init__(typ, operator)
+        self._snapshot = None
+
+    def copy(self):
+        copied = super().copy()
+        if isinstance(copied.value, AccumulatedList):
+            copied.value = AccumulatedList(copied.value)
+        return copied
+
+    def checkpoint(self):
+        value = super().checkpoint()
+        if not isinstance(value, AccumulatedList):
+            return value
+        # The list only grows, so a snapshot of the same length is still current
+        if self._snapshot is None or len(self._snapshot) != len(value):
+            self._snapshot = list(value)
+        return self._snapshot
+
+
+# --- 2. The 10-send.py graph using the accumulator ---
+class OverallState(TypedDict):
+    topic: str
+    subtopics: List[str]
+    research_results: Annotated[List[str], AccumulatorChannel]  # was: Annotated[List[str], add]
+    final_report: str
+
+
+class ResearchState(TypedDict):
+    subtopic: str
+    research_results: List[str]
+
+
+def generate_subtopics(state: OverallState):
+    """Generate subtopics to research"""
+    topic = state["topic"]
+    return {
+        "subtopics": [
+            f"{topic} - History",
+            f"{topic} - Current Trends",
+            f"{topic} - Future Outlook",
+        ]
+    }
+
+
+def research_subtopic(state: ResearchState):
+    """Research a single subtopic - runs in parallel"""
+    subtopic = state["subtopic"]
+    result = f"Research findings on '{subtopic}': [detailed analysis, data, insights...]"
+    return {"research_results": [result]}
+
+
+def compile_report(state: OverallState):
+    """Combine all research into final report"""
+    results = state["research_results"]
+    lines = ["=" * 50, "COMPREHENSIVE RESEARCH REPORT", "=" * 50, ""]
+    lines += [f"{i}. {result}\n" for i, result in enumerate(results, 1)]
+    return {"final_report": "\n".join(lines)}
+
+
+def continue_to_research(state: OverallState):
+    """Create parallel research tasks via Send"""
+    return [Send("research_subtopic", {"subtopic": s}) for s in state["subtopics"]]
+
+
+builder = StateGraph(OverallState)
+
+builder.add_node("generate_subtopics", generate_subtopics)
+builder.add_node("research_subtopic", research_subtopic)
+builder.add_node("compile_report", compile_report)
+
+builder.add_edge(START, "generate_subtopics")
+builder.add_conditional_edges("generate_subtopics", continue_to_research)
+builder.add_edge("research_subtopic", "compile_report")
+builder.add_edge("compile_report", END)
+
+graph = builder.compile()
+
+
+# --- 3. Micro-benchmark ---
+def fan_in(reducer, num_results: int) -> float:
+    """Merges `num_results` single-item worker writes the way the channel does, then reads the result"""
+    updates = [[f"result {i}"] for i in range(num_results)]
+
+    start = time.perf_counter()
+    value = []
+    for update in updates:
+        value = reducer(value, update)
+    final = list(value)
+    elapsed = time.perf_counter() - start
+
+    assert final == [u[0] for u in updates]
+    return elapsed
+
+
+if __name__ == "__main__":
+    result = graph.invoke({
+        "topic": "Artificial Intelligence",
+        "subtopics": [],
+        "research_results": [],
+        "final_report": "",
+    })
+    print(result["final_report"])
+
+    # The value is a plain list, so the graph checkpoints like with `add`
+    checkpointed = builder.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "research"}}
+    result = checkpointed.invoke({"topic": "AI", "subtopics": [], "research_results": [], "final_report": ""}, config)
+    assert isinstance(result["research_results"], list) and len(result["research_results"]) == 3
+    assert checkpointed.get_state(config).values["research_results"] == result["research_results"]
+
+    # Every checkpoint keeps the items of its own step, even with background (async) saving
+    class LoopState(TypedDict):
+        items: Annotated[List[str], AccumulatorChannel]
+        visits: int
+
+    looped = StateGraph(LoopState)
+    looped.add_node("work", lambda state: {"items": [f"{state['visits']}-{i}" for i in range(50)],
+                                           "visits": state["visits"] + 1})
+    looped.add_edge(START, "work")
+    looped.add_conditional_edges("work", lambda state: "work" if state["visits"] < 60 else END)
+    looped = looped.compile(checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "loop"}}
+    looped.invoke({"items": [], "visits": 0}, config, durability="async")
+    history = list(looped.get_state_history(config))
+    assert len(history) == 62
+    for snapshot in history:
+        assert len(snapshot.values.get("items", [])) == 50 * snapshot.values.get("visits", 0), snapshot.metadata
+
+    # A conditional edge after a node that writes the field sees its writes once
+    class RouteState(TypedDict):
+        items: Annotated[List[str], AccumulatorChannel]
+
+    routed = StateGraph(RouteState)
+    routed.add_node("first", lambda state: {"items": ["a"]})
+    routed.add_node("second", lambda state: {"items": ["b"]})
+    routed.add_edge(START, "first")
+    routed.add_conditional_edges("first", lambda state: "second" if state["items"] == ["a"] else END)
+    routed.add_edge("second", END)
+    assert routed.compile().invoke({"items": []})["items"] == ["a", "b"]
+
+    print("--- Micro-benchmark: fan-in of single-item worker results ---")
+    print(f"{'results':>8} | {'operator.add s':>14} | {'accumulate s':>12} | {'speed-up':>8}")
+    for size in (10_000, 100_000):
+        add_time = fan_in(add, size)
+        accumulate_time = fan_in(accumulate, size)
+        print(f"{size:>8} | {add_time:>14.3f} | {accumulate_time:>12.3f} | {add_time / accumulate_time:>7.0f}x")
@@ -0,0 +1,158 @@
+"""
+Running CPU-bound mapped workers in a process pool.
+
+The `research_subtopic` workers in 10-send.py (and the orchestrator-worker
+`llm_call` workers in workflows.md) all run inside one Python process.
+That is fine while they wait on I/O, but when the per-subtopic work is
+CPU-bound (parsing, scoring, embedding math) the GIL lets only one of them
+run at a time.
+
+`in_process_pool(node, pool)` is an opt-in wrapper for a node:
+    - the node's input state is pickled and sent to a worker process
+    - the node runs there, on its own core
+    - the returned update is pickled back and merged by the node's reducer
+      exactly as before (here `add` on `research_results`)
+
+The node function must be importable by the worker processes, so it has to be
+defined at the top level of a module. The graph is built and run under
+`if __name__ == "__main__":` so worker processes can import this file safely.
+
+Large numeric inputs are better passed through `multiprocessing.shared_memory`
+(send the block name in the state, not the data); plain pickling is used here.
+"""
+import hashlib
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import wraps
+from operator import add
+from typing import TypedDict, Annotated, List, Optional
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+
+# Amount of synthetic CPU work per subtopic (sha256 rounds)
+HASH_ROUNDS = 200_000
+# Number of subtopics in the benchmark
+NUM_SUBTOPICS = 32
+
+
+# 1. Create the main State for the Graph
+class OverallState(TypedDict):
+    topic: str
+    num_subtopics: int
+    subtopics: List[str]
+    research_results: Annotated[List[str], add]
+    final_report: str
+
+
+# 2. Private state for the mapped nodes
+class ResearchState(TypedDict):
+    subtopic: str
+
+
+# 3. Create the node that generates the subtopics to research
+def generate_subtopics(state: OverallState):
+    """Generate subtopics to research"""
+    topic = state["topic"]
+    return {"subtopics": [f"{topic} - Subtopic {i}" for i in range(state["num_subtopics"])]}
+
+
+# 4. The CPU-bound worker
+def research_subtopic(state: ResearchState):
+    """Scores a single subtopic - pure Python CPU work, so it holds the GIL"""
+    subtopic = state["subtopic"]
+
+    digest = subtopic.encode("utf-8")
+    for _ in range(HASH_ROUNDS):
+        digest = hashlib.sha256(digest).digest()
+    score = int.from_bytes(digest[:2], "big") / 65535
+
+    return {"research_results": [f"Research findings on '{subtopic}': relevance score {score:.3f}"]}
+
+
+# 5. The opt-in process pool mode
+def in_process_pool(node, pool: Executor):
+    """
+    Wraps a node so that it runs in `pool` instead of the graph's own thread.
+
+    LangGraph runs the wrapper on a thread as usual; the thread just waits for the
+    worker process, so the GIL is free for the other mapped tasks.
+    """
+    @wraps(node)
+    def run_in_pool(state):
+        return pool.submit(node, state).result()
+
+    return run_in_pool
+
+
+# 6. Create the node that compiles all the results
+def compile_report(state: OverallState):
+    """Combine all research into final report"""
+    results = state["research_results"]
+    lines = ["=" * 50, "COMPREHENSIVE RESEARCH REPORT", "=" * 50, ""]
+    lines += [f"{i}. {result}\n" for i, result in enumerate(results, 1)]
+    return {"final_report": "\n".join(lines)}
+
+
+# 7. The conditional edge that maps to the worker node
+def continue_to_research(state: OverallState):
+    """Create parallel research tasks via Send"""
+    return [Send("research_subtopic", {"subtopic": s}) for s in state["subtopics"]]
+
+
+def build_graph(pool: Optional[Executor] = None):
+    """Builds the research graph; with a `pool` the workers run in that pool"""
+    worker = in_process_pool(research_subtopic, pool) if pool is not None else research_subtopic
+
+    builder = StateGraph(OverallState)
+
+    builder.add_node("generate_subtopics", generate_subtopics)
+    builder.add_node("research_subtopic", worker)
+    builder.add_node("compile_report", compile_report)
+
+    builder.add_edge(START, "generate_subtopics")
+    builder.add_conditional_edges("generate_subtopics", continue_to_research)
+    builder.add_edge("research_subtopic", "compile_report")
+    builder.add_edge("compile_report", END)
+
+    return builder.compile()
+
+
+def run(graph, num_subtopics: int) -> dict:
+    return graph.invoke(
+        {
+            "topic": "Artificial Intelligence",
+            "num_subtopics": num_subtopics,
+            "subtopics": [],
+            "research_results": [],
+            "final_report": "",
+        },
+        # Enough graph threads to keep every worker process busy
+        config={"max_concurrency": num_subtopics},
+    )
+
+
+if __name__ == "__main__":
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"--- Benchmark: {NUM_SUBTOPICS} CPU-bound subtopics on {cores} core(s) ---")
+
+    start = time.perf_counter()
+    baseline = run(build_graph(), NUM_SUBTOPICS)
+    baseline_time = time.perf_counter() - start
+    print(f"{'mode':>18} | {'wall s':>7} | {'speed-up':>8} | {'efficiency':>10}")
+    print(f"{'threads (default)':>18} | {baseline_time:>7.2f} | {1.0:>7.2f}x | {'-':>10}")
+
+    worker_counts = sorted({1, *(2 ** i for i in range(1, cores.bit_length())), cores})
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Start the worker processes before timing
+            list(pool.map(abs, range(workers)))
+
+            start = time.perf_counter()
+            result = run(build_graph(pool), NUM_SUBTOPICS)
+            elapsed = time.perf_counter() - start
+
+        # Same results, merged through the same reducer
+        assert sorted(result["research_results"]) == sorted(baseline["research_results"])
+        speed_up = baseline_time / elapsed
+        print(f"{f'{workers} process(es)':>18} | {elapsed:>7.2f} | {speed_up:>7.2f}x | {speed_up / workers:>9.0%}")
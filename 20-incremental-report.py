@@ -0,0 +1,263 @@
+"""
+Incremental reduce: writing report sections as soon as each worker finishes.
+
+In 10-send.py `compile_report` only runs after EVERY `research_subtopic` task
+has finished (a barrier), and then rebuilds the whole report with repeated
+`report +=` string concatenation. One slow worker holds back all output and
+the whole report sits in memory, twice.
+
+In the incremental mode:
+    - the report is written to a sink that lives in the runtime context
+      (see 09-runtime-context.py), here a file writer
+    - `generate_subtopics` writes the header when the fan-out starts
+    - every worker appends its own section the moment it is done, and also
+      pushes it to `stream_mode="custom"` so a caller can show it right away
+    - the final node only writes the footer
+
+Nothing but a counter is kept in the graph state.
+"""
+import asyncio
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from operator import add
+from pathlib import Path
+from typing import TypedDict, Annotated, List
+from langgraph.config import get_stream_writer
+from langgraph.graph import StateGraph, START, END
+from langgraph.runtime import Runtime
+from langgraph.types import Send
+
+# Benchmark settings
+NUM_SUBTOPICS = 2_000
+SECTION_SIZE = 10_000  # characters per section
+WORKER_LATENCY = 0.05  # seconds for a normal worker
+SLOW_WORKER_LATENCY = 2.0
+
+
+# --- 1. The report sink ---
+class FileReportSink:
+    """Appends numbered report sections to a file as they arrive"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sections = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write_header(self, topic: str):
+        with self._lock:
+            self._file.write("=" * 50 + "\n")
+            self._file.write(f"COMPREHENSIVE RESEARCH REPORT: {topic}\n")
+            self._file.write("=" * 50 + "\n\n")
+            self._file.flush()
+
+    def write_section(self, text: str) -> int:
+        with self._lock:
+            self.sections += 1
+            self._file.write(f"{self.sections}. {text}\n\n")
+            # Flush so readers of the file see the section right away
+            self._file.flush()
+            return self.sections
+
+    def write_footer(self):
+        with self._lock:
+            self._file.write("=" * 50 + "\n")
+            self._file.write(f"END OF REPORT ({self.sections} sections)\n")
+            self._file.close()
+
+
+@dataclass
+class ReportContext:
+    """Runtime context: where the report goes"""
+    sink: FileReportSink
+
+
+# --- 2. Shared pieces (same as 10-send.py) ---
+class ResearchState(TypedDict):
+    subtopic: str
+
+
+async def do_research(subtopic: str) -> str:
+    """Simulated research - one subtopic is much slower than the others"""
+    latency = SLOW_WORKER_LATENCY if subtopic.endswith(" 0") else WORKER_LATENCY * random.uniform(0.5, 1.5)
+    await asyncio.sleep(latency)
+    return f"Research findings on '{subtopic}': " + "x" * SECTION_SIZE
+
+
+def subtopics_for(topic: str, num_subtopics: int) -> List[str]:
+    return [f"{topic} - Subtopic {i}" for i in range(num_subtopics)]
+
+
+def continue_to_research(state):
+    """Create parallel research tasks via Send"""
+    return [Send("research_subtopic", {"subtopic": s}) for s in state["subtopics"]]
+
+
+# --- 3. Barrier mode (the 10-send.py approach) ---
+class BarrierState(TypedDict):
+    topic: str
+    num_subtopics: int
+    subtopics: List[str]
+    research_results: Annotated[List[str], add]
+    final_report: str
+
+
+def barrier_generate_subtopics(state: BarrierState):
+    return {"subtopics": subtopics_for(state["topic"], state["num_subtopics"])}
+
+
+async def barrier_research_subtopic(state: ResearchState):
+    return {"research_results": [await do_research(state["subtopic"])]}
+
+
+def barrier_compile_report(state: BarrierState):
+    """Combine all research into final report"""
+    results = state["research_results"]
+
+    report = "=" * 50 + "\n"
+    report += f"COMPREHENSIVE RESEARCH REPORT: {state['topic']}\n"
+    report += "=" * 50 + "\n\n"
+
+    for i, result in enumerate(results, 1):
+        report += f"{i}. {result}\n\n"
+
+    return {"final_report": report}
+
+
+def build_barrier_graph():
+    builder = StateGraph(BarrierState)
+    builder.add_node("generate_subtopics", barrier_generate_subtopics)
+    builder.add_node("research_subtopic", barrier_research_subtopic)
+    builder.add_node("compile_report", barrier_compile_report)
+    builder.add_edge(START, "generate_subtopics")
+    builder.add_conditional_edges("generate_subtopics", continue_to_research)
+    builder.add_edge("research_subtopic", "compile_report")
+    builder.add_edge("compile_report", END)
+    return builder.compile()
+
+
+# --- 4. Incremental mode ---
+class IncrementalState(TypedDict):
+    topic: str
+    num_subtopics: int
+    subtopics: List[str]
+    sections_written: Annotated[int, add]  # Only a counter, the text lives in the sink
+    report_path: str
+
+
+def incremental_generate_subtopics(state: IncrementalState, runtime: Runtime[ReportContext]):
+    """Generate subtopics and open the report with its header"""
+    runtime.context.sink.write_header(state["topic"])
+    return {"subtopics": subtopics_for(state["topic"], state["num_subtopics"])}
+
+
+async def incremental_research_subtopic(state: ResearchState, runtime: Runtime[ReportContext]):
+    """Research a single subtopic and write its section straight away"""
+    result = await do_research(state["subtopic"])
+
+    number = runtime.context.sink.write_section(result)
+    # Also push the section to anyone consuming stream_mode="custom"
+    get_stream_writer()({"section": number, "subtopic": state["subtopic"]})
+
+    return {"sections_written": 1}
+
+
+def incremental_finish_report(state: IncrementalState, runtime: Runtime[ReportContext]):
+    """All sections are already written - only the footer is left"""
+    runtime.context.sink.write_footer()
+    return {"report_path": runtime.context.sink.path}
+
+
+def build_incremental_graph():
+    builder = StateGraph(IncrementalState, context_schema=ReportContext)
+    builder.add_node("generate_subtopics", incremental_generate_subtopics)
+    builder.add_node("research_subtopic", incremental_research_subtopic)
+    builder.add_node("finish_report", incremental_finish_report)
+    builder.add_edge(START, "generate_subtopics")
+    builder.add_conditional_edges("generate_subtopics", continue_to_research)
+    builder.add_edge("research_subtopic", "finish_report")
+    builder.add_edge("finish_report", END)
+    return builder.compile()
+
+
+# --- 5. Benchmark ---
+async def measure_barrier(num_subtopics: int) -> float:
+    """Returns the time until the first section is available to a reader"""
+    graph = build_barrier_graph()
+    start = time.perf_counter()
+    first_section = None
+    async for update in graph.astream(
+        {"topic": "Artificial Intelligence", "num_subtopics": num_subtopics},
+        stream_mode="updates",
+    ):
+        if "compile_report" in update:
+            # Nothing can be shown before the whole report is built
+            first_section = time.perf_counter() - start
+    return first_section
+
+
+async def measure_incremental(num_subtopics: int, report_path: str) -> float:
+    """Returns the time until the first section is available to a reader"""
+    graph = build_incremental_graph()
+    sink = FileReportSink(report_path)
+    start = time.perf_counter()
+    first_section = None
+    async for _ in graph.astream(
+        {"topic": "Artificial Intelligence", "num_subtopics": num_subtopics},
+        stream_mode="custom",
+        context=ReportContext(sink=sink),
+    ):
+        if first_section is None:
+            first_section = time.perf_counter() - start
+    return first_section
+
+
+def run_mode(mode: str) -> tuple[float, float, float]:
+    """Runs one mode in a fresh process: (time to first section, wall time, peak RSS in MiB)"""
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if mode == "barrier":
+            first_section = asyncio.run(measure_barrier(NUM_SUBTOPICS))
+        else:
+            first_section = asyncio.run(measure_incremental(NUM_SUBTOPICS, str(Path(tmp_dir) / "report.txt")))
+    wall = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak_mib = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    return first_section, wall, peak_mib
+
+
+async def demo():
+    """Streams a small incremental report and prints each section as it lands"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        report_path = str(Path(tmp_dir) / "report.txt")
+        graph = build_incremental_graph()
+        sink = FileReportSink(report_path)
+        async for event in graph.astream(
+            {"topic": "Artificial Intelligence", "num_subtopics": 3},
+            stream_mode="custom",
+            context=ReportContext(sink=sink),
+        ):
+            print(f"section {event['section']} written: {event['subtopic']}")
+        print(Path(report_path).read_text()[:300] + "...")
+
+
+if __name__ == "__main__":
+    print("--- Streaming a small incremental report ---")
+    asyncio.run(demo())
+
+    print(f"\n--- Benchmark: {NUM_SUBTOPICS} subtopics x {SECTION_SIZE} chars, one worker takes {SLOW_WORKER_LATENCY}s ---")
+    print(f"{'mode':>11} | {'first section s':>15} | {'wall s':>7} | {'peak RSS MiB':>12}")
+    # A fresh "spawn" process per mode so the peak RSS numbers don't mix
+    context = multiprocessing.get_context("spawn")
+    for mode in ("barrier", "incremental"):
+        with context.Pool(1) as pool:
+            first_section, wall, peak_mib = pool.apply(run_mode, (mode,))
+        print(f"{mode:>11} | {first_section:>15.3f} | {wall:>7.2f} | {peak_mib:>12.1f}")
@@ -0,0 +1,315 @@
+"""
+Non-blocking retries and a circuit breaker for fetch_weather.
+
+In 12-retries.py `fetch_weather` is a sync node with
+    RetryPolicy(max_attempts=5, initial_interval=1.0, backoff_factor=2.0, ...)
+so the worker thread sleeps through every backoff, and when the weather API is
+down every request still burns all five attempts.
+
+Here:
+    - `fetch_weather` is async and the graph is run with `ainvoke`.
+      LangGraph then waits out the RetryPolicy backoff with `asyncio.sleep`,
+      so the event loop keeps serving other requests in the meantime.
+    - a CircuitBreaker, passed in through the runtime context and shared by
+      the invocations that use it, watches the recent calls.
+      When the failure rate goes over a threshold it opens, and later calls
+      fail fast with CircuitOpenError (which the RetryPolicy does not retry).
+      After `reset_timeout` one trial call is let through (half-open); if it
+      succeeds the breaker closes again.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TypedDict
+from langgraph.graph import StateGraph, START, END
+from langgraph.runtime import Runtime
+from langgraph.types import RetryPolicy
+
+# Load test settings
+NUM_REQUESTS = 500
+CONCURRENCY = 50
+
+
+# 1. Define the state
+class WeatherState(TypedDict):
+    city: str
+    temperature: float
+    conditions: str
+
+
+# 2. Errors
+class APIError(Exception):
+    """Simulated API Error"""
+    pass
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the API while the circuit is open"""
+    pass
+
+
+# 3. A local flaky stand-in for the weather API
+class FlakyWeatherAPI:
+    """Answers after `latency` seconds, failing with probability `failure_rate`"""
+
+    def __init__(self, failure_rate: float = 0.7, latency: float = 0.02):
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.calls = 0
+
+    async def get_weather(self, city: str) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise APIError(f"Weather API timeout for {city}")
+        return {
+            "temperature": round(random.uniform(15, 30), 1),
+            "conditions": random.choice(["Sunny", "Cloudy", "Rainy", "Partly Cloudy"]),
+        }
+
+
+# 4. The circuit breaker
+class CircuitBreaker:
+    """
+    Opens when the failure rate over the last `window` calls reaches `failure_threshold`.
+
+    `min_calls` avoids opening on the first few failures.
+
+    Every change of state starts a new generation. `before_call` returns the
+    current one, and `record` / `abandon` ignore calls from an older generation:
+    a slow call that started while closed must not close a half-open breaker
+    nor re-open one that has already opened.
+    """
+
+    def __init__(self, failure_threshold: float = 0.5, window: int = 20, min_calls: int = 10,
+                 reset_timeout: float = 5.0):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._results = deque(maxlen=window)  # True for success, False for failure
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._generation = 0
+
+    def before_call(self) -> int:
+        """
+        Raises CircuitOpenError if the call should not reach the API.
+
+        Returns the generation token to pass to `record` or `abandon`.
+        """
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("Weather API circuit is open")
+            self._set_state("half_open")
+
+        if self.state == "half_open":
+            # Only one trial call at a time
+            if self._trial_running:
+                raise CircuitOpenError("Weather API circuit is half-open, trial call in progress")
+            self._trial_running = True
+        return self._generation
+
+    def record(self, token: int, success: bool):
+        if token != self._generation:
+            return  # Started before the last change of state
+        if self.state == "half_open":
+            self._trial_running = False
+            if success:
+                self._set_state("closed")
+                self._results.clear()
+            else:
+                self._open()
+            return
+
+        self._results.append(success)
+        failures = self._results.count(False)
+        if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_threshold:
+            self._open()
+
+    def abandon(self, token: int):
+        """The call was cancelled before it got an answer: let another trial through"""
+        if token == self._generation and self.state == "half_open":
+            self._trial_running = False
+
+    def _open(self):
+        self._set_state("open")
+        self._opened_at = time.monotonic()
+
+    def _set_state(self, state: str):
+        self.state = state
+        self._generation += 1
+
+
+# Shared across all invocations of the graph
+weather_api = FlakyWeatherAPI()
+
+
+@dataclass
+class BreakerContext:
+    """Runtime context: the breaker guarding the weather API"""
+    breaker: CircuitBreaker
+
+
+# 5. The async node that calls the API through the breaker
+async def fetch_weather(state: WeatherState, runtime: Runtime[BreakerContext]) -> dict:
+    """Calls the weather API unless the circuit is open"""
+    city = state["city"]
+    breaker = runtime.context.breaker
+
+    token = breaker.before_call()
+    try:
+        weather = await weather_api.get_weather(city)
+    except Exception:
+        breaker.record(token, success=False)
+        raise
+    except BaseException:
+        # Cancelled: not a verdict on the API, but the trial slot must be freed
+        breaker.abandon(token)
+        raise
+    breaker.record(token, success=True)
+    return weather
+
+
+async def fetch_weather_without_breaker(state: WeatherState) -> dict:
+    """The same call with no breaker, for comparison"""
+    return await weather_api.get_weather(state["city"])
+
+
+def format_result(state: WeatherState):
+    """Format the weather data"""
+    return {"conditions": f"{state['conditions']} ({state['temperature']} degrees)"}
+
+
+"""Build the Graph"""
+
+
+def build_graph(fetch_node, retry_policy: RetryPolicy):
+    builder = StateGraph(WeatherState, context_schema=BreakerContext)
+    builder.add_node("fetch_weather", fetch_node, retry_policy=retry_policy)
+    builder.add_node("format_result", format_result)
+    builder.add_edge(START, "fetch_weather")
+    builder.add_edge("fetch_weather", "format_result")
+    builder.add_edge("format_result", END)
+    return builder.compile()
+
+
+# Same shape as the 12-retries.py policy.
+# CircuitOpenError is not an APIError, so it is never retried.
+retry_policy = RetryPolicy(
+    max_attempts=5,
+    initial_interval=1.0,
+    backoff_factor=2.0,
+    max_interval=10.0,
+    jitter=True,
+    retry_on=APIError,
+)
+
+graph = build_graph(fetch_weather, retry_policy)
+
+
+"""Load test during an outage"""
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def load_test(graph, breaker: CircuitBreaker, num_requests: int, concurrency: int) -> dict:
+    """Sends `num_requests` lookups through `breaker`, `concurrency` at a time"""
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    outcomes = {"ok": 0, "api_error": 0, "circuit_open": 0}
+
+    async def one_request(i: int):
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await graph.ainvoke({"city": f"City {i}", "temperature": 0.0, "conditions": ""},
+                                    context=BreakerContext(breaker))
+                outcomes["ok"] += 1
+            except CircuitOpenError:
+                outcomes["circuit_open"] += 1
+            except APIError:
+                outcomes["api_error"] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(i) for i in range(num_requests)))
+    wall = time.perf_counter() - start
+
+    return {
+        "wall": wall,
+        "throughput": num_requests / wall,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        **outcomes,
+    }
+
+
+async def main():
+    print("--- A single lookup with 70% failure rate ---")
+    try:
+        result = await graph.ainvoke({"city": "San Francisco", "temperature": 0.0, "conditions": ""},
+                                     context=BreakerContext(CircuitBreaker()))
+        print(f"✨ Final Result: {result} (API calls: {weather_api.calls})")
+    except Exception as e:
+        print(f"💥 {type(e).__name__}: {e} (API calls: {weather_api.calls})")
+
+    # A full outage. Shorter backoff intervals than 12-retries.py keep the load test quick.
+    weather_api.failure_rate = 1.0
+    fast_policy = RetryPolicy(max_attempts=5, initial_interval=0.1, backoff_factor=2.0, jitter=True,
+                              retry_on=APIError)
+
+    print(f"\n--- Load test: {NUM_REQUESTS} requests, {CONCURRENCY} concurrent, API 100% down ---")
+    print(f"{'mode':>14} | {'req/s':>7} | {'p50 s':>6} | {'p99 s':>6} | {'API calls':>9} | outcomes")
+    for name, node in (("retries only", fetch_weather_without_breaker), ("with breaker", fetch_weather)):
+        weather_api.calls = 0
+        stats = await load_test(build_graph(node, fast_policy), CircuitBreaker(), NUM_REQUESTS, CONCURRENCY)
+        outcomes = {k: stats[k] for k in ("ok", "api_error", "circuit_open")}
+        print(f"{name:>14} | {stats['throughput']:>7.1f} | {stats['p50']:>6.3f} | {stats['p99']:>6.3f} | "
+              f"{weather_api.calls:>9} | {outcomes}")
+
+    print("\n--- Recovery: the breaker closes after a successful trial call ---")
+    breaker = CircuitBreaker(reset_timeout=0.2)
+    await load_test(build_graph(fetch_weather, fast_policy), breaker, 20, 5)
+    print(f"During the outage the breaker is {breaker.state}")
+    weather_api.failure_rate = 0.0
+    await asyncio.sleep(0.3)
+    await graph.ainvoke({"city": "San Francisco", "temperature": 0.0, "conditions": ""},
+                        context=BreakerContext(breaker))
+    print(f"After the API recovers the breaker is {breaker.state}")
+
+    # A trial call that is cancelled frees the half-open slot
+    breaker._open()
+    await asyncio.sleep(0.3)
+    weather_api.latency = 1.0
+    trial = asyncio.create_task(graph.ainvoke({"city": "Oslo", "temperature": 0.0, "conditions": ""},
+                                              context=BreakerContext(breaker)))
+    await asyncio.sleep(0.05)
+    trial.cancel()
+    await asyncio.gather(trial, return_exceptions=True)
+    weather_api.latency = 0.02
+    await graph.ainvoke({"city": "Oslo", "temperature": 0.0, "conditions": ""}, context=BreakerContext(breaker))
+    assert breaker.state == "closed"
+
+    # Answers to calls made before the breaker changed state are ignored
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=0.0)
+    slow = breaker.before_call()
+    breaker.record(breaker.before_call(), success=False)
+    assert breaker.state == "open"
+    trial = breaker.before_call()
+    assert breaker.state == "half_open"
+    breaker.record(slow, success=True)  # must not close the breaker
+    assert breaker.state == "half_open"
+    breaker.record(trial, success=False)
+    opened_at = breaker._opened_at
+    breaker.record(slow, success=False)  # must not push back the reset timeout
+    assert breaker.state == "open" and breaker._opened_at == opened_at
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,280 @@
+"""
+Looking up the weather for many cities at once, with request coalescing.
+
+12-retries.py handles one `WeatherState.city` per `graph.invoke`. For thousands
+of lookups per minute - many of them for the same city at the same moment -
+that means one upstream call per lookup.
+
+Here all lookups go through a shared WeatherBatcher:
+    - a short-TTL cache answers cities looked up recently
+    - lookups for a city that is already being fetched wait for that fetch
+      instead of starting a new one (coalescing)
+    - the remaining cities are collected for a few milliseconds and sent to a
+      batch-capable upstream function in chunks of `chunk_size`
+
+`lookup_weather(cities, batcher)` is the batch entry point: the graph fans out
+one `fetch_weather` task per distinct city with Send, and each task awaits the
+batcher it gets through the runtime context. A batcher holds futures and tasks
+of the event loop it is used on, so create one per loop (e.g. inside the
+coroutine passed to `asyncio.run`).
+
+A city the upstream leaves out of its answer fails with MissingWeatherError
+(and is not cached), so a later lookup asks the upstream again.
+"""
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TypedDict, Annotated, Dict, List, Set
+from langgraph.graph import StateGraph, START, END
+from langgraph.runtime import Runtime
+from langgraph.types import Send
+
+# Simulated upstream latency: a fixed cost per call plus a little per city in the batch
+UPSTREAM_CALL_LATENCY = 0.01
+UPSTREAM_PER_CITY_LATENCY = 0.0002
+
+# Benchmark workload
+NUM_LOOKUPS = 1_000
+NUM_DISTINCT_CITIES = 200
+
+
+# 1. The (simulated) batch-capable upstream API
+class WeatherUpstream:
+    def __init__(self):
+        self.calls = 0
+
+    def _weather(self, city: str) -> dict:
+        rng = random.Random(city)
+        return {
+            "temperature": round(rng.uniform(15, 30), 1),
+            "conditions": rng.choice(["Sunny", "Cloudy", "Rainy", "Partly Cloudy"]),
+        }
+
+    def fetch_one(self, city: str) -> dict:
+        """The single-city call 12-retries.py makes"""
+        self.calls += 1
+        time.sleep(UPSTREAM_CALL_LATENCY + UPSTREAM_PER_CITY_LATENCY)
+        return self._weather(city)
+
+    async def fetch_batch(self, cities: List[str]) -> Dict[str, dict]:
+        """One call for many cities"""
+        self.calls += 1
+        await asyncio.sleep(UPSTREAM_CALL_LATENCY + UPSTREAM_PER_CITY_LATENCY * len(cities))
+        return {city: self._weather(city) for city in cities}
+
+
+upstream = WeatherUpstream()
+
+
+# 2. The batcher: TTL cache + coalescing + chunked batch calls
+class MissingWeatherError(LookupError):
+    """The upstream answered the batch but left this city out"""
+    pass
+
+
+class WeatherBatcher:
+    def __init__(self, fetch_batch, chunk_size: int = 50, max_wait: float = 0.005, ttl: float = 60.0):
+        self.fetch_batch = fetch_batch
+        self.chunk_size = chunk_size
+        self.max_wait = max_wait
+        self.ttl = ttl
+        # city -> (expiry, weather), oldest expiry first (every entry gets the same ttl)
+        self._cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_task = None
+        # The event loop only keeps weak references to tasks: hold the running fetches
+        self._fetch_tasks: Set[asyncio.Task] = set()
+
+    async def get(self, city: str) -> dict:
+        cached = self._cache.get(city)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+
+        # Someone is already fetching this city - wait for their result
+        future = self._in_flight.get(city)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[city] = future
+            self._pending.append(city)
+            if len(self._pending) >= self.chunk_size:
+                self._flush()
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_later())
+
+        # One caller being cancelled must not cancel the fetch for the others
+        return await asyncio.shield(future)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_wait)
+        self._flush_task = None
+        self._flush()
+
+    def _flush(self):
+        while self._pending:
+            chunk, self._pending = self._pending[:self.chunk_size], self._pending[self.chunk_size:]
+            task = asyncio.create_task(self._fetch_chunk(chunk))
+            self._fetch_tasks.add(task)
+            task.add_done_callback(self._fetch_tasks.discard)
+
+    async def _fetch_chunk(self, cities: List[str]):
+        results, error = {}, None
+        try:
+            results = await self.fetch_batch(cities)
+        except Exception as e:
+            error = e
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # Every future of the chunk is resolved and released, whatever happened
+            now = time.monotonic()
+            self._evict_expired(now)
+            for city in cities:
+                future = self._in_flight.pop(city)
+                if future.done():
+                    continue
+                if isinstance(error, Exception):
+                    future.set_exception(error)
+                elif error is not None:
+                    future.cancel()  # this fetch was cancelled
+                elif city not in results:
+                    future.set_exception(MissingWeatherError(f"upstream returned no weather for {city}"))
+                else:
+                    self._cache[city] = (now + self.ttl, results[city])
+                    self._cache.move_to_end(city)
+                    future.set_result(results[city])
+
+    def _evict_expired(self, now: float):
+        while self._cache:
+            city, (expires, _) = next(iter(self._cache.items()))
+            if expires > now:
+                break
+            del self._cache[city]
+
+
+# 3. Define the states
+def merge_reports(current: Dict[str, dict], new: Dict[str, dict]) -> Dict[str, dict]:
+    return {**current, **new}
+
+
+class BatchWeatherState(TypedDict):
+    cities: List[str]
+    reports: Annotated[Dict[str, dict], merge_reports]
+
+
+class CityState(TypedDict):
+    city: str
+
+
+@dataclass
+class BatcherContext:
+    batcher: WeatherBatcher
+
+
+# 4. The nodes
+def continue_to_fetch(state: BatchWeatherState):
+    """One fetch task per distinct city"""
+    return [Send("fetch_weather", {"city": city}) for city in dict.fromkeys(state["cities"])]
+
+
+async def fetch_weather(state: CityState, runtime: Runtime[BatcherContext]):
+    """Gets the weather for one city through the shared batcher"""
+    weather = await runtime.context.batcher.get(state["city"])
+    return {"reports": {state["city"]: weather}}
+
+
+"""Build the Graph"""
+builder = StateGraph(BatchWeatherState, context_schema=BatcherContext)
+builder.add_node("fetch_weather", fetch_weather)
+builder.add_conditional_edges(START, continue_to_fetch)
+builder.add_edge("fetch_weather", END)
+
+graph = builder.compile()
+
+
+async def lookup_weather(cities: List[str], batcher: WeatherBatcher) -> Dict[str, dict]:
+    """Batch entry point: weather for every city in `cities`"""
+    result = await graph.ainvoke({"cities": cities, "reports": {}}, context=BatcherContext(batcher))
+    return result["reports"]
+
+
+# 5. The 12-retries.py style single-city graph, for comparison
+class WeatherState(TypedDict):
+    city: str
+    temperature: float
+    conditions: str
+
+
+def fetch_weather_single(state: WeatherState) -> dict:
+    return upstream.fetch_one(state["city"])
+
+
+single_builder = StateGraph(WeatherState)
+single_builder.add_node("fetch_weather", fetch_weather_single)
+single_builder.add_edge(START, "fetch_weather")
+single_builder.add_edge("fetch_weather", END)
+
+single_city_graph = single_builder.compile()
+
+
+"""Benchmark"""
+
+
+def workload(num_lookups: int, num_cities: int) -> List[str]:
+    """A skewed mix of cities - a few popular ones are looked up very often"""
+    rng = random.Random(42)
+    cities = [f"City {i}" for i in range(num_cities)]
+    weights = [1 / (rank + 1) for rank in range(num_cities)]
+    return rng.choices(cities, weights=weights, k=num_lookups)
+
+
+async def many_concurrent_requests(requests: List[List[str]], chunk_size: int):
+    """Several callers asking for overlapping cities at the same time"""
+    batcher = WeatherBatcher(upstream.fetch_batch, chunk_size=chunk_size)
+    return await asyncio.gather(*(lookup_weather(cities, batcher) for cities in requests))
+
+
+async def check_missing_city():
+    """A city missing from the upstream answer fails its lookups instead of hanging them"""
+    async def incomplete_fetch(cities):
+        return {city: {"temperature": 20.0, "conditions": "Sunny"} for city in cities if city != "Atlantis"}
+
+    batcher = WeatherBatcher(incomplete_fetch)
+    for _ in range(2):
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.get("Paris"), batcher.get("Atlantis"), return_exceptions=True), timeout=1
+        )
+        assert results[0]["conditions"] == "Sunny" and isinstance(results[1], MissingWeatherError)
+    assert not batcher._in_flight and not batcher._fetch_tasks and "Atlantis" not in batcher._cache
+
+
+async def demo():
+    batcher = WeatherBatcher(upstream.fetch_batch)
+    return await lookup_weather(["San Francisco", "London", "San Francisco", "Lagos"], batcher)
+
+
+if __name__ == "__main__":
+    asyncio.run(check_missing_city())
+    reports = asyncio.run(demo())
+    for city, weather in reports.items():
+        print(f"🌤️ {city}: {weather['temperature']} degrees, {weather['conditions']}")
+
+    lookups = workload(NUM_LOOKUPS, NUM_DISTINCT_CITIES)
+    print(f"\n--- Benchmark: {NUM_LOOKUPS} lookups over {len(set(lookups))} distinct cities ---")
+    print(f"{'mode':>26} | {'upstream calls':>14} | {'wall s':>7}")
+
+    upstream.calls = 0
+    start = time.perf_counter()
+    for city in lookups:
+        single_city_graph.invoke({"city": city, "temperature": 0.0, "conditions": ""})
+    print(f"{'per-city invoke loop':>26} | {upstream.calls:>14} | {time.perf_counter() - start:>7.2f}")
+
+    for chunk_size in (10, 50, 200):
+        upstream.calls = 0
+        start = time.perf_counter()
+        # The lookups arrive as 20 concurrent requests of 50 cities each
+        asyncio.run(many_concurrent_requests([lookups[i:i + 50] for i in range(0, NUM_LOOKUPS, 50)], chunk_size))
+        print(f"{f'batched, chunk_size={chunk_size}':>26} | {upstream.calls:>14} | {time.perf_counter() - start:>7.2f}")
@@ -0,0 +1,287 @@
+"""
+Per-node timing traces recorded through a reducer.
+
+In 08-edges.py every node does
+    new_path = state.get("execution_path", []) + ["node_x"]
+by hand, and the path keeps no timing information.
+
+Here nodes are wrapped with `traced(...)`. Each visit appends one trace entry
+to the `trace` state key, a plain dict:
+    - node name
+    - start / end timestamps (time.perf_counter_ns, a monotonic clock)
+    - the routing decision taken after the node, for nodes with a conditional edge
+    - the size of the update the node returned (number of keys and shallow bytes)
+The edge function of a conditional edge is wrapped with `traced_router(...)`,
+which records what it returned (including END) in the entry of the node it
+routes from. Nodes without a conditional edge have `route=None`.
+
+The `trace` key is a `TraceChannel`, the same idea as `AccumulatorChannel` in
+18-accumulator-reducer.py: the `append_trace` reducer takes ownership of the
+list once and then appends to it in place, O(1) amortized per entry. Copies of
+the channel (conditional edges read one) and checkpoints get their own list,
+so the appends are never applied twice nor seen by an earlier checkpoint. The
+trace reads and checkpoints as a plain list of plain dicts.
+`export_jsonl` writes the trace out, one JSON object per line.
+
+The script prints what tracing costs on your machine: the wrapper alone (about
+1 us per node here), and a full graph run against the execution_path version,
+where the difference stayed within the run-to-run noise of about +-6 us per node.
+"""
+import json
+import os
+import tempfile
+import time
+from functools import wraps
+from sys import getsizeof
+from typing import TypedDict, Annotated, Callable, List, Optional
+from langgraph.channels.binop import BinaryOperatorAggregate
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.memory import InMemorySaver
+
+# Number of runs used to measure the tracing overhead
+NUM_RUNS = 1_000
+
+
+# --- 1. Trace entries and the trace reducer ---
+class TraceEntry(TypedDict):
+    """One node visit"""
+    node: str
+    start_ns: int
+    end_ns: int
+    route: Optional[str]
+    delta_keys: int
+    delta_bytes: int
+
+
+def duration_us(entry: TraceEntry) -> float:
+    return (entry["end_ns"] - entry["start_ns"]) / 1000
+
+
+class TraceList(list):
+    """A trace list owned by the `append_trace` reducer, which may extend it in place"""
+    __slots__ = ()
+
+
+def append_trace(current: Optional[List[TraceEntry]], new: List[TraceEntry]) -> List[TraceEntry]:
+    """Reducer: appends the new entries, copying `current` only if it isn't a TraceList yet"""
+    if not isinstance(current, TraceList):
+        current = TraceList(current or [])
+    current.extend(new)
+    return current
+
+
+class TraceChannel(BinaryOperatorAggregate):
+    """Channel for the trace; its copies and checkpoints don't share the appended list"""
+    __slots__ = ("_snapshot",)
+
+    def __init__(self, typ, operator=append_trace):
+        super().__init__(typ, operator)
+        self._snapshot = None
+
+    def copy(self):
+        copied = super().copy()
+        if isinstance(copied.value, TraceList):
+            copied.value = TraceList(copied.value)
+        return copied
+
+    def checkpoint(self):
+        value = super().checkpoint()
+        if not isinstance(value, TraceList):
+            return value
+        # The trace only grows, so a snapshot of the same length is still current
+        if self._snapshot is None or len(self._snapshot) != len(value):
+            self._snapshot = list(value)
+        return self._snapshot
+
+
+def export_jsonl(trace: Optional[List[TraceEntry]], path: str):
+    """Writes the trace to `path`, one JSON object per node visit"""
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in trace or ():
+            f.write(json.dumps(entry) + "\n")
+
+
+# --- 2. The tracing wrapper ---
+def traced(name: str, node: Callable) -> Callable:
+    """Wraps `node` so that each call appends a trace entry to `trace`"""
+    @wraps(node)
+    def run_traced(state):
+        start = time.perf_counter_ns()
+        delta = node(state) or {}
+        end = time.perf_counter_ns()
+
+        entry = {"node": name, "start_ns": start, "end_ns": end, "route": None,
+                 "delta_keys": len(delta), "delta_bytes": sum(map(getsizeof, delta.values()))}
+        return {**delta, "trace": [entry]}
+
+    return run_traced
+
+
+def traced_router(name: str, router: Callable) -> Callable:
+    """
+    Wraps the edge function of a conditional edge leaving the traced node `name`
+    so that its decision is stored as the `route` of that node's entry.
+    """
+    @wraps(router)
+    def route_traced(state):
+        decision = router(state)
+        # The edge function runs in the node's task and sees the node's own
+        # writes: the last entry is the very dict the node is writing
+        entry = state["trace"][-1]
+        if entry["node"] == name:
+            entry["route"] = decision
+        return decision
+
+    return route_traced
+
+
+# --- 3. The 08-edges.py graph, with tracing instead of execution_path ---
+class GraphState(TypedDict):
+    """Represents the state of our graph."""
+    # The initial input provided to the graph.
+    input: str
+    # Node visits, appended by the traced wrapper.
+    trace: Annotated[List[TraceEntry], TraceChannel]
+    # Only used by the 08-edges.py style baseline in the overhead measurement.
+    execution_path: list[str]
+
+
+# The nodes no longer need to touch the path themselves
+def node_a(state: GraphState) -> dict:
+    return {}
+
+
+def node_b(state: GraphState) -> dict:
+    return {}
+
+
+def node_c(state: GraphState) -> dict:
+    """A node in the 'conditional' path."""
+    return {}
+
+
+def node_d(state: GraphState) -> dict:
+    """Another node in the 'conditional' path."""
+    return {}
+
+
+def should_continue(state: GraphState) -> str:
+    """A conditional edge function that routes the graph."""
+    if "go_to_c" in state["input"]:
+        return "continue_c"
+    return "continue_d"
+
+
+def with_execution_path(name: str, node: Callable) -> Callable:
+    """The 08-edges.py approach: copy the path and add the node name"""
+    @wraps(node)
+    def run_with_path(state):
+        delta = node(state) or {}
+        return {**delta, "execution_path": state.get("execution_path", []) + [name]}
+
+    return run_with_path
+
+
+def build_graph(tracing: bool = True, checkpointer=None):
+    """Builds the 08-edges.py graph with tracing, or with the original execution_path"""
+    wrap = traced if tracing else with_execution_path
+    router = traced_router("node_b", should_continue) if tracing else should_continue
+    builder = StateGraph(GraphState)
+
+    builder.add_node("node_a", wrap("node_a", node_a))
+    builder.add_node("node_b", wrap("node_b", node_b))
+    builder.add_node("node_c", wrap("node_c", node_c))
+    builder.add_node("node_d", wrap("node_d", node_d))
+
+    builder.add_edge(START, "node_a")
+    builder.add_edge("node_a", "node_b")
+    builder.add_conditional_edges(
+        "node_b",
+        router,
+        {
+            "continue_c": "node_c",
+            "continue_d": "node_d"
+        }
+    )
+    builder.add_edge("node_c", END)
+    builder.add_edge("node_d", END)
+
+    return builder.compile(checkpointer=checkpointer)
+
+
+# --- 4. Measuring the overhead ---
+def wrapper_overhead_us(num_calls: int = 100_000) -> float:
+    """Cost of the traced wrapper itself, per node call, without graph noise"""
+    state = {"input": "Hello, go_to_c to continue.", "trace": []}
+    plain = node_b
+    wrapped = traced("node_b", node_b)
+
+    start = time.perf_counter()
+    for _ in range(num_calls):
+        plain(state)
+    plain_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(num_calls):
+        wrapped(state)
+    wrapped_time = time.perf_counter() - start
+
+    return (wrapped_time - plain_time) / num_calls * 1e6
+
+
+def graph_overhead_us(num_runs: int, repeats: int = 5) -> float:
+    """Extra time per node visit of a traced graph run over the execution_path version"""
+    inputs = {"input": "Hello, go_to_c to continue."}
+    graphs = {tracing: build_graph(tracing) for tracing in (False, True)}
+    best = {False: float("inf"), True: float("inf")}
+
+    # Alternate between the two graphs and keep the best time of each to reduce noise
+    for _ in range(repeats):
+        for tracing, graph in graphs.items():
+            graph.invoke(inputs)  # warm up
+            start = time.perf_counter()
+            for _ in range(num_runs):
+                graph.invoke(inputs)
+            best[tracing] = min(best[tracing], time.perf_counter() - start)
+
+    nodes_per_run = 3  # A -> B -> C
+    return (best[True] - best[False]) / (num_runs * nodes_per_run) * 1e6
+
+
+if __name__ == "__main__":
+    graph = build_graph()
+
+    for text in ("Hello, this is a message.", "Hello, go_to_c to continue."):
+        final_state = graph.invoke({"input": text})
+        print(f"\nInput: {text!r}")
+        for entry in final_state["trace"]:
+            route = f"  -> {entry['route']}" if entry["route"] is not None else ""
+            print(f"  {entry['node']:<7} {duration_us(entry):>7.1f} us  "
+                  f"delta={entry['delta_keys']} keys / {entry['delta_bytes']} bytes{route}")
+
+    # Checkpoints hold a plain list of dicts, so the graph works with a checkpointer
+    config = {"configurable": {"thread_id": "traced"}}
+    checkpointed = build_graph(checkpointer=InMemorySaver())
+    final_state = checkpointed.invoke({"input": "Hello, go_to_c to continue."}, config)
+    assert [e["node"] for e in final_state["trace"]] == ["node_a", "node_b", "node_c"]
+    assert [e["route"] for e in final_state["trace"]] == [None, "continue_c", None]
+    assert checkpointed.get_state(config).values["trace"] == final_state["trace"]
+
+    # A decision that ends the run is recorded too
+    ending = StateGraph(GraphState)
+    ending.add_node("node_a", traced("node_a", node_a))
+    ending.add_edge(START, "node_a")
+    ending.add_conditional_edges("node_a", traced_router("node_a", lambda state: END))
+    ending_trace = ending.compile().invoke({"input": "stop"})["trace"]
+    assert [(e["node"], e["route"]) for e in ending_trace] == [("node_a", END)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        trace_path = os.path.join(tmp_dir, "trace.jsonl")
+        export_jsonl(final_state["trace"], trace_path)
+        print("\nLast trace exported as JSONL:")
+        with open(trace_path, encoding="utf-8") as f:
+            print(f.read())
+
+    print("--- Tracing overhead ---")
+    print(f"traced wrapper: {wrapper_overhead_us():.2f} us per node")
+    print(f"full graph run vs execution_path: {graph_overhead_us(NUM_RUNS):+.2f} us per node (noisier, includes the reducer)")
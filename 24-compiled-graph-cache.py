@@ -0,0 +1,256 @@
+"""
+A process-wide cache of compiled graphs.
+
+`build_and_run_graph` in 03-graph-state.py and `run_example` in 04-reducers.py
+build a StateGraph and call `compile()` on every call, even when the schema
+and the topology have not changed. Services that build a graph per request
+pay that compile time on every request.
+
+`cached_compile(builder)` instead computes a structural fingerprint of the
+builder:
+    - state, input, output and context schemas
+    - every node name with its callable and all of its options (every field of
+      the node spec: retry and cache policy, timeout, defer...)
+    - edges, waiting edges and conditional edges with their path maps
+    - the compile() keyword arguments (checkpointer, interrupts...)
+and returns the already compiled graph when the same structure was compiled
+before. The cache is a bounded LRU shared by the whole process, with hit/miss stats.
+
+Callables are compared by identity: two closures created by two calls of the
+same factory are different nodes, because they may capture different values.
+"""
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+from operator import add
+from typing import TypedDict, Annotated, List
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langchain_core.messages import HumanMessage
+
+# Number of simulated requests in the benchmark
+NUM_REQUESTS = 2_000
+
+
+# --- 1. The fingerprint ---
+def _freeze(value):
+    """Turns a value into something hashable"""
+    if isinstance(value, dict):
+        # Keys may be of mixed types, which don't compare: sort them by type name, then repr
+        return tuple(sorted(((_freeze(k), _freeze(v)) for k, v in value.items()),
+                            key=lambda item: (type(item[0]).__name__, repr(item[0]))))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(_freeze(v) for v in value)
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else items
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _callable_of(runnable):
+    """The user function behind a node or path, or the runnable itself (e.g. a subgraph)"""
+    return getattr(runnable, "func", None) or getattr(runnable, "afunc", None) or runnable
+
+
+def _node_fingerprint(spec) -> tuple:
+    """Every field of the node spec (callable, retry/cache policy, timeout, defer...), whatever the LangGraph version"""
+    return tuple(
+        (f.name, _callable_of(spec.runnable) if f.name == "runnable" else _freeze(getattr(spec, f.name)))
+        for f in dataclasses.fields(spec)
+    )
+
+
+def graph_fingerprint(builder: StateGraph, **compile_kwargs) -> tuple:
+    """Structural fingerprint of a StateGraph builder plus its compile() arguments"""
+    nodes = tuple((name, _node_fingerprint(spec)) for name, spec in sorted(builder.nodes.items()))
+    branches = tuple(
+        (source, name, _callable_of(branch.path), _freeze(branch.ends))
+        for source, source_branches in sorted(builder.branches.items())
+        for name, branch in sorted(source_branches.items())
+    )
+    return (
+        builder.state_schema,
+        builder.input_schema,
+        builder.output_schema,
+        builder.context_schema,
+        nodes,
+        _freeze(builder.edges),
+        _freeze(builder.waiting_edges),
+        branches,
+        _freeze(compile_kwargs),
+    )
+
+
+# --- 2. The cache ---
+class CompiledGraphCache:
+    """Thread-safe LRU cache of compiled graphs"""
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._graphs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, builder: StateGraph, **compile_kwargs):
+        key = graph_fingerprint(builder, **compile_kwargs)
+
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                self.hits += 1
+                return graph
+            self.misses += 1
+
+        # Compile outside the lock; if two threads race, both results are equivalent
+        graph = builder.compile(**compile_kwargs)
+
+        with self._lock:
+            self._graphs[key] = graph
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_size:
+                self._graphs.popitem(last=False)
+                self.evictions += 1
+        return graph
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._graphs),
+            }
+
+    def clear(self):
+        """Empties the cache and resets the counters"""
+        with self._lock:
+            self._graphs.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# The process-wide cache
+compiled_graphs = CompiledGraphCache()
+
+
+def cached_compile(builder: StateGraph, **compile_kwargs):
+    """Drop-in replacement for builder.compile(**compile_kwargs)"""
+    return compiled_graphs.compile(builder, **compile_kwargs)
+
+
+# --- 3. 03-graph-state.py and 04-reducers.py with the cache ---
+def custom_add(current: int, new: int):
+    return current + new
+
+
+class TypedDictState(TypedDict):
+    messages: Annotated[List[str], add_messages]
+    step_count: Annotated[int, custom_add]
+    private_data: str
+
+
+def node_a(state):
+    """A simple node that updates the state."""
+    return {"messages": ["Step A Completed"], "step_count": 1}
+
+
+def node_b(state):
+    """A simple node that updates the state."""
+    return {"messages": ["Step B Completed"], "step_count": 1}
+
+
+def build_and_run_graph(state_schema, initial_state, use_cache: bool = True):
+    """03-graph-state.py's build_and_run_graph, compiling through the cache"""
+    graph = StateGraph(state_schema)
+    graph.add_node("node_a", node_a)
+    graph.add_node("node_b", node_b)
+    graph.add_edge(START, "node_a")
+    graph.add_edge("node_a", "node_b")
+    graph.add_edge("node_b", END)
+
+    agent = cached_compile(graph) if use_cache else graph.compile()
+    return agent.invoke(initial_state)
+
+
+class StateWithCustomReducer(TypedDict):
+    count: Annotated[int, custom_add]
+    animals: Annotated[List[str], add]
+
+
+class StateWithMessages(TypedDict):
+    messages: Annotated[List[HumanMessage], add_messages]
+
+
+def node_to_update(state: StateWithCustomReducer) -> dict:
+    return {"count": 1, "animals": ["cat"]}
+
+
+def node_messages_reducer(state: StateWithMessages) -> dict:
+    return {"messages": [HumanMessage(content="Hello from the node!")]}
+
+
+def run_example(state_schema: type, node_func: callable, initial_state: dict, use_cache: bool = True):
+    """04-reducers.py's run_example, compiling through the cache"""
+    graph = StateGraph(state_schema)
+    graph.add_node("update_node", node_func)
+    graph.add_edge(START, "update_node")
+    graph.add_edge("update_node", END)
+
+    app = cached_compile(graph) if use_cache else graph.compile()
+    return app.invoke(initial_state)
+
+
+# --- 4. Benchmark ---
+def handle_request(i: int, use_cache: bool):
+    """A mix of the 03 and 04 graphs, as a service would build them per request"""
+    kind = i % 3
+    if kind == 0:
+        build_and_run_graph(TypedDictState, {"messages": [], "step_count": 0, "private_data": ""}, use_cache)
+    elif kind == 1:
+        run_example(StateWithCustomReducer, node_to_update, {"count": 5, "animals": ["lion"]}, use_cache)
+    else:
+        run_example(StateWithMessages, node_messages_reducer,
+                    {"messages": [HumanMessage(content="Initial message.")]}, use_cache)
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+if __name__ == "__main__":
+    final_state = build_and_run_graph(TypedDictState, {"messages": [], "step_count": 0, "private_data": ""})
+    final_state = build_and_run_graph(TypedDictState, {"messages": [], "step_count": 0, "private_data": ""})
+    print(f"Final State: {final_state}")
+    print(f"Cache stats after two identical builds: {compiled_graphs.stats()}")
+
+    # Any node option is part of the key, e.g. a timeout (only allowed on async nodes)
+    async def async_update(state: StateWithCustomReducer) -> dict:
+        return node_to_update(state)
+
+    def timeout_builder(**node_options):
+        builder = StateGraph(StateWithCustomReducer)
+        builder.add_node("update_node", async_update, **node_options)
+        builder.add_edge(START, "update_node")
+        return builder
+    assert cached_compile(timeout_builder()) is not cached_compile(timeout_builder(timeout=0.001))
+    assert _freeze({1: "a", "b": 2, None: 3}) == _freeze({"b": 2, None: 3, 1: "a"})
+
+    print(f"\n--- Benchmark: {NUM_REQUESTS} requests, graph built per request ---")
+    print(f"{'mode':>13} | {'mean ms':>7} | {'p50 ms':>6} | {'p99 ms':>6}")
+    for use_cache in (False, True):
+        compiled_graphs.clear()
+        latencies = []
+        for i in range(NUM_REQUESTS):
+            start = time.perf_counter()
+            handle_request(i, use_cache)
+            latencies.append((time.perf_counter() - start) * 1000)
+        name = "cached" if use_cache else "compile each"
+        print(f"{name:>13} | {sum(latencies) / len(latencies):>7.3f} | "
+              f"{percentile(latencies, 50):>6.3f} | {percentile(latencies, 99):>6.3f}")
+    print(f"Cache stats: {compiled_graphs.stats()}")
@@ -0,0 +1,177 @@
+"""
+Benchmarking the ways to define graph state.
+
+03-graph-state.py shows four ways to define state - dict, TypedDict, a
+dataclass and a Pydantic model - but only runs one of them and measures nothing.
+
+This suite runs the same node_a -> node_b graph under each schema, plus a
+`slots=True` dataclass, at several state sizes (number of messages already in
+state) and reports:
+    - invocations per second
+    - overhead per step (graph time per node, with trivial nodes)
+    - reducer cost (time spent inside add_messages / custom_add per invoke)
+    - memory per state instance, messages included (each instance gets its
+      own freshly built messages, as states coming from separate requests do)
+
+Note: a plain `dict` schema has no reducers, so its nodes overwrite
+`messages` and `step_count` instead of merging them - it does less work.
+"""
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import TypedDict, List, Annotated
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from pydantic import Field, BaseModel
+from langchain_core.messages import BaseMessage, HumanMessage
+
+# Messages already in state for each benchmark row
+STATE_SIZES = (0, 100, 1_000)
+# Invocations per measurement
+NUM_RUNS = 300
+# Instances created for the memory measurement (fewer for large states)
+NUM_INSTANCES = 1_000
+# Upper bound on the messages built for one memory measurement
+MAX_MEASURED_MESSAGES = 100_000
+
+
+# --- 1. Reducers, timed ---
+class ReducerTimer:
+    """Accumulates the time spent inside the reducers"""
+    total = 0.0
+
+
+def timed(reducer):
+    def run_timed(current, new):
+        start = time.perf_counter()
+        try:
+            return reducer(current, new)
+        finally:
+            ReducerTimer.total += time.perf_counter() - start
+
+    run_timed.__name__ = reducer.__name__
+    return run_timed
+
+
+def custom_add(current: int, new: int):
+    return current + new
+
+
+messages_reducer = timed(add_messages)
+step_reducer = timed(custom_add)
+
+
+# --- 2. The schemas (same fields as 03-graph-state.py) ---
+class TypedDictState(TypedDict):
+    messages: Annotated[List[BaseMessage], messages_reducer]
+    step_count: Annotated[int, step_reducer]
+    private_data: str
+
+
+@dataclass
+class DataClassState:
+    messages: Annotated[List[BaseMessage], messages_reducer] = field(default_factory=list)
+    step_count: Annotated[int, step_reducer] = 0
+    private_data: str = ""
+
+
+@dataclass(slots=True)
+class SlottedDataClassState:
+    messages: Annotated[List[BaseMessage], messages_reducer] = field(default_factory=list)
+    step_count: Annotated[int, step_reducer] = 0
+    private_data: str = ""
+
+
+class PydanticState(BaseModel):
+    messages: Annotated[List[BaseMessage], messages_reducer] = Field(default_factory=list)
+    step_count: Annotated[int, step_reducer] = Field(default=0)
+    private_data: str = Field(default="")
+
+
+SCHEMAS = {
+    "dict": dict,
+    "TypedDict": TypedDictState,
+    "dataclass": DataClassState,
+    "slots dataclass": SlottedDataClassState,
+    "Pydantic": PydanticState,
+}
+
+
+# --- 3. The graph (nodes from 03-graph-state.py, without the prints) ---
+def node_a(state):
+    """A simple node that updates the state."""
+    return {"messages": [HumanMessage(content="Step A Completed")], "step_count": 1}
+
+
+def node_b(state):
+    """A simple node that reads and updates the state."""
+    step_count = state["step_count"] if isinstance(state, dict) else state.step_count
+    return {"messages": [HumanMessage(content=f"Step B Completed after {step_count}")], "step_count": 1}
+
+
+def build_graph(state_schema):
+    graph = StateGraph(state_schema)
+    graph.add_node("node_a", node_a)
+    graph.add_node("node_b", node_b)
+    graph.add_edge(START, "node_a")
+    graph.add_edge("node_a", "node_b")
+    graph.add_edge("node_b", END)
+    return graph.compile()
+
+
+def make_messages(size: int) -> List[BaseMessage]:
+    return [HumanMessage(content=f"Message {i}", id=str(i)) for i in range(size)]
+
+
+def make_state(state_schema, messages: List[BaseMessage]):
+    values = {"messages": messages, "step_count": 0, "private_data": ""}
+    if state_schema in (dict, TypedDictState):
+        return dict(values)
+    return state_schema(**values)
+
+
+# --- 4. Measurements ---
+def measure_speed(state_schema, size: int) -> tuple[float, float, float]:
+    """Returns (invocations/sec, us per step, reducer us per invoke)"""
+    graph = build_graph(state_schema)
+    initial_state = make_state(state_schema, make_messages(size))
+    graph.invoke(initial_state)  # warm up
+
+    ReducerTimer.total = 0.0
+    start = time.perf_counter()
+    for _ in range(NUM_RUNS):
+        graph.invoke(initial_state)
+    elapsed = time.perf_counter() - start
+
+    steps_per_run = 2
+    return (
+        NUM_RUNS / elapsed,
+        elapsed / (NUM_RUNS * steps_per_run) * 1e6,
+        ReducerTimer.total / NUM_RUNS * 1e6,
+    )
+
+
+def measure_memory(state_schema, size: int) -> float:
+    """Bytes allocated per state instance, each built from its own new messages"""
+    num_instances = min(NUM_INSTANCES, max(10, MAX_MEASURED_MESSAGES // max(size, 1)))
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    instances = [make_state(state_schema, make_messages(size)) for _ in range(num_instances)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(instances) == num_instances
+    return (after - before) / num_instances
+
+
+if __name__ == "__main__":
+    print(f"--- node_a -> node_b, {NUM_RUNS} invocations per row ---")
+    print(f"{'schema':>16} | {'messages':>8} | {'invokes/s':>9} | {'us/step':>8} | "
+          f"{'reducer us':>10} | {'bytes/instance':>14}")
+    for size in STATE_SIZES:
+        for name, state_schema in SCHEMAS.items():
+            invokes_per_sec, us_per_step, reducer_us = measure_speed(state_schema, size)
+            bytes_per_instance = measure_memory(state_schema, size)
+            print(f"{name:>16} | {size:>8} | {invokes_per_sec:>9.0f} | {us_per_step:>8.1f} | "
+                  f"{reducer_us:>10.1f} | {bytes_per_instance:>14.0f}")
+        print()
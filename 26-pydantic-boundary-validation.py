@@ -0,0 +1,207 @@
+"""
+Boundary-only validation for Pydantic graph state.
+
+With a Pydantic state schema (METHOD 4 in 03-graph-state.py) LangGraph builds
+a new model instance - `PydanticState(**values)` - every time it hands the
+state to a node or a conditional edge, and every one of those runs the full
+Pydantic validation. With a large message list that costs far more than the
+node work itself.
+
+`BoundaryValidatedModel` is a BaseModel whose constructor checks a context
+variable:
+    - "full"     : normal Pydantic behaviour (the default)
+    - "boundary" : intermediate coercions skip validation (model_construct)
+    - "sampled"  : intermediate coercions are validated with probability `sample_rate`
+Any other mode raises ValueError.
+
+`invoke_validated(graph, ...)` validates the graph input, runs the graph in
+the chosen mode, and validates the final output. Updates written by our own
+nodes are trusted in between, and anything invalid they produce is still
+caught at the output boundary.
+
+Only the graph's own state schema is trusted during the run. Any other
+BoundaryValidatedModel built meanwhile - e.g. a node parsing an API response -
+is always fully validated.
+"""
+import random
+import time
+from contextvars import ContextVar
+from typing import ClassVar, List, Annotated, Optional
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from pydantic import Field, BaseModel, ValidationError
+from langchain_core.messages import BaseMessage, HumanMessage
+
+# Benchmark settings
+NUM_STEPS = 50
+NUM_MESSAGES = 10_000
+NUM_RUNS = 5
+
+VALIDATION_MODES = ("full", "boundary", "sampled")
+
+# Validation mode for state coercions inside the graph, and the sampling rate for "sampled"
+validation_mode: ContextVar[str] = ContextVar("validation_mode", default="full")
+sample_rate: ContextVar[float] = ContextVar("sample_rate", default=0.0)
+# The state schema of the running graph: the only model the mode applies to
+trusted_schema: ContextVar[Optional[type]] = ContextVar("trusted_schema", default=None)
+
+
+# --- 1. The model base class ---
+class BoundaryValidatedModel(BaseModel):
+    """BaseModel that skips validation while `validation_mode` says so"""
+
+    # Number of full validations, to show what each mode does
+    validations: ClassVar[int] = 0
+
+    def __init__(self, **data):
+        if not _skip_validation(type(self)):
+            type(self).validations += 1
+            super().__init__(**data)
+            return
+
+        # Trusted data: build the instance without validating, like model_construct()
+        constructed = type(self).model_construct(**data)
+        object.__setattr__(self, "__dict__", constructed.__dict__)
+        object.__setattr__(self, "__pydantic_fields_set__", constructed.__pydantic_fields_set__)
+        object.__setattr__(self, "__pydantic_extra__", constructed.__pydantic_extra__)
+        object.__setattr__(self, "__pydantic_private__", constructed.__pydantic_private__)
+
+
+def _skip_validation(model: type) -> bool:
+    mode = validation_mode.get()
+    if mode == "full" or model is not trusted_schema.get():
+        return False
+    if mode == "boundary":
+        return True
+    if mode == "sampled":
+        return random.random() >= sample_rate.get()
+    raise ValueError(f"unknown validation mode {mode!r}, expected one of {VALIDATION_MODES}")
+
+
+# The state from 03-graph-state.py (METHOD 4) on top of the new base class
+def custom_add(current: int, new: int):
+    return current + new
+
+
+class PydanticState(BoundaryValidatedModel):
+    messages: Annotated[List[BaseMessage], add_messages] = Field(default_factory=list)
+    step_count: Annotated[int, custom_add] = Field(default=0)
+    private_data: str = Field(default="")
+
+
+# --- 2. Running a graph with validation at the boundaries ---
+def invoke_validated(graph, state_schema: type[BaseModel], input, mode: str = "boundary",
+                     rate: float = 0.0, config: Optional[dict] = None) -> BaseModel:
+    """
+    Validates `input`, runs `graph` in `mode` and returns the validated final state.
+
+    `mode="full"` is the same as a plain graph.invoke.
+    """
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"unknown validation mode {mode!r}, expected one of {VALIDATION_MODES}")
+    if isinstance(input, dict):
+        input = state_schema.model_validate(input)
+
+    mode_token = validation_mode.set(mode)
+    rate_token = sample_rate.set(rate)
+    schema_token = trusted_schema.set(state_schema)
+    try:
+        # LangGraph copies the context into the threads that run the nodes
+        output = graph.invoke(input, config)
+    finally:
+        validation_mode.reset(mode_token)
+        sample_rate.reset(rate_token)
+        trusted_schema.reset(schema_token)
+
+    return state_schema.model_validate(output)
+
+
+# --- 3. A 50-step graph ---
+def step_node(state: PydanticState) -> dict:
+    """Reads the state and adds one to the step count"""
+    return {"step_count": 1}
+
+
+def continue_or_end(state: PydanticState) -> str:
+    return END if state.step_count >= NUM_STEPS else "step_node"
+
+
+def bad_node(state: PydanticState) -> dict:
+    """A buggy node that writes the wrong type into private_data"""
+    return {"private_data": {"not": "a string"}}
+
+
+class WeatherReport(BoundaryValidatedModel):
+    """Untrusted data a node receives from outside the graph"""
+    temperature: float
+
+
+def api_node(state: PydanticState) -> dict:
+    """Parses an external API response - always validated, whatever the mode"""
+    report = WeatherReport(temperature="very hot")
+    return {"private_data": f"{report.temperature} degrees"}
+
+
+def build_graph(first_node=None):
+    builder = StateGraph(PydanticState)
+    builder.add_node("step_node", step_node)
+    if first_node is not None:
+        builder.add_node(first_node.__name__, first_node)
+        builder.add_edge(START, first_node.__name__)
+        builder.add_edge(first_node.__name__, "step_node")
+    else:
+        builder.add_edge(START, "step_node")
+    builder.add_conditional_edges("step_node", continue_or_end)
+    return builder.compile()
+
+
+if __name__ == "__main__":
+    graph = build_graph()
+    config = {"recursion_limit": NUM_STEPS * 2 + 10}
+
+    print("--- Invalid input is still rejected at the boundary ---")
+    try:
+        invoke_validated(graph, PydanticState, {"step_count": "not a number"}, config=config)
+    except ValidationError as e:
+        print(f"Input rejected: {e.errors()[0]['msg']}")
+
+    print("\n--- Invalid intermediate updates are caught at the output ---")
+    try:
+        invoke_validated(build_graph(bad_node), PydanticState, {}, config=config)
+    except ValidationError as e:
+        print(f"Output rejected: {e.errors()[0]['loc']} {e.errors()[0]['msg']}")
+
+    print("\n--- Other models built during the run are still validated ---")
+    try:
+        invoke_validated(build_graph(api_node), PydanticState, {}, config=config)
+        raise AssertionError("untrusted data was not validated")
+    except ValidationError as e:
+        print(f"API response rejected: {e.errors()[0]['loc']} {e.errors()[0]['msg']}")
+
+    try:
+        invoke_validated(graph, PydanticState, {}, mode="bondary", config=config)
+        raise AssertionError("an unknown mode was accepted")
+    except ValueError as e:
+        print(f"ValueError: {e}")
+
+    print(f"\n--- Benchmark: {NUM_STEPS}-step graph, {NUM_MESSAGES} messages in state ---")
+    messages = [HumanMessage(content=f"Message {i}", id=str(i)) for i in range(NUM_MESSAGES)]
+    initial_state = {"messages": messages}
+
+    print(f"{'mode':>14} | {'ms/invoke':>9} | {'validations/invoke':>18} | {'saving':>6}")
+    baseline = None
+    for name, mode, rate in (
+        ("full", "full", 0.0),
+        ("sampled 10%", "sampled", 0.1),
+        ("boundary", "boundary", 0.0),
+    ):
+        PydanticState.validations = 0
+        start = time.perf_counter()
+        for _ in range(NUM_RUNS):
+            final_state = invoke_validated(graph, PydanticState, initial_state, mode, rate, config)
+        elapsed = (time.perf_counter() - start) / NUM_RUNS * 1000
+        assert final_state.step_count == NUM_STEPS and len(final_state.messages) == NUM_MESSAGES
+
+        baseline = baseline or elapsed
+        print(f"{name:>14} | {elapsed:>9.1f} | {PydanticState.validations / NUM_RUNS:>18.1f} | "
+              f"{1 - elapsed / baseline:>6.0%}")
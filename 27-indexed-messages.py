@@ -0,0 +1,337 @@
+"""
+An indexed drop-in for the add_messages reducer, for very long message lists.
+
+`add_messages` (04-reducers.py, 05-add_messages.py, MessagesState in
+06-graph-messages.py) does this on EVERY update:
+    - converts every existing message again (convert_to_messages)
+    - copies the whole list
+    - rebuilds the id -> position map
+so appending one message to a 100k-message thread costs O(100k).
+
+`indexed_add_messages` has the same semantics (append, replace by id,
+RemoveMessage, REMOVE_ALL_MESSAGES), but returns an `IndexedMessages` sequence:
+    - a view (first `length` items) over a shared append-only backing list
+    - plus a shared id -> position index
+Appending to the newest view just appends to the backing list and returns a
+view one item longer - O(1). Older views keep their own length, so a value
+handed out earlier never changes. Replacing or removing messages (rare)
+copies the list, like add_messages does.
+
+The `format="langchain-openai"` option of add_messages is not supported.
+
+Use it through `IndexedMessagesChannel`:
+    messages: Annotated[List[BaseMessage], IndexedMessagesChannel]
+The channel checkpoints the messages as a plain list, which every checkpointer
+serializes; a restored thread gets a fresh index on its next update. Pickling
+an IndexedMessages (e.g. `pickle_fallback=True`) also stores only the messages
+of that view, never the shared backing list.
+"""
+import pickle
+import random
+import time
+import uuid
+from collections.abc import Sequence
+from itertools import islice
+from typing import TypedDict, Annotated, Dict, List, Optional
+from langgraph.channels.binop import BinaryOperatorAggregate
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages, REMOVE_ALL_MESSAGES
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    convert_to_messages,
+    message_chunk_to_message,
+)
+
+# Benchmark settings
+NUM_MESSAGES = 100_000
+NUM_APPENDS = 200
+NUM_EQUIVALENCE_CASES = 500
+
+
+# --- 1. The indexed message sequence ---
+class IndexedMessages(Sequence):
+    """Read-only view over the first `length` messages of a shared backing list"""
+    __slots__ = ("_store", "_index", "_length")
+
+    def __init__(self, store: List[BaseMessage], index: Dict[str, int], length: int):
+        self._store = store
+        self._index = index
+        self._length = length
+
+    @classmethod
+    def from_messages(cls, messages: List[BaseMessage]) -> "IndexedMessages":
+        store = list(messages)
+        index = {m.id: i for i, m in enumerate(store)}
+        return cls(store, index, len(store))
+
+    def position(self, message_id: str) -> Optional[int]:
+        """Position of `message_id` in this view - O(1)"""
+        pos = self._index.get(message_id)
+        # The shared index may also know about messages appended to newer views
+        if pos is not None and pos < self._length and self._store[pos].id == message_id:
+            return pos
+        return None
+
+    def append_new(self, messages: List[BaseMessage]) -> "IndexedMessages":
+        """A view with `messages` (all with new ids) appended"""
+        if self._length == len(self._store):
+            store, index = self._store, self._index
+        else:
+            # Someone already appended to this value - start a new backing list
+            store = self._store[:self._length]
+            index = {m.id: i for i, m in enumerate(store)}
+
+        for m in messages:
+            index[m.id] = len(store)
+            store.append(m)
+        return IndexedMessages(store, index, len(store))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._store[j] for j in range(self._length)[i]]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("message index out of range")
+        return self._store[i]
+
+    def __iter__(self):
+        return islice(self._store, self._length)
+
+    def __add__(self, other) -> list:
+        # Keeps `state["messages"] + [new_message]` (05-add_messages.py) working
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> list:
+        return list(other) + list(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (IndexedMessages, list)):
+            return len(self) == len(other) and all(a is b or a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"IndexedMessages({list(self)!r})"
+
+    def __reduce__(self):
+        # Only this view's messages; the index is rebuilt when unpickled
+        return IndexedMessages.from_messages, (list(self),)
+
+
+# --- 2. The reducer ---
+def _coerce(messages) -> List[BaseMessage]:
+    """Same coercion as add_messages: list, BaseMessage objects, ids assigned"""
+    if not isinstance(messages, list):
+        messages = [messages]
+    messages = [message_chunk_to_message(m) for m in convert_to_messages(messages)]
+    for m in messages:
+        if m.id is None:
+            m.id = str(uuid.uuid4())
+    return messages
+
+
+def indexed_add_messages(left, right) -> IndexedMessages:
+    """Drop-in replacement for add_messages with O(1) appends"""
+    if not isinstance(left, IndexedMessages):
+        left = IndexedMessages.from_messages(_coerce(left))
+    right = _coerce(right)
+
+    for idx in range(len(right) - 1, -1, -1):
+        if isinstance(right[idx], RemoveMessage) and right[idx].id == REMOVE_ALL_MESSAGES:
+            return IndexedMessages.from_messages(right[idx + 1:])
+
+    # Fast path: only new messages with distinct ids
+    new_ids = {m.id for m in right}
+    if (
+        len(new_ids) == len(right)
+        and not any(isinstance(m, RemoveMessage) for m in right)
+        and all(left.position(m.id) is None for m in right)
+    ):
+        return left.append_new(right)
+
+    # Slow path: replacements and removals, exactly like add_messages
+    merged = list(left)
+    merged_by_id = {m.id: i for i, m in enumerate(merged)}
+    ids_to_remove = set()
+    for m in right:
+        if (existing_idx := merged_by_id.get(m.id)) is not None:
+            if isinstance(m, RemoveMessage):
+                ids_to_remove.add(m.id)
+            else:
+                ids_to_remove.discard(m.id)
+                merged[existing_idx] = m
+        else:
+            if isinstance(m, RemoveMessage):
+                raise ValueError(f"Attempting to delete a message with an ID that doesn't exist ('{m.id}')")
+            merged_by_id[m.id] = len(merged)
+            merged.append(m)
+    return IndexedMessages.from_messages([m for m in merged if m.id not in ids_to_remove])
+
+
+class IndexedMessagesChannel(BinaryOperatorAggregate):
+    """Reducer channel for `indexed_add_messages` that checkpoints a plain list"""
+    __slots__ = ("_checkpointed", "_snapshot")
+
+    def __init__(self, typ, operator=indexed_add_messages):
+        super().__init__(typ, operator)
+        self._checkpointed = self._snapshot = None
+
+    def checkpoint(self):
+        value = super().checkpoint()
+        if not isinstance(value, IndexedMessages):
+            return value
+        # Views never change, so the snapshot of the same view is still current
+        if value is not self._checkpointed:
+            self._checkpointed, self._snapshot = value, list(value)
+        return self._snapshot
+
+
+# --- 3. Equivalence checks against add_messages ---
+def random_update(rng: random.Random, existing_ids: List[str], next_id: List[int]) -> list:
+    """A random mix of appends, replacements, removals and id-less messages"""
+    update = []
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.random()
+        if kind < 0.45 or not existing_ids:
+            next_id[0] += 1
+            update.append(HumanMessage(content=f"new {next_id[0]}", id=f"m{next_id[0]}"))
+        elif kind < 0.6:
+            update.append(AIMessage(content="no id"))
+        elif kind < 0.8:
+            update.append(AIMessage(content="replaced", id=rng.choice(existing_ids)))
+        elif kind < 0.97:
+            update.append(RemoveMessage(id=rng.choice(existing_ids)))
+        else:
+            update.append(RemoveMessage(id=REMOVE_ALL_MESSAGES))
+    return update
+
+
+def comparable(messages) -> list:
+    # Id-less messages get random uuids, so compare those by type and content only
+    return [(m.type, m.content, m.id if str(m.id).startswith("m") else None) for m in messages]
+
+
+def check_equivalence(num_cases: int) -> int:
+    """Runs random update sequences through both reducers; returns the number of checked steps"""
+    rng = random.Random(0)
+    checked = 0
+    for _ in range(num_cases):
+        expected: list = [HumanMessage(content="first", id="m0")]
+        actual = list(expected)
+        next_id = [0]
+        for _ in range(rng.randint(1, 12)):
+            update = random_update(rng, [m.id for m in expected], next_id)
+
+            # Both reducers get their own copies, add_messages assigns ids in place
+            try:
+                expected_result = add_messages(expected, [m.model_copy() for m in update])
+            except ValueError:
+                expected_result = ValueError
+            try:
+                actual_result = indexed_add_messages(actual, [m.model_copy() for m in update])
+            except ValueError:
+                actual_result = ValueError
+
+            if expected_result is ValueError or actual_result is ValueError:
+                assert expected_result is actual_result, f"different errors for {update}"
+                break
+
+            assert comparable(actual_result) == comparable(expected_result), f"mismatch for {update}"
+            # Continue both from the same messages, so the generated uuids stay aligned
+            actual = actual_result
+            expected = list(actual_result)
+            checked += 1
+    return checked
+
+
+def check_views_are_stable():
+    """Values handed out earlier never change"""
+    first = indexed_add_messages([], [HumanMessage(content="a", id="a")])
+    second = indexed_add_messages(first, [HumanMessage(content="b", id="b")])
+    branch = indexed_add_messages(first, [HumanMessage(content="c", id="c")])
+    replaced = indexed_add_messages(second, [HumanMessage(content="A", id="a")])
+
+    assert [m.content for m in first] == ["a"]
+    assert [m.content for m in second] == ["a", "b"]
+    assert [m.content for m in branch] == ["a", "c"]
+    assert [m.content for m in replaced] == ["A", "b"]
+    assert branch.position("b") is None and second.position("c") is None
+
+    # A pickled view holds its own messages only
+    restored = pickle.loads(pickle.dumps(branch))
+    assert [m.content for m in restored] == ["a", "c"] and len(restored._store) == 2
+    assert restored.position("c") == 1
+
+
+def check_checkpointing():
+    """Threads using the indexed reducer are saved and resumed by a checkpointer"""
+    graph = build_graph(IndexedMessagesState, checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "indexed"}}
+    graph.invoke({"messages": [HumanMessage(content="Hello", id="h0")]}, config)
+    final_state = graph.invoke({"messages": [HumanMessage(content="Again", id="h1")]}, config)
+    assert [m.content for m in final_state["messages"]] == ["Hello", "Reply to: Hello", "Again", "Reply to: Again"]
+    assert graph.get_state(config).values["messages"] == final_state["messages"]
+
+
+# --- 4. Using it in a graph ---
+class IndexedMessagesState(TypedDict):
+    messages: Annotated[List[BaseMessage], IndexedMessagesChannel]
+
+
+class MessagesListState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+
+
+def chat_node(state) -> dict:
+    last_message = state["messages"][-1]
+    return {"messages": AIMessage(content=f"Reply to: {last_message.content}")}
+
+
+def build_graph(state_schema, checkpointer=None):
+    builder = StateGraph(state_schema)
+    builder.add_node("chat_node", chat_node)
+    builder.add_edge(START, "chat_node")
+    builder.add_edge("chat_node", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+# --- 5. Benchmark ---
+def time_appends(reducer, size: int, num_appends: int) -> float:
+    """Mean time of a single-message append to a `size`-message history (ms)"""
+    history = reducer([], [HumanMessage(content=f"Message {i}", id=str(i)) for i in range(size)])
+    start = time.perf_counter()
+    for i in range(num_appends):
+        history = reducer(history, AIMessage(content=f"Reply {i}", id=f"reply-{i}"))
+    return (time.perf_counter() - start) / num_appends * 1000
+
+
+if __name__ == "__main__":
+    print("--- Equivalence with add_messages ---")
+    check_views_are_stable()
+    check_checkpointing()
+    print(f"{check_equivalence(NUM_EQUIVALENCE_CASES)} random updates produced identical results")
+
+    graph = build_graph(IndexedMessagesState)
+    final_state = graph.invoke({"messages": [HumanMessage(content="Hello there!")]})
+    print(f"\nGraph run: {[m.content for m in final_state['messages']]}")
+
+    print(f"\n--- Benchmark: appending 1 message to {NUM_MESSAGES} messages ---")
+    add_ms = time_appends(add_messages, NUM_MESSAGES, NUM_APPENDS // 10)
+    indexed_ms = time_appends(indexed_add_messages, NUM_MESSAGES, NUM_APPENDS)
+    print(f"{'add_messages':>20}: {add_ms:>9.3f} ms per append")
+    print(f"{'indexed_add_messages':>20}: {indexed_ms:>9.3f} ms per append ({add_ms / indexed_ms:.0f}x faster)")
+
+    print(f"\n--- Benchmark: one graph turn with {NUM_MESSAGES} messages in the input ---")
+    history = [HumanMessage(content=f"Message {i}", id=str(i)) for i in range(NUM_MESSAGES)]
+    for name, state_schema in (("add_messages", MessagesListState), ("indexed_add_messages", IndexedMessagesState)):
+        graph = build_graph(state_schema)
+        start = time.perf_counter()
+        graph.invoke({"messages": history})
+        print(f"{name:>20}: {(time.perf_counter() - start) * 1000:>9.1f} ms per turn")
@@ -0,0 +1,265 @@
+"""
+NumPy-backed reducers for counter, histogram and score-vector state fields.
+
+`custom_add` in 03-graph-state.py and `custom_increment` in 04-reducers.py
+merge one integer at a time. With hundreds or thousands of per-category
+counters the natural Python version is a dict of ints, merged key by key:
+    {k: current.get(k, 0) + new.get(k, 0) for k in current.keys() | new.keys()}
+which is slow when many parallel branches fan in at once.
+
+Here every counter field is a NumPy array with one slot per category
+(`CATEGORY_INDEX` maps category names to slots), and the reducers merge whole
+arrays in one vectorised operation:
+    - vector_sum        : elementwise sum (counters)
+    - vector_max / min  : elementwise max / min (peak latency, best score...)
+    - histogram_merge   : adds the bin counts of two Histograms with the same bins
+    - running_stats_merge : merges per-category count / mean / variance (Chan et al.)
+
+Checkpoints stay compact: LangGraph's serializer stores NumPy arrays as their
+raw buffer (8 bytes per int64 slot) instead of a msgpack map of key -> int.
+Histogram and RunningStats are NamedTuples of arrays; a checkpointer needs them
+in `allowed_msgpack_modules` of its serializer to load them back.
+"""
+import time
+from typing import TypedDict, Annotated, Dict, List, NamedTuple
+import numpy as np
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# Number of categories (counter keys)
+NUM_KEYS = 10_000
+# Number of parallel branches that fan in
+NUM_BRANCHES = 32
+# Number of graph runs per benchmark row
+NUM_RUNS = 20
+
+CATEGORIES = [f"category-{i}" for i in range(NUM_KEYS)]
+CATEGORY_INDEX = {name: i for i, name in enumerate(CATEGORIES)}
+
+# Latency histogram bins (ms), shared by every Histogram
+LATENCY_BINS = np.array([0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, np.inf])
+
+
+# --- 1. Vector reducers ---
+def vector_sum(current: np.ndarray, new: np.ndarray) -> np.ndarray:
+    return np.add(current, new)
+
+
+def vector_max(current: np.ndarray, new: np.ndarray) -> np.ndarray:
+    return np.maximum(current, new)
+
+
+def vector_min(current: np.ndarray, new: np.ndarray) -> np.ndarray:
+    return np.minimum(current, new)
+
+
+def counts_to_vector(counts: Dict[str, int]) -> np.ndarray:
+    """Turns a {category: count} dict into a counter vector"""
+    vector = np.zeros(NUM_KEYS, dtype=np.int64)
+    for name, count in counts.items():
+        vector[CATEGORY_INDEX[name]] += count
+    return vector
+
+
+# --- 2. Histograms ---
+class Histogram(NamedTuple):
+    edges: np.ndarray
+    counts: np.ndarray
+
+    @classmethod
+    def of(cls, samples, edges: np.ndarray = LATENCY_BINS) -> "Histogram":
+        counts, _ = np.histogram(samples, bins=edges)
+        return cls(edges, counts.astype(np.int64))
+
+
+def histogram_merge(current: Histogram, new: Histogram) -> Histogram:
+    if current.edges is not new.edges and not np.array_equal(current.edges, new.edges):
+        raise ValueError("Cannot merge histograms with different bin edges")
+    return Histogram(current.edges, current.counts + new.counts)
+
+
+# --- 3. Running mean / variance per category ---
+class RunningStats(NamedTuple):
+    count: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray  # sum of squared differences from the mean
+
+    @classmethod
+    def of(cls, samples: np.ndarray) -> "RunningStats":
+        """Stats of a (num_samples, NUM_KEYS) array"""
+        mean = samples.mean(axis=0)
+        return cls(
+            np.full(samples.shape[1], samples.shape[0], dtype=np.int64),
+            mean,
+            ((samples - mean) ** 2).sum(axis=0),
+        )
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance (NaN where there are fewer than two samples)"""
+        return np.divide(self.m2, self.count - 1, out=np.full_like(self.m2, np.nan), where=self.count > 1)
+
+
+def running_stats_merge(current: RunningStats, new: RunningStats) -> RunningStats:
+    """Parallel merge of two sets of per-category stats"""
+    count = current.count + new.count
+    delta = new.mean - current.mean
+    weight = np.divide(new.count, count, out=np.zeros_like(delta), where=count > 0)
+    return RunningStats(
+        count,
+        current.mean + delta * weight,
+        current.m2 + new.m2 + delta ** 2 * current.count * weight,
+    )
+
+
+# --- 4. The dict-of-ints reducers they replace ---
+def dict_sum(current: Dict[str, int], new: Dict[str, int]) -> Dict[str, int]:
+    return {k: current.get(k, 0) + new.get(k, 0) for k in current.keys() | new.keys()}
+
+
+def dict_max(current: Dict[str, float], new: Dict[str, float]) -> Dict[str, float]:
+    return {k: max(current.get(k, float("-inf")), new.get(k, float("-inf"))) for k in current.keys() | new.keys()}
+
+
+# --- 5. A fan-in graph ---
+class VectorState(TypedDict):
+    num_branches: int
+    counts: Annotated[np.ndarray, vector_sum]
+    peak_latency: Annotated[np.ndarray, vector_max]
+    latency_histogram: Annotated[Histogram, histogram_merge]
+    scores: Annotated[RunningStats, running_stats_merge]
+
+
+class DictState(TypedDict):
+    num_branches: int
+    counts: Annotated[Dict[str, int], dict_sum]
+    peak_latency: Annotated[Dict[str, float], dict_max]
+
+
+class BranchState(TypedDict):
+    branch: int
+
+
+def make_branch_data(num_branches: int) -> List[dict]:
+    """What each branch observed, generated up front so the benchmark only times the merging"""
+    rng = np.random.default_rng(0)
+    data = []
+    for _ in range(num_branches):
+        counts = rng.integers(0, 5, NUM_KEYS, dtype=np.int64)
+        latency = rng.exponential(20.0, NUM_KEYS)
+        data.append({
+            "counts": counts,
+            "peak_latency": latency,
+            "latency_histogram": Histogram.of(latency),
+            "scores": RunningStats.of(rng.normal(0.5, 0.1, (4, NUM_KEYS))),
+            "counts_dict": dict(zip(CATEGORIES, counts.tolist())),
+            "peak_latency_dict": dict(zip(CATEGORIES, latency.tolist())),
+        })
+    return data
+
+
+BRANCH_DATA = make_branch_data(NUM_BRANCHES)
+
+
+def fan_out(state) -> List[Send]:
+    return [Send("observe", {"branch": i}) for i in range(state["num_branches"])]
+
+
+def observe_vectors(state: BranchState) -> dict:
+    data = BRANCH_DATA[state["branch"]]
+    return {
+        "counts": data["counts"],
+        "peak_latency": data["peak_latency"],
+        "latency_histogram": data["latency_histogram"],
+        "scores": data["scores"],
+    }
+
+
+def observe_dicts(state: BranchState) -> dict:
+    data = BRANCH_DATA[state["branch"]]
+    return {"counts": data["counts_dict"], "peak_latency": data["peak_latency_dict"]}
+
+
+def build_graph(state_schema, observe):
+    builder = StateGraph(state_schema)
+    builder.add_node("observe", observe)
+    builder.add_conditional_edges(START, fan_out, ["observe"])
+    builder.add_edge("observe", END)
+    return builder.compile()
+
+
+# --- 6. Benchmark ---
+def time_merges(reducer, values: list, repeats: int = 5) -> float:
+    """Mean time (us) of one reducer call while folding `values`"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        current = values[0]
+        for value in values[1:]:
+            current = reducer(current, value)
+        best = min(best, time.perf_counter() - start)
+    return best / (len(values) - 1) * 1e6
+
+
+def time_graph(graph) -> float:
+    """Mean ms per graph run"""
+    graph.invoke({"num_branches": NUM_BRANCHES})  # warm up
+    start = time.perf_counter()
+    for _ in range(NUM_RUNS):
+        graph.invoke({"num_branches": NUM_BRANCHES})
+    return (time.perf_counter() - start) / NUM_RUNS * 1000
+
+
+if __name__ == "__main__":
+    vector_graph = build_graph(VectorState, observe_vectors)
+    final_state = vector_graph.invoke({"num_branches": NUM_BRANCHES})
+
+    # The vectorised merges give the same answers as merging everything at once
+    all_counts = np.stack([d["counts"] for d in BRANCH_DATA])
+    all_latency = np.stack([d["peak_latency"] for d in BRANCH_DATA])
+    assert np.array_equal(final_state["counts"], all_counts.sum(axis=0))
+    assert np.array_equal(final_state["peak_latency"], all_latency.max(axis=0))
+    assert np.array_equal(final_state["latency_histogram"].counts, Histogram.of(all_latency).counts)
+    assert final_state["scores"].count[0] == 4 * NUM_BRANCHES
+
+    dict_graph = build_graph(DictState, observe_dicts)
+    dict_state = dict_graph.invoke({"num_branches": NUM_BRANCHES})
+    assert dict_state["counts"]["category-0"] == final_state["counts"][0]
+
+    name = CATEGORIES[0]
+    print(f"{name}: count={final_state['counts'][0]}  peak latency={final_state['peak_latency'][0]:.1f} ms  "
+          f"score mean={final_state['scores'].mean[0]:.3f} var={final_state['scores'].variance[0]:.4f}")
+    print(f"Latency histogram: {final_state['latency_histogram'].counts.tolist()}")
+
+    print(f"\n--- Benchmark: {NUM_KEYS} keys ---")
+    counts_vectors = [d["counts"] for d in BRANCH_DATA]
+    counts_dicts = [d["counts_dict"] for d in BRANCH_DATA]
+    latency_vectors = [d["peak_latency"] for d in BRANCH_DATA]
+    latency_dicts = [d["peak_latency_dict"] for d in BRANCH_DATA]
+    print(f"{'merge':>16} | {'dict us':>9} | {'numpy us':>9} | {'speedup':>7}")
+    for merge, dict_args, vector_args in (
+        ("sum", (dict_sum, counts_dicts), (vector_sum, counts_vectors)),
+        ("max", (dict_max, latency_dicts), (vector_max, latency_vectors)),
+    ):
+        dict_us = time_merges(*dict_args)
+        vector_us = time_merges(*vector_args)
+        print(f"{merge:>16} | {dict_us:>9.1f} | {vector_us:>9.1f} | {dict_us / vector_us:>6.0f}x")
+    print(f"{'histogram':>16} | {'':>9} | {time_merges(histogram_merge, [d['latency_histogram'] for d in BRANCH_DATA]):>9.1f} |")
+    print(f"{'running stats':>16} | {'':>9} | {time_merges(running_stats_merge, [d['scores'] for d in BRANCH_DATA]):>9.1f} |")
+
+    dict_ms = time_graph(dict_graph)
+    vector_ms = time_graph(vector_graph)
+    print(f"\nGraph with {NUM_BRANCHES} branches fanning in (sum + max):")
+    print(f"  dict of ints: {dict_ms:>7.1f} ms per run")
+    print(f"  numpy       : {vector_ms:>7.1f} ms per run (also merging the histogram and running stats)")
+
+    # Histogram and RunningStats are our own types, so the checkpoint serializer must allow them
+    serde = JsonPlusSerializer(allowed_msgpack_modules=[(__name__, "Histogram"), (__name__, "RunningStats")])
+    _, dict_bytes = serde.dumps_typed(dict_state["counts"])
+    _, vector_bytes = serde.dumps_typed(final_state["counts"])
+    _, stats_bytes = serde.dumps_typed(final_state["scores"])
+    assert np.array_equal(serde.loads_typed(("msgpack", vector_bytes)), final_state["counts"])
+    assert np.array_equal(serde.loads_typed(("msgpack", stats_bytes)).m2, final_state["scores"].m2)
+    print(f"\nCheckpoint size of `counts`: dict {len(dict_bytes) / 1024:.0f} KiB, numpy {len(vector_bytes) / 1024:.0f} KiB")
+    print(f"Checkpoint size of `scores` (count, mean, m2): {len(stats_bytes) / 1024:.0f} KiB")
@@ -0,0 +1,414 @@
+"""
+Compact message storage for long MessagesState threads.
+
+`MyGraphState(MessagesState)` in 06-graph-messages.py keeps every turn as a
+full HumanMessage / AIMessage: a Pydantic model with its own __dict__, empty
+additional_kwargs / response_metadata dicts, a type string and an id string.
+That is about 1 KB per message before counting the text.
+
+Here the history is a `CompactHistory`:
+    - one `StringArena` per history: every content and id string is UTF-8
+      encoded into a single shared bytearray, with an offsets array
+    - one `CompactMessage` per message: a `__slots__` record holding the
+      interned type ("human", "ai", ...), a reference into the arena and, only
+      when the message has any, the extra fields (tool_calls, name...)
+    - BaseMessage objects are only created when a message is read, e.g. when
+      a node picks `state["messages"][-1]` or builds the prompt for the LLM
+
+`add_compact_messages` is the reducer. It has the add_messages semantics
+(append, replace by id, RemoveMessage, REMOVE_ALL_MESSAGES). Like
+IndexedMessages in 27-indexed-messages.py, a shared id -> position index
+finds a message by id in O(1), appending to the latest value is O(1), and
+values handed out earlier never change. The index costs about 150 bytes per
+message, on top of the record and the arena.
+
+The arena is append-only: replaced or removed messages leave their text
+behind until the history is rebuilt (REMOVE_ALL_MESSAGES starts a new arena).
+
+Note: checkpointers cannot serialize CompactHistory out of the box. To use it
+with one, create the checkpointer with `serde=JsonPlusSerializer(pickle_fallback=True)`.
+"""
+import sys
+import time
+import tracemalloc
+import uuid
+from array import array
+from collections.abc import Sequence
+from itertools import islice
+from typing import Annotated, Dict, Iterator, List, Optional, TypedDict
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph.message import add_messages, REMOVE_ALL_MESSAGES
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    ChatMessage,
+    FunctionMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+    convert_to_messages,
+    message_chunk_to_message,
+)
+
+# Number of messages in the memory benchmark
+NUM_MESSAGES = 1_000_000
+# Messages created at a time while filling the compact history
+CHUNK_SIZE = 10_000
+
+MESSAGE_CLASSES = {
+    cls.model_fields["type"].default: cls
+    for cls in (HumanMessage, AIMessage, SystemMessage, ToolMessage, ChatMessage, FunctionMessage)
+}
+
+
+# --- 1. The string arena ---
+class StringArena:
+    """Append-only store of strings in one bytearray, NUL separated"""
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self):
+        self._buffer = bytearray(b"\0")
+        self._offsets = array("Q", [1])  # start of each string, plus the end of the last one
+
+    def add(self, text: str) -> int:
+        data = text.encode("utf-8", "surrogatepass")
+        self._buffer += data
+        self._buffer.append(0)
+        self._offsets.append(len(self._buffer))
+        return len(self._offsets) - 2
+
+    def get(self, ref: int) -> str:
+        return self._buffer[self._offsets[ref]:self._offsets[ref + 1] - 1].decode("utf-8", "surrogatepass")
+
+
+# --- 2. The message record ---
+class CompactMessage:
+    """
+    One message. `ref` points at its content in the arena, and `ref + 1` at its id.
+
+    `extras` holds the fields that were set besides content and id, or None.
+    Non-string content (e.g. multimodal lists) is kept in `extras` as well.
+    """
+    __slots__ = ("arena", "type", "ref", "extras")
+
+    def __init__(self, arena: StringArena, type: str, ref: int, extras: Optional[dict]):
+        self.arena = arena
+        self.type = type
+        self.ref = ref
+        self.extras = extras
+
+    @classmethod
+    def from_message(cls, message: BaseMessage, arena: StringArena) -> "CompactMessage":
+        extras = {f: getattr(message, f) for f in message.model_fields_set if f not in ("content", "id", "type")}
+        if type(message) is not MESSAGE_CLASSES.get(message.type):
+            extras["__class__"] = type(message)
+
+        content = message.content
+        if not isinstance(content, str):
+            extras["content"] = content
+            content = ""
+        ref = arena.add(content)
+        arena.add(message.id)
+        return cls(arena, sys.intern(message.type), ref, extras or None)
+
+    @property
+    def content(self):
+        if self.extras is not None and "content" in self.extras:
+            return self.extras["content"]
+        return self.arena.get(self.ref)
+
+    @property
+    def id(self) -> str:
+        return self.arena.get(self.ref + 1)
+
+    def to_message(self) -> BaseMessage:
+        fields = {"content": self.arena.get(self.ref), "id": self.id}
+        cls = MESSAGE_CLASSES[self.type]
+        if self.extras is not None:
+            fields.update(self.extras)
+            cls = fields.pop("__class__", cls)
+        return cls(**fields)
+
+
+# --- 3. The history ---
+class CompactHistory(Sequence):
+    """
+    Read-only view over the first `length` records of a shared record list.
+
+    Indexing returns BaseMessage objects, created on demand.
+    """
+    __slots__ = ("_arena", "_records", "_index", "_length")
+
+    def __init__(self, arena: StringArena, records: List[CompactMessage], index: Dict[str, int], length: int):
+        self._arena = arena
+        self._records = records
+        self._index = index
+        self._length = length
+
+    @classmethod
+    def from_messages(cls, messages: List[BaseMessage]) -> "CompactHistory":
+        arena = StringArena()
+        records = [CompactMessage.from_message(m, arena) for m in messages]
+        index = {m.id: i for i, m in enumerate(messages)}
+        return cls(arena, records, index, len(records))
+
+    def position(self, message_id: str) -> Optional[int]:
+        """Position of the message with `message_id` in this view - O(1)"""
+        pos = self._index.get(message_id)
+        # The shared index may also know about messages appended to newer views
+        if pos is not None and pos < self._length and self._records[pos].id == message_id:
+            return pos
+        return None
+
+    def records(self) -> Iterator[CompactMessage]:
+        """The compact records, without converting them"""
+        return islice(self._records, self._length)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._records[j].to_message() for j in range(self._length)[i]]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("message index out of range")
+        return self._records[i].to_message()
+
+    def __iter__(self) -> Iterator[BaseMessage]:
+        return (record.to_message() for record in self.records())
+
+    def __add__(self, other) -> list:
+        return list(self) + list(other)
+
+    def __repr__(self) -> str:
+        return f"CompactHistory({self._length} messages)"
+
+
+# --- 4. The reducer ---
+def _coerce(messages) -> List[BaseMessage]:
+    """Same coercion as add_messages: list, BaseMessage objects, ids assigned"""
+    if not isinstance(messages, list):
+        messages = [messages]
+    messages = [message_chunk_to_message(m) for m in convert_to_messages(messages)]
+    for m in messages:
+        if m.id is None:
+            m.id = str(uuid.uuid4())
+    return messages
+
+
+def add_compact_messages(left, right) -> CompactHistory:
+    """Drop-in replacement for add_messages that stores the history compactly"""
+    if not isinstance(left, CompactHistory):
+        left = CompactHistory.from_messages(_coerce(left))
+    right = _coerce(right)
+
+    for idx in range(len(right) - 1, -1, -1):
+        if isinstance(right[idx], RemoveMessage) and right[idx].id == REMOVE_ALL_MESSAGES:
+            return CompactHistory.from_messages(right[idx + 1:])
+
+    arena = left._arena
+    records, index = left._records, left._index
+    if left._length != len(records):
+        # Someone already appended to this value - start a new record list
+        records = records[:left._length]
+        index = {r.id: i for i, r in enumerate(records)}
+    view = CompactHistory(arena, records, index, left._length)
+    ids_to_remove = set()
+    copied = records is not left._records
+
+    for m in right:
+        pos = view.position(m.id)
+        if pos is None:
+            if isinstance(m, RemoveMessage):
+                raise ValueError(f"Attempting to delete a message with an ID that doesn't exist ('{m.id}')")
+            index[m.id] = len(records)
+            records.append(CompactMessage.from_message(m, arena))
+            view = CompactHistory(arena, records, index, len(records))
+            continue
+
+        if not copied:
+            # Replacing or removing (rare) copies the list and the index, like add_messages
+            records, index = list(records), dict(index)
+            view = CompactHistory(arena, records, index, len(records))
+            copied = True
+        if isinstance(m, RemoveMessage):
+            ids_to_remove.add(m.id)
+        else:
+            ids_to_remove.discard(m.id)
+            records[pos] = CompactMessage.from_message(m, arena)
+
+    if ids_to_remove:
+        records = [r for r in records if r.id not in ids_to_remove]
+        index = {r.id: i for i, r in enumerate(records)}
+    return CompactHistory(arena, records, index, len(records))
+
+
+# --- 5. Round-trip and equivalence checks ---
+def sample_messages() -> List[BaseMessage]:
+    return [
+        HumanMessage(content="What's the weather like today?", id="h1"),
+        HumanMessage(content="Émojis 🌦️, accents and \0 NUL bytes", id="h2", name="FK"),
+        AIMessage(content="", id="a1", tool_calls=[
+            {"name": "get_weather", "args": {"city": "Paris"}, "id": "call-1", "type": "tool_call"}
+        ]),
+        ToolMessage(content="Sunny, 21C", id="t1", tool_call_id="call-1", artifact={"raw": [1, 2, 3]}),
+        AIMessage(content="It's sunny.", id="a2", response_metadata={"model_name": "fake"},
+                  usage_metadata={"input_tokens": 10, "output_tokens": 3, "total_tokens": 13}),
+        SystemMessage(content="You are a helpful assistant.", id="s1"),
+        HumanMessage(content=[{"type": "text", "text": "Describe this"},
+                              {"type": "image_url", "image_url": {"url": "https://example.com/a.png"}}], id="h3"),
+        ChatMessage(content="custom role", role="critic", id="c1"),
+        HumanMessage(content="a1", id="h4"),  # content equal to another message's id
+    ]
+
+
+def check_round_trip():
+    arena = StringArena()
+    for message in sample_messages():
+        restored = CompactMessage.from_message(message, arena).to_message()
+        assert type(restored) is type(message) and restored == message, f"round trip failed for {message!r}"
+
+
+def check_reducer():
+    updates = [
+        [HumanMessage(content="first", id="m1")],
+        [AIMessage(content="second", id="m2"), HumanMessage(content="third")],
+        [AIMessage(content="second, edited", id="m2", name="editor")],
+        [RemoveMessage(id="m1"), HumanMessage(content="fourth", id="m4")],
+        [HumanMessage(content="m4", id="m5"), RemoveMessage(id="m4")],
+        sample_messages(),
+        [ToolMessage(content="Rainy", id="t1", tool_call_id="call-1"), RemoveMessage(id="a1")],
+    ]
+    expected, actual = [], []
+    for update in updates:
+        update = [m.model_copy() for m in update]
+        expected = add_messages(expected, update)
+        # add_messages gave the id-less messages their ids, so both sides get the same ones
+        actual = add_compact_messages(actual, [m.model_copy() for m in update])
+        assert list(actual) == expected
+        assert [type(m) for m in actual] == [type(m) for m in expected]
+        assert all(actual.position(m.id) == i for i, m in enumerate(expected))
+
+    try:
+        add_compact_messages(actual, [RemoveMessage(id="missing")])
+        raise AssertionError("removing a missing id must fail")
+    except ValueError:
+        pass
+
+    # Earlier values do not change
+    first = add_compact_messages([], [HumanMessage(content="a", id="a")])
+    second = add_compact_messages(first, [HumanMessage(content="b", id="b")])
+    branch = add_compact_messages(first, [HumanMessage(content="c", id="c")])
+    assert [m.content for m in first] == ["a"]
+    assert [m.content for m in second] == ["a", "b"] and [m.content for m in branch] == ["a", "c"]
+    assert first.position("b") is None and branch.position("b") is None and second.position("b") == 1
+
+
+def check_checkpointing():
+    """Works with a checkpointer whose serializer may pickle"""
+    builder = StateGraph(CompactGraphState)
+    builder.add_node("user_input", user_node)
+    builder.add_edge(START, "user_input")
+    builder.add_edge("user_input", END)
+    graph = builder.compile(checkpointer=InMemorySaver(serde=JsonPlusSerializer(pickle_fallback=True)))
+    config = {"configurable": {"thread_id": "compact"}}
+    graph.invoke({"messages": [HumanMessage(content="Hi", id="h0")], "turn_count": 0}, config)
+    graph.invoke({"messages": [AIMessage(content="Hello", id="a0")]}, config)
+    stored = graph.get_state(config).values["messages"]
+    assert isinstance(stored, CompactHistory) and [m.id for m in stored][::2] == ["h0", "a0"] and len(stored) == 4
+
+
+# --- 6. The 06-graph-messages.py graph on top of it ---
+class CompactGraphState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_compact_messages]
+    turn_count: int
+
+
+def user_node(state: CompactGraphState) -> dict:
+    return {"messages": HumanMessage(content="What's the weather like today?")}
+
+
+def ai_node(state: CompactGraphState) -> dict:
+    # Only the last message is turned back into a BaseMessage
+    last_human_message = state["messages"][-1]
+    response_content = f"I've received your query: '{last_human_message.content}'. " \
+                       "I can't tell you the weather right now, but I can confirm that my code is working!"
+    return {"messages": AIMessage(content=response_content)}
+
+
+def counter_node(state: CompactGraphState) -> dict:
+    return {"turn_count": state["turn_count"] + 1}
+
+
+def build_graph():
+    builder = StateGraph(CompactGraphState)
+    builder.add_node("user_input", user_node)
+    builder.add_node("ai_response", ai_node)
+    builder.add_node("increment_counter", counter_node)
+    builder.add_edge(START, "user_input")
+    builder.add_edge("user_input", "ai_response")
+    builder.add_edge("ai_response", "increment_counter")
+    builder.add_edge("increment_counter", END)
+    return builder.compile()
+
+
+# --- 7. Memory benchmark ---
+def make_message(i: int) -> BaseMessage:
+    if i % 2 == 0:
+        return HumanMessage(content=f"User question number {i}: what's the weather like today?", id=str(uuid.uuid4()))
+    return AIMessage(content=f"Answer {i}: I can't tell you the weather right now.", id=str(uuid.uuid4()))
+
+
+def measure(build) -> tuple[float, float]:
+    """(bytes per message, seconds) to build NUM_MESSAGES messages"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    history = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(history) == NUM_MESSAGES
+    return size / NUM_MESSAGES, elapsed
+
+
+def build_message_list() -> list:
+    return [make_message(i) for i in range(NUM_MESSAGES)]
+
+
+def build_compact_history() -> CompactHistory:
+    history = add_compact_messages([], [])
+    for chunk_start in range(0, NUM_MESSAGES, CHUNK_SIZE):
+        # Same as nodes appending turns: only one chunk of BaseMessage objects exists at a time
+        history = add_compact_messages(history, [make_message(i) for i in range(chunk_start, chunk_start + CHUNK_SIZE)])
+    return history
+
+
+if __name__ == "__main__":
+    check_round_trip()
+    check_reducer()
+    check_checkpointing()
+    print("Round-trip, reducer and checkpointing checks passed")
+
+    final_state = build_graph().invoke({"turn_count": 0})
+    print(f"\nGraph run: {final_state['messages']} -> {[m.content[:40] for m in final_state['messages']]}")
+
+    print(f"\n--- Memory benchmark: {NUM_MESSAGES} messages ---")
+    list_bytes, list_time = measure(build_message_list)
+    compact_bytes, compact_time = measure(build_compact_history)
+    print(f"{'list[BaseMessage]':>18}: {list_bytes:>6.0f} bytes/message, {list_bytes * NUM_MESSAGES / 2**20:>6.0f} MiB, "
+          f"built in {list_time:.1f} s")
+    print(f"{'CompactHistory':>18}: {compact_bytes:>6.0f} bytes/message, {compact_bytes * NUM_MESSAGES / 2**20:>6.0f} MiB, "
+          f"built in {compact_time:.1f} s ({list_bytes / compact_bytes:.1f}x smaller)")
+
+    history = build_compact_history()
+    start = time.perf_counter()
+    last = history[-1]
+    print(f"\nReading the last message back: {(time.perf_counter() - start) * 1e6:.0f} us ({last.content[:30]!r})")
+    start = time.perf_counter()
+    history = add_compact_messages(history, AIMessage(content="A model reply", id="run-123"))
+    print(f"Appending a reply with its own id: {(time.perf_counter() - start) * 1e6:.0f} us")
@@ -0,0 +1,397 @@
+"""
+A disk-spilled, memory-mapped message history.
+
+In 06-graph-messages.py `ai_node` only reads `state["messages"][-1]`, but the
+whole history lives in memory, and with a checkpointer the whole list is
+serialized into a new checkpoint every time it changes.
+
+Here the messages go to a `MessageLog`, an append-only pair of files:
+    - <path>.log : one JSON record per message, back to back (read through mmap)
+    - <path>.idx : the end offset of each record, 8 bytes per message
+and only the last `tail_size` messages are kept as objects in memory.
+
+The state holds a `HistoryHandle(path, length)`: "the first `length` messages
+of this log". That is all a checkpoint stores, whatever the thread length.
+Indexing the handle loads messages on demand, from the in-memory tail when
+possible and from the memory-mapped file otherwise.
+
+The `append_to_log` reducer writes new messages to the log and returns a
+longer handle. The files are only ever appended to, so every handle (and every
+checkpoint) stays valid. Appending to an older handle - e.g. when a run is
+resumed from an earlier checkpoint - copies its messages into a new log first.
+The length check and the append happen under the log's lock, so two writers
+can't both extend the same handle.
+
+Logs are created with `new_history(path)`, which refuses to overwrite an
+existing log, and removed with `delete_history(path)`. When the first write
+to the channel is a plain list, the reducer creates the log itself in a
+temporary directory owned by this process; that directory is deleted when the
+process exits, so such histories don't outlive it.
+
+At most MAX_OPEN_LOGS logs keep their files open; the least recently used
+idle ones are closed and reopened on demand.
+
+The history is append-only: unlike add_messages, messages cannot be replaced
+or removed by id.
+"""
+import atexit
+import json
+import mmap
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import shutil
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated, Dict, List, TypedDict
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    convert_to_messages,
+    message_to_dict,
+    messages_from_dict,
+)
+
+# Messages kept in memory per log
+TAIL_SIZE = 100
+# Logs with open files (2 descriptors each, plus a mapping once read)
+MAX_OPEN_LOGS = 64
+
+# Benchmark settings
+NUM_MESSAGES = 100_000
+NUM_TURNS = 10
+CHUNK_SIZE = 10_000
+
+
+# --- 1. The log files ---
+class MessageLog:
+    """Append-only message store: a data file read through mmap, plus an offsets index"""
+
+    def __init__(self, path: str, tail_size: int = TAIL_SIZE):
+        self.path = path
+        self._data_file = open(f"{path}.log", "a+b")  # readable, for mmap
+        self._index_file = open(f"{path}.idx", "ab")
+        self._ends = array("Q")
+        with open(f"{path}.idx", "rb") as f:
+            self._ends.frombytes(f.read())
+        self._tail = deque(maxlen=tail_size)  # (position, message) of the newest messages
+        self._map = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def append(self, messages: List[BaseMessage], at: int) -> bool:
+        """Appends `messages` if the log holds exactly `at` messages; False if it doesn't"""
+        with self._lock:
+            if len(self._ends) != at:
+                return False
+            end = self._ends[-1] if self._ends else 0
+            new_ends = array("Q")
+            for m in messages:
+                record = json.dumps(message_to_dict(m), separators=(",", ":")).encode()
+                self._data_file.write(record)
+                end += len(record)
+                new_ends.append(end)
+                self._tail.append((len(self._ends) + len(new_ends) - 1, m))
+            self._data_file.flush()
+            # The index is written after the data, so it never points past the end of the data file
+            self._index_file.write(new_ends.tobytes())
+            self._index_file.flush()
+            self._ends.extend(new_ends)
+            return True
+
+    def get(self, position: int) -> BaseMessage:
+        if self._tail and position >= self._tail[0][0]:
+            return self._tail[position - self._tail[0][0]][1]
+
+        start = self._ends[position - 1] if position > 0 else 0
+        end = self._ends[position]
+        with self._lock:
+            if self._map is None or len(self._map) < end:
+                # The file grew since it was mapped
+                if self._map is not None:
+                    self._map.close()
+                self._map = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            record = self._map[start:end]
+        return messages_from_dict([json.loads(record)])[0]
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._data_file.close()
+            self._index_file.close()
+
+
+# At most one MessageLog per file in this process, least recently used first
+_logs: "OrderedDict[str, MessageLog]" = OrderedDict()
+# Number of `using_log` blocks in progress per path; those logs are never closed
+_log_users: Dict[str, int] = {}
+_logs_lock = threading.Lock()
+
+
+@contextmanager
+def using_log(path: str):
+    """The MessageLog of `path`, kept open until the block ends"""
+    with _logs_lock:
+        log = _logs.get(path)
+        if log is None:
+            log = _logs[path] = MessageLog(path)
+        _logs.move_to_end(path)
+        _log_users[path] = _log_users.get(path, 0) + 1
+        # Close the least recently used idle logs
+        idle = [p for p in _logs if p not in _log_users]
+        for evicted in idle[:max(0, len(_logs) - MAX_OPEN_LOGS)]:
+            _logs.pop(evicted).close()
+    try:
+        yield log
+    finally:
+        with _logs_lock:
+            _log_users[path] -= 1
+            if not _log_users[path]:
+                del _log_users[path]
+
+
+def close_logs():
+    """Closes every idle log (they are reopened on demand)"""
+    with _logs_lock:
+        for path in [p for p in _logs if p not in _log_users]:
+            _logs.pop(path).close()
+
+
+# --- 2. The handle kept in state ---
+@dataclass(frozen=True)
+class HistoryHandle:
+    """The first `length` messages of the log at `path`"""
+    path: str
+    length: int
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(self.length)[i]]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("message index out of range")
+        with using_log(self.path) as log:
+            return log.get(i)
+
+    def __iter__(self):
+        return (self[i] for i in range(self.length))
+
+
+def new_history(path: str, messages: List[BaseMessage] = ()) -> HistoryHandle:
+    """Creates an empty log at `path` (and writes `messages` to it); FileExistsError if there is one"""
+    with open(f"{path}.log", "xb"):
+        pass
+    with open(f"{path}.idx", "xb"):
+        pass
+    handle = HistoryHandle(path, 0)
+    return append_to_log(handle, list(messages)) if messages else handle
+
+
+def delete_history(path: str):
+    """Deletes the log at `path`; handles to it (and checkpoints holding them) stop working"""
+    with _logs_lock:
+        if path in _log_users:
+            raise RuntimeError(f"the log at {path} is in use")
+        log = _logs.pop(path, None)
+    if log is not None:
+        log.close()
+    for suffix in (".log", ".idx"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+_process_history_dir = None
+_process_history_dir_lock = threading.Lock()
+
+
+def process_history_dir() -> str:
+    """A temporary directory for the logs the reducer creates, deleted when the process exits"""
+    global _process_history_dir
+    with _process_history_dir_lock:
+        if _process_history_dir is None:
+            _process_history_dir = tempfile.mkdtemp(prefix="langgraph-history-")
+            atexit.register(_remove_process_history_dir, _process_history_dir)
+        return _process_history_dir
+
+
+def _remove_process_history_dir(path: str):
+    close_logs()
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def append_to_log(current, new) -> HistoryHandle:
+    """Reducer: writes `new` to the log and returns the longer handle"""
+    if not isinstance(current, HistoryHandle):
+        # The very first write reaches the channel as-is, without calling the reducer
+        current = new_history(os.path.join(process_history_dir(), str(uuid.uuid4())), current or [])
+
+    if not isinstance(new, list):
+        new = [new]
+    new = convert_to_messages(new)
+    for m in new:
+        if isinstance(m, RemoveMessage):
+            raise ValueError("HistoryHandle is append-only, messages cannot be removed")
+        if m.id is None:
+            m.id = str(uuid.uuid4())
+
+    with using_log(current.path) as log:
+        if log.append(new, at=current.length):
+            return HistoryHandle(current.path, current.length + len(new))
+
+    # Appending to an older handle: copy its messages into a new log
+    forked = new_history(f"{current.path}-{uuid.uuid4().hex[:8]}")
+    for start in range(0, current.length, CHUNK_SIZE):
+        forked = append_to_log(forked, current[start:min(start + CHUNK_SIZE, current.length)])
+    return append_to_log(forked, new)
+
+
+# --- 3. The 06-graph-messages.py graph ---
+class MyGraphState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+    turn_count: int
+
+
+class DiskGraphState(TypedDict):
+    messages: Annotated[HistoryHandle, append_to_log]
+    turn_count: int
+
+
+def user_node(state) -> dict:
+    return {"messages": HumanMessage(content="What's the weather like today?")}
+
+
+def ai_node(state) -> dict:
+    # Only the last message is read - from memory, thanks to the tail
+    last_human_message = state["messages"][-1]
+    response_content = f"I've received your query: '{last_human_message.content}'. " \
+                       "I can't tell you the weather right now, but I can confirm that my code is working!"
+    return {"messages": AIMessage(content=response_content)}
+
+
+def counter_node(state) -> dict:
+    return {"turn_count": state["turn_count"] + 1}
+
+
+# The checkpointer must be allowed to load our handle type back
+serde = JsonPlusSerializer(allowed_msgpack_modules=[(__name__, "HistoryHandle")])
+
+
+def build_graph(state_schema):
+    builder = StateGraph(state_schema)
+    builder.add_node("user_input", user_node)
+    builder.add_node("ai_response", ai_node)
+    builder.add_node("increment_counter", counter_node)
+    builder.add_edge(START, "user_input")
+    builder.add_edge("user_input", "ai_response")
+    builder.add_edge("ai_response", "increment_counter")
+    builder.add_edge("increment_counter", END)
+    return builder.compile(checkpointer=InMemorySaver(serde=serde))
+
+
+# --- 4. Benchmark ---
+def make_messages(start: int, end: int) -> List[BaseMessage]:
+    return [
+        HumanMessage(content=f"User question number {i}: what's the weather like today?", id=str(i))
+        if i % 2 == 0 else
+        AIMessage(content=f"Answer {i}: I can't tell you the weather right now.", id=str(i))
+        for i in range(start, end)
+    ]
+
+
+def run_mode(mode: str, history_dir: str) -> tuple[float, float, float]:
+    """Runs one mode in a fresh process: (ms per turn, checkpoint KiB, peak RSS MiB)"""
+    config = {"configurable": {"thread_id": "long-thread"}}
+    if mode == "in memory":
+        graph = build_graph(MyGraphState)
+        graph.invoke({"messages": make_messages(0, NUM_MESSAGES), "turn_count": 0}, config)
+    else:
+        graph = build_graph(DiskGraphState)
+        history = new_history(os.path.join(history_dir, "long-thread"))
+        for start in range(0, NUM_MESSAGES, CHUNK_SIZE):
+            history = append_to_log(history, make_messages(start, start + CHUNK_SIZE))
+        graph.invoke({"messages": history, "turn_count": 0}, config)
+
+    start = time.perf_counter()
+    for _ in range(NUM_TURNS):
+        state = graph.invoke({}, config)
+    ms_per_turn = (time.perf_counter() - start) / NUM_TURNS * 1000
+    assert len(state["messages"]) == NUM_MESSAGES + 2 * (NUM_TURNS + 1)
+
+    checkpoint = graph.checkpointer.get_tuple(config).checkpoint
+    _, checkpoint_bytes = serde.dumps_typed(checkpoint["channel_values"])
+    close_logs()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak_mib = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    return ms_per_turn, len(checkpoint_bytes) / 1024, peak_mib
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        graph = build_graph(DiskGraphState)
+        config = {"configurable": {"thread_id": "demo"}}
+        graph.invoke({"messages": new_history(os.path.join(tmp_dir, "demo")), "turn_count": 0}, config)
+        final_state = graph.invoke({}, config)
+        print(f"Handle in state: {final_state['messages']}")
+        print(f"Messages: {[m.content[:40] for m in final_state['messages']]}")
+
+        # Resuming from an earlier checkpoint forks the log instead of overwriting it
+        first_turn = [s for s in graph.get_state_history(config) if s.next == ("ai_response",)][-1]
+        forked_state = graph.invoke(None, first_turn.config)
+        print(f"Resumed from turn 1: {forked_state['messages']}")
+
+        # Two writers extending the same handle: the second one gets a fork
+        handle = final_state["messages"]
+        first = append_to_log(handle, [HumanMessage(content="first")])
+        second = append_to_log(handle, [HumanMessage(content="second")])
+        assert first.path == handle.path and second.path != handle.path
+        assert (first[-1].content, second[-1].content) == ("first", "second")
+        try:
+            new_history(handle.path)
+            raise AssertionError("an existing log was overwritten")
+        except FileExistsError:
+            pass
+
+        # A plain list as the first write goes to this process's own directory
+        plain_graph = build_graph(DiskGraphState)
+        plain_config = {"configurable": {"thread_id": "plain"}}
+        plain_state = plain_graph.invoke({"messages": [HumanMessage(content="Hi")], "turn_count": 0}, plain_config)
+        assert plain_state["messages"].path.startswith(process_history_dir())
+        delete_history(plain_state["messages"].path)
+
+        # Only MAX_OPEN_LOGS logs keep their files open
+        for i in range(MAX_OPEN_LOGS + 10):
+            new_history(os.path.join(tmp_dir, f"many-{i}"), [HumanMessage(content=str(i))])
+        assert len(_logs) <= MAX_OPEN_LOGS
+        close_logs()
+
+        print(f"\n--- Benchmark: thread with {NUM_MESSAGES} messages, {NUM_TURNS} more turns ---")
+        print(f"{'mode':>9} | {'ms/turn':>8} | {'checkpoint KiB':>14} | {'peak RSS MiB':>12}")
+        # A fresh "spawn" process per mode so the peak RSS numbers don't mix
+        context = multiprocessing.get_context("spawn")
+        for mode in ("in memory", "disk"):
+            with context.Pool(1) as pool:
+                ms_per_turn, checkpoint_kib, peak_mib = pool.apply(run_mode, (mode, tmp_dir))
+            print(f"{mode:>9} | {ms_per_turn:>8.1f} | {checkpoint_kib:>14.1f} | {peak_mib:>12.1f}")
@@ -0,0 +1,311 @@
+"""
+Per-node CPU and memory profiling, switched on per invocation.
+
+07-nodes.py shows that nodes can receive `config: RunnableConfig` and
+`runtime: Runtime[ContextSchema]`. Here every node of that graph is wrapped
+with `profiled(...)`. The wrapper does nothing unless the invocation asks for it:
+
+    app.invoke(inputs, config={"run_id": uuid.uuid4(),
+                               "configurable": {"profile": True, "profile_dir": "..."}})
+
+When profiling is on, each node call runs under cProfile and tracemalloc, and
+writes to the invocation's own directory, `run_profile_dir(profile_dir, run_id)`
+(so the `run_id` is required):
+    - <node>.prof        : the cProfile stats (open with pstats or snakeviz)
+    - <node>.alloc.json  : peak traced memory, and per source line the memory
+                           live at the node's peak and still live at its return
+`write_summary(run_dir)` then merges them into the top functions, the
+peak memory of each node call and the top allocation sites for the whole run
+(summary.txt), ranked by what they held at the peak - so a large temporary
+that is freed before the node returns still shows up.
+
+The peak snapshot is taken from a trace hook, on a function return, each time
+the traced memory has grown noticeably since the last one; it is close to the
+true peak, not exact, and the hook adds to the cProfile times.
+
+The wrapper reads the config with `get_config()`, so it keeps the node's own
+signature and LangGraph still injects `config` / `runtime` into the node.
+tracemalloc's counters are process-wide, so profiled node calls run one at a
+time (nodes that run in parallel wait for each other while profiling is on);
+profile single requests, not a load test. Only sync nodes can be wrapped:
+an async node would share the profilers with every task on its event loop.
+"""
+import cProfile
+import inspect
+import io
+import json
+import os
+import uuid
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+from typing import Callable, TypedDict, Union
+from langgraph.config import get_config
+from langgraph.graph import StateGraph, START, END
+from langchain_core.runnables import RunnableConfig
+from langgraph.runtime import Runtime, get_runtime
+
+# Where profiles go when the config doesn't say
+DEFAULT_PROFILE_DIR = Path(tempfile.gettempdir()) / "langgraph-profiles"
+# Number of frames kept per allocation, and rows in the summary
+TRACEMALLOC_FRAMES = 1
+TOP_N = 10
+# A new peak snapshot is taken once the traced memory grew by this much (bytes)
+PEAK_SNAPSHOT_STEP = 64 * 1024
+
+# Number of invocations in the overhead measurement
+NUM_RUNS = 1_000
+
+# cProfile allows one active profiler per thread, and tracemalloc's peak is global
+_profile_lock = threading.Lock()
+
+
+# --- 1. The profiling wrapper ---
+def run_profile_dir(profile_dir: Union[str, Path], run_id) -> Path:
+    """Where the profiles of the invocation `run_id` go"""
+    return Path(profile_dir) / str(run_id)
+
+
+def _output_path(profile_dir: Path, node: str, suffix: str) -> Path:
+    """<node><suffix>, or <node>-2<suffix>, ... when the node runs more than once"""
+    path = profile_dir / f"{node}{suffix}"
+    count = 1
+    while path.exists():
+        count += 1
+        path = profile_dir / f"{node}-{count}{suffix}"
+    return path
+
+
+class _PeakSnapshot:
+    """Trace hook: keeps a tracemalloc snapshot from near the largest traced size seen"""
+
+    def __init__(self, start_size: int):
+        self.size = start_size
+        self.snapshot = None
+
+    def __call__(self, frame, event, arg):
+        if event == "call":
+            frame.f_trace_lines = False
+        elif event == "return":
+            current, _ = tracemalloc.get_traced_memory()
+            if current >= self.size + PEAK_SNAPSHOT_STEP:
+                self.size = current
+                self.snapshot = tracemalloc.take_snapshot().filter_traces(_OWN_ALLOCATIONS)
+        return self
+
+
+def _site_sizes(snapshot, before) -> list:
+    return [
+        {"line": str(stat.traceback[0]), "size": stat.size_diff, "count": stat.count_diff}
+        for stat in snapshot.compare_to(before, "lineno")
+        if stat.size_diff > 0
+    ]
+
+
+def profiled(node: Callable) -> Callable:
+    """Wraps the sync `node` so it is profiled when config["configurable"]["profile"] is set"""
+    if inspect.iscoroutinefunction(node):
+        raise TypeError(f"profiled() only supports sync nodes, {node.__name__} is async")
+
+    @wraps(node)
+    def run_profiled(state, *args, **kwargs):
+        configurable = get_config().get("configurable", {})
+        if not configurable.get("profile"):
+            return node(state, *args, **kwargs)
+
+        name = get_config()["metadata"].get("langgraph_node", node.__name__)
+        run_id = get_runtime().execution_info.run_id
+        if run_id is None:
+            raise ValueError("profiling needs a run_id in the config, to keep each invocation's profiles apart")
+        profile_dir = run_profile_dir(configurable.get("profile_dir", DEFAULT_PROFILE_DIR), run_id)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+
+        with _profile_lock:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            before = tracemalloc.take_snapshot().filter_traces(_OWN_ALLOCATIONS)
+            tracemalloc.reset_peak()
+            start_size, _ = tracemalloc.get_traced_memory()
+            peak_hook = _PeakSnapshot(start_size)
+            previous_trace = sys.gettrace()
+            profiler = cProfile.Profile()
+            try:
+                sys.settrace(peak_hook)
+                profiler.enable()
+                try:
+                    return node(state, *args, **kwargs)
+                finally:
+                    profiler.disable()
+                    sys.settrace(previous_trace)
+                    _, peak_size = tracemalloc.get_traced_memory()
+                    after = tracemalloc.take_snapshot().filter_traces(_OWN_ALLOCATIONS)
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+
+                profiler.dump_stats(_output_path(profile_dir, name, ".prof"))
+                allocations = {
+                    "peak": peak_size - start_size,
+                    "peak_sites": _site_sizes(peak_hook.snapshot or after, before),
+                    "retained_sites": _site_sizes(after, before),
+                }
+                _output_path(profile_dir, name, ".alloc.json").write_text(json.dumps(allocations))
+
+    return run_profiled
+
+
+# Leave the profiler's own allocations (snapshots, the hook, this wrapper) out of the results
+def _source_lines(obj) -> range:
+    lines, first = inspect.getsourcelines(obj)
+    return range(first, first + len(lines))
+
+
+_OWN_ALLOCATIONS = [tracemalloc.Filter(False, tracemalloc.__file__)] + [
+    tracemalloc.Filter(False, __file__, line)
+    for obj in (_PeakSnapshot, _site_sizes, profiled)
+    for line in _source_lines(obj)
+]
+
+
+# --- 2. The merged summary ---
+def write_summary(profile_dir, top: int = TOP_N) -> str:
+    """Merges every profile in `profile_dir` (one invocation's directory) into summary.txt and returns its text"""
+    profile_dir = Path(profile_dir)
+    out = io.StringIO()
+
+    prof_files = sorted(str(p) for p in profile_dir.glob("*.prof"))
+    out.write(f"=== Top {top} functions by cumulative time ({len(prof_files)} node calls) ===\n")
+    if prof_files:
+        stats = pstats.Stats(*prof_files, stream=out)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+
+    sizes, counts = Counter(), Counter()
+    out.write("=== Memory per node call: peak / still allocated at return ===\n")
+    for path in sorted(profile_dir.glob("*.alloc.json")):
+        allocations = json.loads(path.read_text())
+        retained = sum(site["size"] for site in allocations["retained_sites"])
+        out.write(f"{path.name.removesuffix('.alloc.json'):>24}: {allocations['peak'] / 1024:>9.1f} KiB / "
+                  f"{retained / 1024:>7.1f} KiB\n")
+        for site in allocations["peak_sites"]:
+            sizes[site["line"]] += site["size"]
+            counts[site["line"]] += site["count"]
+
+    out.write(f"\n=== Top {top} allocation sites, by memory held at each node call's peak ===\n")
+    for line, size in sizes.most_common(top):
+        out.write(f"{size / 1024:>9.1f} KiB in {counts[line]:>6} blocks  {line}\n")
+
+    summary = out.getvalue()
+    (profile_dir / "summary.txt").write_text(summary)
+    return summary
+
+
+# --- 3. The 07-nodes.py graph, profiled ---
+class GraphState(TypedDict):
+    """Represents the state of our graph."""
+    input: str
+    results: str
+
+
+class ContextSchema(TypedDict):
+    """Contains information available at runtime, not stored in the state."""
+    user_id: str
+
+
+def plain_node(state: GraphState) -> dict:
+    """A node that simply updates the state's 'results' key."""
+    # Some work worth profiling
+    words = [f"{state['input']}-{i}" for i in range(50_000)]
+    return {"results": f"Hello, {state['input']}! ({len(set(words))} words)"}
+
+
+def node_with_config(state: GraphState, config: RunnableConfig) -> dict:
+    """Accesses a value from the RunnableConfig."""
+    thread_id = config.get("configurable", {}).get("thread_id")
+    return {"results": f"Config access successful for {thread_id}."}
+
+
+def node_with_runtime(state: GraphState, runtime: Runtime[ContextSchema]) -> dict:
+    """Accesses a value from the custom runtime context."""
+    user_id = runtime.context["user_id"]
+    time.sleep(0.01)  # e.g. a lookup for this user
+    return {"results": f"Runtime access successful for {user_id}."}
+
+
+def build_graph(profiling: bool = True):
+    """07-nodes.py's graph, with every node wrapped by `profiled`"""
+    wrap = profiled if profiling else (lambda node: node)
+    builder = StateGraph(GraphState, context_schema=ContextSchema)
+    builder.add_node("plain_node", wrap(plain_node))
+    builder.add_node("config_node", wrap(node_with_config))
+    builder.add_node("runtime_node", wrap(node_with_runtime))
+    builder.add_edge(START, "plain_node")
+    builder.add_edge("plain_node", "config_node")
+    builder.add_edge("config_node", "runtime_node")
+    builder.add_edge("runtime_node", END)
+    return builder.compile()
+
+
+def fast_graph(profiling: bool):
+    """Same topology with trivial nodes, to measure the wrapper cost when profiling is off"""
+    wrap = profiled if profiling else (lambda node: node)
+    builder = StateGraph(GraphState, context_schema=ContextSchema)
+    builder.add_node("plain_node", wrap(lambda state: {"results": "a"}))
+    builder.add_node("config_node", wrap(lambda state: {"results": "b"}))
+    builder.add_edge(START, "plain_node")
+    builder.add_edge("plain_node", "config_node")
+    builder.add_edge("config_node", END)
+    return builder.compile()
+
+
+if __name__ == "__main__":
+    app = build_graph()
+    initial_state = {"input": "World"}
+    context = {"user_id": "alice_smith"}
+
+    print("--- Normal invocation: profiling off ---")
+    print(app.invoke(initial_state, config={"configurable": {"thread_id": "user-1234"}}, context=context))
+
+    print("\n--- Same graph, one request profiled ---")
+    with tempfile.TemporaryDirectory() as profile_dir:
+        run_ids = [uuid.uuid4(), uuid.uuid4()]
+        for run_id in run_ids:
+            run_config = {"run_id": run_id,
+                          "configurable": {"thread_id": "user-1234", "profile": True, "profile_dir": profile_dir}}
+            print(app.invoke(initial_state, config=run_config, context=context))
+        run_dir = run_profile_dir(profile_dir, run_ids[-1])
+        print(f"Files written for the last run: {sorted(os.listdir(run_dir))}\n")
+        summary = write_summary(run_dir)
+        print(summary)
+        # Each invocation is summarized on its own
+        assert "(3 node calls)" in summary, summary.splitlines()[0]
+        # plain_node's temporary word list is freed before it returns, but is still the top site
+        top_site = summary.split("by memory held at each node call's peak ===\n")[1].splitlines()[0]
+        assert "31-node-profiling.py" in top_site, top_site
+
+    try:
+        async def async_node(state: GraphState) -> dict:
+            return {}
+        profiled(async_node)
+        raise AssertionError("an async node was wrapped")
+    except TypeError as e:
+        print(f"TypeError: {e}\n")
+
+    print("--- Cost of the wrapper with profiling off ---")
+    graphs = {profiling: fast_graph(profiling) for profiling in (False, True)}
+    best = {False: float("inf"), True: float("inf")}
+    # Alternate between the two graphs and keep the best time of each to reduce noise
+    for _ in range(5):
+        for profiling, graph in graphs.items():
+            graph.invoke(initial_state)  # warm up
+            start = time.perf_counter()
+            for _ in range(NUM_RUNS):
+                graph.invoke(initial_state)
+            best[profiling] = min(best[profiling], time.perf_counter() - start)
+    print(f"{(best[True] - best[False]) / (NUM_RUNS * 2) * 1e6:+.2f} us per node call (graph-level, noisy)")
@@ -0,0 +1,242 @@
+"""
+One fast-start entry point for the tutorial graphs.
+
+02-graph-api.py ... 12-retries.py import langgraph, langchain_core (and some
+pydantic / langchain_openai) at the top, and used to build and invoke their
+graphs at import time. Their demos now sit under `if __name__ == "__main__":`,
+so the modules can be imported as libraries.
+
+This runner keeps a registry of those graphs. Nothing heavy is imported when
+the runner starts: a script is loaded (with importlib, because the file names
+start with digits and contain dashes) the first time one of its graphs is
+requested, and each graph is built once and then reused.
+
+    python 32-graph-runner.py list
+    python 32-graph-runner.py run 08-edges
+    python 32-graph-runner.py bench [names...]
+
+`bench` starts a fresh interpreter per graph and reports:
+    - an import-time breakdown: the slowest top-level packages, from `python -X importtime`
+    - cold start: loading the script + building the graph + the first invoke
+    - warm start: the mean time of later invokes of the already built graph
+    - how many of those invokes raised (12-retries can run out of attempts)
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Number of warm invokes measured per graph
+NUM_WARM_RUNS = 20
+# Number of top-level packages shown in the import-time breakdown
+NUM_IMPORT_GROUPS = 6
+
+
+# --- 1. The registry ---
+@dataclass
+class GraphSpec:
+    """How to get a graph out of a script, and a sample input to invoke it with"""
+    script: str
+    build: Callable[[Any], Any]
+    sample_input: dict
+    invoke_kwargs: dict = field(default_factory=dict)
+    warm_runs: int = NUM_WARM_RUNS
+
+
+GRAPHS: Dict[str, GraphSpec] = {
+    "02-graph-api": GraphSpec("02-graph-api.py", lambda m: m.graph_runnable, {"messages": []}),
+    "03-graph-state": GraphSpec(
+        "03-graph-state.py",
+        lambda m: m.build_graph(m.TypedDictState),
+        {"messages": [], "step_count": 0, "private_data": ""},
+    ),
+    "04-reducers": GraphSpec(
+        "04-reducers.py",
+        lambda m: m.build_graph(m.StateWithCustomReducer, m.node_to_update),
+        {"count": 5, "animals": ["lion", "tiger"]},
+    ),
+    "05-add_messages": GraphSpec(
+        "05-add_messages.py", lambda m: m.agent, {"messages": [("user", "Hello there! My name is FK")]}
+    ),
+    "06-graph-messages": GraphSpec("06-graph-messages.py", lambda m: m.agent, {"turn_count": 0}),
+    "07-nodes": GraphSpec(
+        "07-nodes.py",
+        lambda m: m.build_graph(),
+        {"input": "World"},
+        {"config": {"configurable": {"thread_id": "user-1234"}}, "context": {"user_id": "alice_smith"}},
+    ),
+    "08-edges": GraphSpec("08-edges.py", lambda m: m.graph, {"input": "Hello, go_to_c to continue."}),
+    "09-runtime-context": GraphSpec(
+        "09-runtime-context.py", lambda m: m.graph, {"input": "Start Process"},
+        {"context": {"user_agent": "Default-Run"}},
+    ),
+    "10-send": GraphSpec(
+        "10-send.py",
+        lambda m: m.graph,
+        {"topic": "Artificial Intelligence", "subtopics": [], "research_results": [], "final_report": ""},
+    ),
+    "11-command": GraphSpec("11-command.py", lambda m: m.graph, {"temperature": 100}),
+    # Fails 70% of the time with a 1s+ backoff, so only a few warm runs
+    "12-retries": GraphSpec(
+        "12-retries.py", lambda m: m.graph, {"city": "San Francisco", "temperature": 0.0, "conditions": ""},
+        warm_runs=2,
+    ),
+}
+
+_modules: Dict[str, Any] = {}
+_graphs: Dict[str, Any] = {}
+_lock = threading.RLock()
+
+
+def load_script(script: str):
+    """Imports a tutorial script by file name, once"""
+    with _lock:
+        if script not in _modules:
+            module_name = "tutorial_" + script.removesuffix(".py").replace("-", "_")
+            spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, script))
+            module = importlib.util.module_from_spec(spec)
+            # Registered before running it, so dataclasses / pydantic can resolve the module
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                del sys.modules[module_name]
+                raise
+            _modules[script] = module
+        return _modules[script]
+
+
+def get_graph(name: str):
+    """The compiled graph registered as `name`, built on first use"""
+    with _lock:
+        if name not in _graphs:
+            spec = GRAPHS[name]
+            _graphs[name] = spec.build(load_script(spec.script))
+        return _graphs[name]
+
+
+def run_graph(name: str, quiet: bool = False):
+    """Invokes graph `name` with its sample input. `quiet` hides what the nodes print"""
+    spec = GRAPHS[name]
+    graph = get_graph(name)
+    output = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        return graph.invoke(spec.sample_input, **spec.invoke_kwargs)
+
+
+# --- 2. Measurements ---
+def _try_run(name: str) -> int:
+    """Runs the graph once; returns 1 if it raised (e.g. 12-retries running out of attempts)"""
+    try:
+        run_graph(name, quiet=True)
+        return 0
+    except Exception:
+        return 1
+
+
+def measure_in_process(name: str) -> dict:
+    """Cold and warm timings, meant to run in a fresh interpreter"""
+    random.seed(0)  # 12-retries fails at random
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_script(GRAPHS[name].script)
+    loaded = time.perf_counter()
+    get_graph(name)
+    built = time.perf_counter()
+    errors = _try_run(name)
+    first_invoke = time.perf_counter()
+
+    warm_runs = GRAPHS[name].warm_runs
+    for _ in range(warm_runs):
+        errors += _try_run(name)
+    warm = (time.perf_counter() - first_invoke) / warm_runs
+
+    return {
+        "load": loaded - start,
+        "build": built - loaded,
+        "first_invoke": first_invoke - built,
+        "cold": first_invoke - start,
+        "warm": warm,
+        "errors": errors,
+    }
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Import time (seconds) per top-level package, summed from the `self` column of `-X importtime`"""
+    totals: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, package = (part.strip() for part in line.removeprefix("import time:").split("|"))
+        group = package.split(".")[0]
+        totals[group] = totals.get(group, 0.0) + int(self_us) / 1e6
+    return totals
+
+
+def bench(name: str) -> dict:
+    """Runs `measure` for one graph in a fresh interpreter with -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "measure", name],
+        capture_output=True, text=True, cwd=SCRIPTS_DIR,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+        return {"error": error}
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["imports"] = parse_importtime(result.stderr)
+    return timings
+
+
+# --- 3. Command line ---
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Run the tutorial graphs from one entry point")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the registered graphs")
+    run_parser = commands.add_parser("run", help="invoke a graph with its sample input")
+    run_parser.add_argument("name", choices=GRAPHS)
+    bench_parser = commands.add_parser("bench", help="import-time breakdown and cold/warm latency")
+    bench_parser.add_argument("names", nargs="*", choices=[[]] + list(GRAPHS))
+    measure_parser = commands.add_parser("measure", help=argparse.SUPPRESS)
+    measure_parser.add_argument("name", choices=GRAPHS)
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name, spec in GRAPHS.items():
+            print(f"{name:<20} {spec.script}")
+
+    elif args.command == "run":
+        print(run_graph(args.name))
+
+    elif args.command == "measure":
+        print(json.dumps(measure_in_process(args.name)))
+
+    elif args.command == "bench":
+        print(f"{'graph':<20} | {'cold ms':>8} | {'load':>7} | {'build':>6} | {'1st run':>7} | {'warm ms':>8} | "
+              f"errors | imports (ms)")
+        for name in args.names or GRAPHS:
+            timings = bench(name)
+            if "error" in timings:
+                print(f"{name:<20} | unavailable: {timings['error']}")
+                continue
+            imports = ", ".join(
+                f"{group} {seconds * 1000:.0f}"
+                for group, seconds in sorted(timings["imports"].items(), key=lambda item: -item[1])[:NUM_IMPORT_GROUPS]
+            )
+            print(f"{name:<20} | {timings['cold'] * 1000:>8.1f} | {timings['load'] * 1000:>7.1f} | "
+                  f"{timings['build'] * 1000:>6.1f} | {timings['first_invoke'] * 1000:>7.1f} | "
+                  f"{timings['warm'] * 1000:>8.3f} | {timings['errors']:>6} | {imports}")
+
+
+if __name__ == "__main__":
+    main()
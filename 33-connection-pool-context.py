@@ -0,0 +1,364 @@
+"""
+A shared database connection pool exposed through the runtime context.
+
+In 09-runtime-context.py `MyGraphContext.db_connection` is a connection
+string, so a node that needs the database has to open (and close) a new
+connection on every invocation. Against a real server that handshake
+(TCP, TLS, auth) is often the slowest part of the request.
+
+Here the context carries `db: ConnectionPool` instead:
+    - one pool per database per process, created on first use by
+      `get_pool(db_connection)` and shared by every invocation and every
+      thread; a context that doesn't pass `db` gets the pool of its
+      `db_connection`
+    - at most `max_size` connections; callers wait up to `timeout` for one,
+      then get PoolTimeout
+    - every connection is health-checked when it is taken from the pool and
+      replaced if the check fails
+    - every connection is rolled back when it is returned, so a node that
+      fails mid-transaction doesn't hand its transaction to the next borrower;
+      a connection that can't be rolled back is closed instead
+    - `close()` shuts the pool down (done for the shared pools at exit);
+      connections still checked out are closed when they are returned
+
+Nodes use it as
+    with runtime.context.db.connection() as conn:
+        conn.execute(...)
+
+The stand-in database is a SQLite file in a temporary directory of its own,
+removed at exit. `CONNECT_LATENCY` adds a fake handshake delay to each
+connect, to look more like a networked database.
+"""
+import atexit
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, TypedDict
+from langgraph.graph import StateGraph, START, END
+from langgraph.runtime import Runtime
+
+# Pool settings
+POOL_MAX_SIZE = 8
+POOL_TIMEOUT = 5.0
+
+# Benchmark settings
+NUM_REQUESTS = 1_000
+CONCURRENCY_LEVELS = (1, 8)
+# Simulated connection handshake of a networked database (seconds)
+CONNECT_LATENCY = 0.005
+
+# A fresh database for every run, removed at exit by _shutdown()
+_DB_DIR = tempfile.mkdtemp(prefix="langgraph-pool-demo-")
+DB_PATH = os.path.join(_DB_DIR, "demo.sqlite")
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool timeout"""
+    pass
+
+
+class PoolClosed(Exception):
+    """The pool has been shut down"""
+    pass
+
+
+# --- 1. The pool ---
+def sqlite_health_check(conn) -> bool:
+    try:
+        conn.execute("SELECT 1").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+class ConnectionPool:
+    """Thread-safe pool of up to `max_size` connections created by `connect()`"""
+
+    def __init__(self, connect: Callable, max_size: int = POOL_MAX_SIZE, timeout: float = POOL_TIMEOUT,
+                 health_check: Callable = sqlite_health_check):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self._health_check = health_check
+        self._idle = deque()
+        self._open = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        # Stats
+        self.connects = 0
+        self.checkouts = 0
+        self.replaced = 0
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolClosed("the connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise PoolTimeout(f"no connection available after {self.timeout}s")
+
+        try:
+            # Connecting and health checks happen outside the lock
+            replaced = connected = 0
+            if conn is not None and not self._health_check(conn):
+                self._discard(conn)
+                replaced = 1
+                conn = None
+            if conn is None:
+                conn = self._connect()
+                connected = 1
+        except BaseException:
+            with self._condition:
+                self._open -= 1
+                self.replaced += replaced
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self.replaced += replaced
+            self.connects += connected
+            self.checkouts += 1
+        return conn
+
+    def release(self, conn):
+        """Returns `conn` to the pool, after rolling back whatever it left uncommitted"""
+        try:
+            conn.rollback()
+            reusable = True
+        except Exception:
+            reusable = False
+        with self._condition:
+            if reusable and not self._closed:
+                self._idle.append(conn)
+                self._condition.notify()
+                return
+            self._open -= 1
+            self._condition.notify()
+        self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Closes idle connections now and checked-out ones when they come back"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "open": self._open,
+                "idle": len(self._idle),
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "replaced": self.replaced,
+                "closed": self._closed,
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- 2. The SQLite stand-in and the process-wide pools ---
+def connect_sqlite(path: str = DB_PATH, latency: float = 0.0):
+    """Opens a connection to the stand-in database, with an optional fake handshake"""
+    if latency:
+        time.sleep(latency)
+    # Pooled connections move between threads, one thread at a time
+    return sqlite3.connect(path, check_same_thread=False)
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_connection: str = DB_PATH) -> ConnectionPool:
+    """The process-lifetime pool for `db_connection`, created on first use"""
+    with _pools_lock:
+        pool = _pools.get(db_connection)
+        if pool is None:
+            pool = _pools[db_connection] = ConnectionPool(
+                lambda: connect_sqlite(db_connection, CONNECT_LATENCY))
+        return pool
+
+
+@atexit.register
+def _shutdown():
+    """Closes the shared pools and removes this run's database"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+
+def setup_database(path: str = DB_PATH):
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS users (user_agent TEXT PRIMARY KEY, visits INTEGER)")
+        conn.executemany(
+            "INSERT OR IGNORE INTO users VALUES (?, 0)",
+            [("Default-Run",), ("Override-Run",)],
+        )
+
+
+# --- 3. The 09-runtime-context.py graph ---
+class GraphState(TypedDict):
+    input: str
+    result: str
+
+
+@dataclass
+class MyGraphContext:
+    """Schema for Runtime data"""
+    user_agent: str
+
+    docs_url: str = "https://docs.langchain.com/"
+    db_connection: str = DB_PATH
+    # Defaults to the shared pool of db_connection
+    db: Optional[ConnectionPool] = None
+
+    def __post_init__(self):
+        if self.db is None:
+            self.db = get_pool(self.db_connection)
+
+
+def pooled_node(state: GraphState, runtime: Runtime[MyGraphContext]) -> dict:
+    """Borrows a connection from the shared pool"""
+    with runtime.context.db.connection() as conn:
+        visits = conn.execute(
+            "SELECT visits FROM users WHERE user_agent = ?", (runtime.context.user_agent,)
+        ).fetchone()[0]
+    return {"result": f"Context accessed. {runtime.context.user_agent} has {visits} visits."}
+
+
+def connect_per_call_node(state: GraphState, runtime: Runtime[MyGraphContext]) -> dict:
+    """What nodes do with only a connection string: a new connection every time"""
+    conn = connect_sqlite(runtime.context.db_connection, CONNECT_LATENCY)
+    try:
+        visits = conn.execute(
+            "SELECT visits FROM users WHERE user_agent = ?", (runtime.context.user_agent,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return {"result": f"Context accessed. {runtime.context.user_agent} has {visits} visits."}
+
+
+def build_graph(node):
+    builder = StateGraph(GraphState, context_schema=MyGraphContext)
+    builder.add_node("context_node", node)
+    builder.add_edge(START, "context_node")
+    builder.add_edge("context_node", END)
+    return builder.compile()
+
+
+# --- 4. Benchmark ---
+def run_load(graph, context: MyGraphContext, concurrency: int) -> tuple[float, float]:
+    """Runs NUM_REQUESTS invocations on `concurrency` threads: (mean ms per request, requests/s)"""
+    def one_request(_):
+        start = time.perf_counter()
+        result = graph.invoke({"input": "Start Process"}, context=context)
+        assert "visits" in result["result"]
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one_request, range(NUM_REQUESTS)))
+    elapsed = time.perf_counter() - start
+    return sum(latencies) / NUM_REQUESTS * 1000, NUM_REQUESTS / elapsed
+
+
+if __name__ == "__main__":
+    setup_database()
+    graph = build_graph(pooled_node)
+
+    print("--- Two invocations share the process-wide pool ---")
+    for user_agent in ("Default-Run", "Override-Run"):
+        final_state = graph.invoke({"input": "Start Process"}, context={"user_agent": user_agent})
+        print(f"{final_state['result']}  pool: {get_pool().stats()}")
+
+    print("\n--- A broken connection is replaced by the health check ---")
+    conn = get_pool().acquire()
+    get_pool().release(conn)
+    conn.close()  # e.g. the server dropped it while it sat in the pool
+    print(graph.invoke({"input": "Start Process"}, context={"user_agent": "Default-Run"})["result"])
+    print(f"pool: {get_pool().stats()}")
+
+    # Another database gets a pool of its own
+    other_path = os.path.join(_DB_DIR, "other.sqlite")
+    setup_database(other_path)
+    other = MyGraphContext(user_agent="Default-Run", db_connection=other_path)
+    assert other.db is get_pool(other_path) and other.db is not get_pool()
+
+    print("\n--- A failed node's transaction is rolled back, not handed on ---")
+    try:
+        with get_pool().connection() as conn:
+            conn.execute("UPDATE users SET visits = visits + 100 WHERE user_agent = 'Default-Run'")
+            raise RuntimeError("node failed before commit")
+    except RuntimeError:
+        pass
+    with get_pool().connection() as conn:
+        assert not conn.in_transaction
+    print(graph.invoke({"input": "Start Process"}, context={"user_agent": "Default-Run"})["result"])
+
+    print("\n--- Limits and shutdown ---")
+    with ConnectionPool(lambda: connect_sqlite(DB_PATH), max_size=1, timeout=0.1) as small_pool:
+        held = small_pool.acquire()
+        try:
+            small_pool.acquire()
+        except PoolTimeout as e:
+            print(f"PoolTimeout: {e}")
+        small_pool.release(held)
+    try:
+        small_pool.acquire()
+    except PoolClosed as e:
+        print(f"PoolClosed: {e}  stats: {small_pool.stats()}")
+
+    print(f"\n--- Benchmark: {NUM_REQUESTS} requests ---")
+    print(f"{'handshake':>9} | {'threads':>7} | {'mode':>16} | {'ms/request':>10} | {'requests/s':>10} | "
+          f"{'connects':>8}")
+    for latency in (0.0, CONNECT_LATENCY):
+        CONNECT_LATENCY = latency  # read by connect_per_call_node
+        for concurrency in CONCURRENCY_LEVELS:
+            for mode, node in (("connect per call", connect_per_call_node), ("pooled", pooled_node)):
+                with ConnectionPool(lambda: connect_sqlite(DB_PATH, latency)) as pool:
+                    context = MyGraphContext(user_agent="Default-Run", db=pool)
+                    ms, throughput = run_load(build_graph(node), context, concurrency)
+                    connects = pool.connects if mode == "pooled" else NUM_REQUESTS
+                print(f"{latency * 1000:>6.0f} ms | {concurrency:>7} | {mode:>16} | {ms:>10.2f} | "
+                      f"{throughput:>10.0f} | {connects:>8}")
@@ -0,0 +1,232 @@
+"""
+A stream mode for the Command-routing graph of 11-command.py.
+
+That graph handles one `temperature` per `graph.invoke`: `check_temp_node`
+routes to `warn_user` when the reading is above 90 and to `success` otherwise.
+For a stream of millions of readings, invoking the graph once per reading
+spends almost all of its time in LangGraph for readings that only end in `success`.
+
+`process_stream` instead:
+    - reads the stream in NumPy batches of (sensor_id, temperature) readings, from
+        - a generator of tuples            (`generator_batches`)
+        - a memory-mapped binary file      (`binary_batches`, the READING dtype back to back)
+        - a memory-mapped CSV file         (`csv_batches`, "sensor_id,temperature" lines)
+    - computes the routing decision of `check_temp_node` for the whole batch at once
+    - invokes the graph only for the readings routed to `warn_user`, so the
+      warning side effect still goes through the graph
+
+`WARN_THRESHOLD` must match the check in `check_temp_node`; `check_routing`
+compares the two on random readings.
+"""
+import contextlib
+import importlib.util
+import itertools
+import mmap
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Same test as check_temp_node: `temp > 90` goes to warn_user
+WARN_THRESHOLD = 90
+# One reading: which sensor, and what it measured
+# (float64 like the Python floats the graph gets, so a reading is never rounded across the threshold)
+READING = np.dtype([("sensor_id", "<u4"), ("temperature", "<f8")])
+BATCH_SIZE = 65_536
+# About how many bytes of CSV are parsed at a time
+CSV_BATCH_BYTES = 1 << 20
+
+# Benchmark settings
+NUM_READINGS = 1_000_000
+# The per-reading invoke loop is slow, so it is timed on a sample
+NUM_LOOP_READINGS = 5_000
+NUM_SENSORS = 1_000
+
+
+def load_command_graph():
+    """The compiled graph of 11-command.py (loaded by path: the name starts with a digit)"""
+    spec = importlib.util.spec_from_file_location("tutorial_11_command", os.path.join(SCRIPTS_DIR, "11-command.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.graph
+
+
+# --- 1. Sources ---
+def generator_batches(readings: Iterable[Tuple[int, float]], batch_size: int = BATCH_SIZE) -> Iterator[np.ndarray]:
+    """Batches of READING from any iterable of (sensor_id, temperature)"""
+    readings = iter(readings)
+    while True:
+        batch = np.fromiter(itertools.islice(readings, batch_size), dtype=READING)
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+def binary_batches(path: str, batch_size: int = BATCH_SIZE) -> Iterator[np.ndarray]:
+    """Batches of READING from a file of packed READING records; the batches are views of the mapping"""
+    if os.path.getsize(path) == 0:
+        return
+    readings = np.memmap(path, dtype=READING, mode="r")
+    for start in range(0, len(readings), batch_size):
+        yield readings[start:start + batch_size]
+
+
+def csv_batches(path: str, batch_bytes: int = CSV_BATCH_BYTES) -> Iterator[np.ndarray]:
+    """
+    Batches of READING from a "sensor_id,temperature" CSV file with a header line.
+
+    Raises ValueError on a line that isn't two numbers.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = mm.find(b"\n") + 1  # skip the header
+            while 0 < start < len(mm):
+                # Cut each batch at the end of a line
+                end = mm.find(b"\n", start + batch_bytes)
+                end = len(mm) if end == -1 else end + 1
+                lines = mm[start:end].rstrip(b"\n")
+                num_lines = lines.count(b"\n") + 1
+                # Turning newlines into commas leaves one flat list of numbers to parse.
+                # fromstring stops quietly at the first thing it can't parse, so check the count.
+                values = np.fromstring(lines.replace(b"\n", b","), sep=",")
+                if values.size != 2 * num_lines:
+                    raise ValueError(f"{path}: malformed line between bytes {start} and {end}, "
+                                     f"expected {num_lines} 'sensor_id,temperature' lines")
+                values = values.reshape(-1, 2)
+                batch = np.empty(len(values), dtype=READING)
+                batch["sensor_id"] = values[:, 0]
+                batch["temperature"] = values[:, 1]
+                yield batch
+                start = end
+
+
+# --- 2. The stream mode ---
+@dataclass
+class StreamStats:
+    """What one run over a stream did"""
+    readings: int = 0
+    warnings: int = 0
+    seconds: float = 0.0
+    # Part of `seconds` spent invoking the graph for warnings
+    invoke_seconds: float = 0.0
+
+    @property
+    def readings_per_second(self) -> float:
+        return self.readings / self.seconds if self.seconds else 0.0
+
+
+def process_stream(graph, batches: Iterable[np.ndarray],
+                   on_warning: Optional[Callable[[int, dict], None]] = None) -> StreamStats:
+    """
+    Routes every reading, and invokes `graph` only for those that go to warn_user.
+    `on_warning(sensor_id, final_state)` is called with the result of each of those invocations.
+    """
+    stats = StreamStats()
+    start = time.perf_counter()
+    for batch in batches:
+        stats.readings += len(batch)
+        hot = np.flatnonzero(batch["temperature"] > WARN_THRESHOLD)
+        stats.warnings += len(hot)
+        invoke_start = time.perf_counter()
+        for sensor_id, temperature in batch[hot].tolist():
+            final_state = graph.invoke({"temperature": temperature})
+            if on_warning is not None:
+                on_warning(sensor_id, final_state)
+        stats.invoke_seconds += time.perf_counter() - invoke_start
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def invoke_each(graph, readings: Iterable[Tuple[int, float]]) -> StreamStats:
+    """The baseline: one graph.invoke per reading"""
+    stats = StreamStats()
+    start = time.perf_counter()
+    for _, temperature in readings:
+        final_state = graph.invoke({"temperature": temperature})
+        stats.readings += 1
+        stats.warnings += final_state.get("warning_sent", False)
+    stats.seconds = stats.invoke_seconds = time.perf_counter() - start
+    return stats
+
+
+def check_routing(graph, num_readings: int = 500):
+    """The vectorised routing must pick the same readings as check_temp_node"""
+    rng = np.random.default_rng(1)
+    temperatures = np.concatenate([[WARN_THRESHOLD, np.nextafter(WARN_THRESHOLD, 100), 90.000001],
+                                   rng.uniform(80, 100, num_readings)])
+    for temperature in temperatures.tolist():
+        routed_to_warn = graph.invoke({"temperature": temperature}).get("warning_sent", False)
+        assert routed_to_warn == (temperature > WARN_THRESHOLD), temperature
+
+
+# --- 3. Benchmark ---
+def make_readings(n: int, seed: int = 0) -> np.ndarray:
+    """Mostly normal temperatures, with about 0.6% above the threshold"""
+    rng = np.random.default_rng(seed)
+    readings = np.empty(n, dtype=READING)
+    readings["sensor_id"] = rng.integers(0, NUM_SENSORS, n)
+    readings["temperature"] = rng.normal(60, 12, n).round(1)
+    return readings
+
+
+def write_csv(path: str, readings: np.ndarray):
+    with open(path, "w") as f:
+        f.write("sensor_id,temperature\n")
+        np.savetxt(f, np.column_stack([readings["sensor_id"], readings["temperature"]]), fmt=["%d", "%.1f"],
+                   delimiter=",")
+
+
+if __name__ == "__main__":
+    graph = load_command_graph()
+    readings = make_readings(NUM_READINGS)
+    expected_warnings = int((readings["temperature"] > WARN_THRESHOLD).sum())
+
+    # The nodes print on every call; keep that out of the output (and in both timings)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+            tempfile.TemporaryDirectory() as tmp_dir:
+        check_routing(graph)
+
+        binary_path = os.path.join(tmp_dir, "readings.bin")
+        readings.tofile(binary_path)
+        csv_path = os.path.join(tmp_dir, "readings.csv")
+        write_csv(csv_path, readings)
+
+        # Readings keep their exact value, and a malformed CSV line is an error, not the end of the data
+        assert next(generator_batches([(1, 90.000001)]))["temperature"][0] > WARN_THRESHOLD
+        bad_csv_path = os.path.join(tmp_dir, "bad.csv")
+        with open(bad_csv_path, "w") as f:
+            f.write("sensor_id,temperature\n1,20.5\n2,oops\n3,95.0\n")
+        try:
+            list(csv_batches(bad_csv_path))
+            raise AssertionError("a malformed CSV line was skipped")
+        except ValueError:
+            pass
+
+        warned_sensors = []
+        results = {
+            "invoke per reading": invoke_each(graph, readings[:NUM_LOOP_READINGS].tolist()),
+            "stream: generator": process_stream(graph, generator_batches(map(tuple, readings.tolist()))),
+            "stream: binary mmap": process_stream(
+                graph, binary_batches(binary_path), lambda sensor_id, _: warned_sensors.append(sensor_id)
+            ),
+            "stream: CSV mmap": process_stream(graph, csv_batches(csv_path)),
+        }
+
+    assert warned_sensors == readings["sensor_id"][readings["temperature"] > WARN_THRESHOLD].tolist()
+    for name, stats in results.items():
+        if name.startswith("stream"):
+            assert (stats.readings, stats.warnings) == (NUM_READINGS, expected_warnings), name
+
+    print(f"--- {NUM_READINGS} readings, {expected_warnings} above {WARN_THRESHOLD} ---")
+    print(f"(per-reading loop timed on the first {NUM_LOOP_READINGS} readings)")
+    print(f"{'mode':>20} | {'readings':>9} | {'warnings':>8} | {'seconds':>7} | {'in invoke':>9} | "
+          f"{'readings/s':>11}")
+    for name, stats in results.items():
+        print(f"{name:>20} | {stats.readings:>9} | {stats.warnings:>8} | {stats.seconds:>7.2f} | "
+              f"{stats.invoke_seconds / stats.seconds:>9.0%} | {stats.readings_per_second:>11,.0f}")
@@ -0,0 +1,287 @@
+"""
+Running many inputs through a compiled graph at once.
+
+02-graph-api.py, 08-edges.py, 11-command.py and 12-retries.py all call
+`graph.invoke` with one input, one after another. `stream_batch` /
+`astream_batch` take an iterable of inputs for any compiled graph and run
+up to `max_concurrency` of them at the same time:
+    - on a thread pool with `graph.invoke` (`stream_batch`), or
+    - as asyncio tasks with `graph.ainvoke` (`astream_batch`)
+
+Both yield a `BatchResult` for each input as soon as it finishes. The result
+carries the input's position, so `run_batch` can return them in input order.
+An input that raises gets `error` set and the rest of the batch keeps going.
+The inputs are read lazily, so a generator of millions of inputs is fine.
+
+(`graph.batch_as_completed(inputs, {"max_concurrency": n}, return_exceptions=True)`
+does the same for a list of inputs on a thread pool.)
+
+Threads and tasks only help while nodes wait (I/O). CPU-bound nodes hold the
+GIL and do not speed up. The benchmark shows both: throughput vs concurrency
+for a weather graph with a simulated API latency in `fetch_weather`, and for
+a graph whose node is pure Python computation.
+"""
+import asyncio
+import contextlib
+import hashlib
+import importlib.util
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, TypedDict
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, START, END
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Benchmark settings
+CONCURRENCY_LEVELS = (1, 2, 4, 8, 16, 32, 64)
+NUM_IO_ITEMS = 256
+NUM_CPU_ITEMS = 64
+# Simulated latency of the weather API (seconds)
+FETCH_LATENCY = 0.02
+# Rounds of hashing per CPU-bound item
+CPU_ROUNDS = 20_000
+# Each point is the best of this many runs
+NUM_REPEATS = 3
+
+
+# --- 1. The batch runner ---
+@dataclass
+class BatchResult:
+    """The outcome of one input: its output, or the exception it raised"""
+    index: int
+    input: Any
+    output: Any = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _invoke_one(graph, index: int, item, invoke_kwargs: dict) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        output = graph.invoke(item, **invoke_kwargs)
+        return BatchResult(index, item, output=output, seconds=time.perf_counter() - start)
+    except Exception as e:
+        return BatchResult(index, item, error=e, seconds=time.perf_counter() - start)
+
+
+async def _ainvoke_one(graph, index: int, item, invoke_kwargs: dict) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        output = await graph.ainvoke(item, **invoke_kwargs)
+        return BatchResult(index, item, output=output, seconds=time.perf_counter() - start)
+    except Exception as e:
+        return BatchResult(index, item, error=e, seconds=time.perf_counter() - start)
+
+
+def stream_batch(graph, inputs: Iterable, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 **invoke_kwargs) -> Iterator[BatchResult]:
+    """
+    Runs `graph.invoke(item, **invoke_kwargs)` for every input on a pool of
+    `max_concurrency` threads, and yields the results in completion order.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    pending = set()
+    try:
+        for index, item in enumerate(inputs):
+            # Keep a few inputs queued so no worker waits for the consumer
+            if len(pending) >= 2 * max_concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(_invoke_one, graph, index, item, invoke_kwargs))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        # The consumer stopped early: drop the queued inputs instead of waiting for them.
+        # Invocations already running can't be interrupted; they finish in the background.
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def astream_batch(graph, inputs: Iterable, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                        **invoke_kwargs) -> AsyncIterator[BatchResult]:
+    """Same as `stream_batch`, with up to `max_concurrency` `graph.ainvoke` tasks on the running event loop"""
+    pending = set()
+    try:
+        for index, item in enumerate(inputs):
+            if len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.create_task(_ainvoke_one(graph, index, item, invoke_kwargs)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # The consumer stopped early
+        for task in pending:
+            task.cancel()
+
+
+def run_batch(graph, inputs: Iterable, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, mode: str = "threads",
+              **invoke_kwargs) -> List[BatchResult]:
+    """Runs the whole batch ("threads" or "async") and returns the results in input order"""
+    if mode == "threads":
+        results = list(stream_batch(graph, inputs, max_concurrency, **invoke_kwargs))
+    elif mode == "async":
+        async def collect():
+            return [r async for r in astream_batch(graph, inputs, max_concurrency, **invoke_kwargs)]
+        results = asyncio.run(collect())
+    else:
+        raise ValueError(f"unknown mode: {mode!r}")
+    return sorted(results, key=lambda r: r.index)
+
+
+# --- 2. Benchmark graphs ---
+class WeatherState(TypedDict):
+    city: str
+    temperature: float
+    conditions: str
+
+
+class APIError(Exception):
+    """Simulated API Error"""
+    pass
+
+
+def _weather_for(city: str) -> dict:
+    if city.startswith("Atlantis"):
+        raise APIError(f"Weather API has no data for {city}")
+    # The same city always gets the same weather
+    digest = hashlib.sha256(city.encode()).digest()
+    return {
+        "temperature": round(15 + digest[0] / 255 * 15, 1),
+        "conditions": ["Sunny", "Cloudy", "Rainy", "Partly Cloudy"][digest[1] % 4],
+    }
+
+
+def fetch_weather(state: WeatherState) -> dict:
+    """12-retries.py's fetch_weather, with a fixed API latency and no random failures"""
+    time.sleep(FETCH_LATENCY)
+    return _weather_for(state["city"])
+
+
+async def afetch_weather(state: WeatherState) -> dict:
+    await asyncio.sleep(FETCH_LATENCY)
+    return _weather_for(state["city"])
+
+
+def format_result(state: WeatherState) -> dict:
+    return {"conditions": f"{state['conditions']}, {state['temperature']} degrees"}
+
+
+def build_weather_graph():
+    """I/O-bound: fetch_weather (sync for invoke, async for ainvoke) -> format_result"""
+    builder = StateGraph(WeatherState)
+    builder.add_node("fetch_weather", RunnableLambda(fetch_weather, afunc=afetch_weather))
+    builder.add_node("format_result", format_result)
+    builder.add_edge(START, "fetch_weather")
+    builder.add_edge("fetch_weather", "format_result")
+    builder.add_edge("format_result", END)
+    return builder.compile()
+
+
+class ScoreState(TypedDict):
+    text: str
+    score: int
+
+
+def score_text(state: ScoreState) -> dict:
+    """CPU-bound: repeated hashing in a Python loop"""
+    digest = state["text"].encode()
+    for _ in range(CPU_ROUNDS):
+        digest = hashlib.blake2b(digest, digest_size=16).digest()
+    return {"score": digest[0]}
+
+
+async def ascore_text(state: ScoreState) -> dict:
+    return score_text(state)
+
+
+def build_score_graph():
+    builder = StateGraph(ScoreState)
+    builder.add_node("score_text", RunnableLambda(score_text, afunc=ascore_text))
+    builder.add_edge(START, "score_text")
+    builder.add_edge("score_text", END)
+    return builder.compile()
+
+
+def load_runner():
+    """32-graph-runner.py, for its registry of the tutorial graphs"""
+    spec = importlib.util.spec_from_file_location("graph_runner", os.path.join(SCRIPTS_DIR, "32-graph-runner.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def throughput(graph, inputs: list, max_concurrency: int, mode: str) -> float:
+    """Inputs per second for the whole batch, best of NUM_REPEATS runs"""
+    best = float("inf")
+    for _ in range(NUM_REPEATS):
+        start = time.perf_counter()
+        results = run_batch(graph, inputs, max_concurrency, mode)
+        best = min(best, time.perf_counter() - start)
+        assert [r.index for r in results] == list(range(len(inputs))) and all(r.ok for r in results)
+    return len(inputs) / best
+
+
+if __name__ == "__main__":
+    runner = load_runner()
+
+    print("--- The tutorial graphs, in batches ---")
+    # Their nodes print; that would interleave between threads
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        edges = run_batch(runner.get_graph("08-edges"), [{"input": f"Hello, {word}."} for word in
+                                                         ("go_to_c to continue", "stop here", "go_to_c again")])
+        commands = run_batch(runner.get_graph("11-command"), [{"temperature": t} for t in (100, 40, 95, 70)])
+        # 12-retries fails 70% of the time and retries with backoff: some cities run out of attempts
+        retries = run_batch(runner.get_graph("12-retries"),
+                            [{"city": city, "temperature": 0.0, "conditions": ""}
+                             for city in ("San Francisco", "Paris", "Tokyo", "Lagos", "Lima", "Oslo")])
+    print("08-edges:   ", [r.output["execution_path"] for r in edges])
+    print("11-command: ", [(r.input["temperature"], r.output["final_action_performed"]) for r in commands])
+    print("12-retries: ", [(r.input["city"], r.output["conditions"] if r.ok else type(r.error).__name__)
+                           for r in retries])
+
+    print("\n--- Results stream back as they complete; errors don't stop the batch ---")
+    weather_graph = build_weather_graph()
+    cities = ["Paris", "Atlantis", "Tokyo", "Lima", "Atlantis-2", "Oslo"]
+    for r in stream_batch(weather_graph, ({"city": city} for city in cities), max_concurrency=3):
+        print(f"#{r.index} {r.input['city']:<10} -> {r.output['conditions'] if r.ok else repr(r.error)}")
+
+    # Stopping early doesn't wait for the inputs still queued
+    slow_graph = RunnableLambda(lambda state: time.sleep(0.5) or state)
+    results = stream_batch(slow_graph, ({"n": i} for i in range(100)), max_concurrency=2)
+    assert next(results).ok
+    start = time.perf_counter()
+    results.close()
+    assert time.perf_counter() - start < 0.25, "stream_batch waited for the queued inputs"
+
+    print(f"\n--- Throughput (inputs/s) vs concurrency, {os.cpu_count()} CPU(s) ---")
+    io_inputs = [{"city": f"City {i}"} for i in range(NUM_IO_ITEMS)]
+    cpu_inputs = [{"text": f"Document {i}"} for i in range(NUM_CPU_ITEMS)]
+    score_graph = build_score_graph()
+    print(f"{'concurrency':>11} | {'I/O threads':>11} | {'I/O async':>9} | {'CPU threads':>11} | {'CPU async':>9}")
+    for level in CONCURRENCY_LEVELS:
+        row = [
+            throughput(weather_graph, io_inputs, level, "threads"),
+            throughput(weather_graph, io_inputs, level, "async"),
+            throughput(score_graph, cpu_inputs, level, "threads"),
+            throughput(score_graph, cpu_inputs, level, "async"),
+        ]
+        print(f"{level:>11} | {row[0]:>11.1f} | {row[1]:>9.1f} | {row[2]:>11.1f} | {row[3]:>9.1f}")
+    print(f"(I/O: {FETCH_LATENCY * 1000:.0f} ms per fetch, so one at a time gives at most "
+          f"{1 / FETCH_LATENCY:.0f} inputs/s)")
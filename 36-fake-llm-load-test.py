@@ -0,0 +1,505 @@
+"""
+Load-testing the LLM graphs offline, with a deterministic fake chat model.
+
+05-add_messages.py and every example in workflows.md call `ChatOpenAI` / `llm`,
+so they cannot be load-tested without network access (and a bill).
+
+`LoadTestChatModel` is a fake chat model that behaves like a real one under load:
+    - latency: time to first token from a log-normal distribution (median,
+      sigma), then `tokens_per_second` for the rest of the reply
+    - a `failure_rate` of calls raise FakeLLMError (after the first-token wait)
+    - `bind_tools(...)` works: it calls one of the bound tools with arguments
+      generated from the tool's schema, and answers in text once it has a
+      ToolMessage back (so agent loops end)
+    - `with_structured_output(Schema)` works, through the same tool calling
+      (Literal / enum fields get one of their allowed values)
+    - `stream` yields one chunk per token
+It is deterministic: the reply, its latency and whether it fails depend only
+on `seed`, the input, and how many times that same input was sent before (so
+retries of a failed call can succeed). Those counts are kept for the
+`max_tracked_inputs` most recent inputs; `reset()` forgets them, so the same
+inputs get the same replies again.
+
+`fake_chat_openai(llm)` makes `from langchain_openai import ChatOpenAI` return
+the fake, so unmodified scripts like 05-add_messages.py can be loaded with it.
+The workflows.md graphs are built here from an `llm` argument.
+
+`load_test(name, graph, make_input, sessions, duration)` runs `sessions` concurrent
+sessions that invoke the graph back to back for `duration` seconds, and reports
+p50/p95/p99 latency, throughput and error rate.
+
+    python 36-fake-llm-load-test.py --sessions 32 --duration 10 --failure-rate 0.01
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import types
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, TypedDict
+from pydantic import BaseModel, Field, PrivateAttr
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.graph import StateGraph, START, END, MessagesState
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WORDS = ("the", "a", "cat", "model", "graph", "joke", "blue", "node", "state", "quick", "answer", "why",
+         "because", "token", "river", "light", "runs", "finds", "every", "small")
+
+# Defaults of the command line
+NUM_SESSIONS = 32
+DURATION = 10.0
+
+
+class FakeLLMError(Exception):
+    """Simulated provider error (rate limit, timeout, 5xx...)"""
+    pass
+
+
+# --- 1. The fake model ---
+def fake_value(schema: dict, rng: random.Random) -> Any:
+    """A value that matches a JSON schema (the subset used by tool and pydantic schemas)"""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"] or schema["anyOf"]
+        return fake_value(options[0], rng)
+    kind = schema.get("type", "string")
+    if kind == "object":
+        return {name: fake_value(sub, rng) for name, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [fake_value(schema.get("items", {}), rng) for _ in range(rng.randint(1, 3))]
+    if kind == "integer":
+        return rng.randint(1, 100)
+    if kind == "number":
+        return round(rng.uniform(0, 100), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+
+
+class LoadTestChatModel(BaseChatModel):
+    """Deterministic fake chat model with realistic latency, failures, tool calls and structured output"""
+    seed: int = 0
+    # Time to first token: log-normal with this median (seconds) and sigma
+    latency_median: float = 0.3
+    latency_sigma: float = 0.5
+    tokens_per_second: float = 50.0
+    # Reply length in tokens (uniform between the two)
+    min_tokens: int = 5
+    max_tokens: int = 30
+    failure_rate: float = 0.0
+    # Number of calls made so far, failed ones included
+    calls: int = 0
+    # Inputs whose attempt count is remembered (least recently sent are forgotten first)
+    max_tracked_inputs: int = 100_000
+
+    # How many times each input was seen, so a retried call gets a fresh draw
+    _attempts: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def reset(self):
+        """Forgets the attempt counts and the call count"""
+        with self._lock:
+            self._attempts.clear()
+            self.calls = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "load-test-fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"seed": self.seed}
+
+    def bind_tools(self, tools: Sequence, *, tool_choice: Optional[str] = None, **kwargs):
+        formatted = [convert_to_openai_tool(t) for t in tools]
+        return self.bind(tools=formatted, tool_choice=tool_choice, **kwargs)
+
+    def _plan(self, messages, tools=None, tool_choice=None):
+        """Decides the reply, the first-token delay and the per-token delay of one call"""
+        payload = json.dumps([[m.type, m.content] for m in messages] + [[t["function"]["name"] for t in tools or []]],
+                             default=str)
+        key = hashlib.sha256(f"{self.seed}:{payload}".encode()).hexdigest()
+        with self._lock:
+            attempt = self._attempts.pop(key, 0)
+            self._attempts[key] = attempt + 1
+            if len(self._attempts) > self.max_tracked_inputs:
+                self._attempts.popitem(last=False)
+            self.calls += 1
+        rng = random.Random(f"{key}:{attempt}")
+
+        first_token = rng.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+        token_delay = 1 / self.tokens_per_second
+        if rng.random() < self.failure_rate:
+            return FakeLLMError("simulated provider error"), first_token, token_delay
+
+        forced = tool_choice not in (None, "auto", "none")
+        answered = bool(messages) and isinstance(messages[-1], ToolMessage)
+        if tools and (forced or not answered):
+            if forced and tool_choice not in ("any", "required"):
+                name = tool_choice["function"]["name"] if isinstance(tool_choice, dict) else tool_choice
+                chosen = next(t for t in tools if t["function"]["name"] == name)
+            else:
+                chosen = rng.choice(tools)
+            args = fake_value(chosen["function"]["parameters"], rng)
+            tool_call = {"name": chosen["function"]["name"], "args": args,
+                         "id": f"call_{uuid.UUID(int=rng.getrandbits(128)).hex}", "type": "tool_call"}
+            return AIMessage(content="", tool_calls=[tool_call]), first_token, token_delay
+
+        tokens = [rng.choice(WORDS) for _ in range(rng.randint(self.min_tokens, self.max_tokens))]
+        text = " ".join(tokens).capitalize() + rng.choice(("!", "?", "."))
+        return AIMessage(content=text), first_token, token_delay
+
+    @staticmethod
+    def _num_tokens(message: AIMessage) -> int:
+        if message.tool_calls:
+            return len(json.dumps(message.tool_calls[0]["args"]).split())
+        return len(message.content.split())
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs):
+        reply, first_token, token_delay = self._plan(messages, tools, tool_choice)
+        if isinstance(reply, Exception):
+            time.sleep(first_token)
+            raise reply
+        time.sleep(first_token + self._num_tokens(reply) * token_delay)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs):
+        reply, first_token, token_delay = self._plan(messages, tools, tool_choice)
+        if isinstance(reply, Exception):
+            await asyncio.sleep(first_token)
+            raise reply
+        await asyncio.sleep(first_token + self._num_tokens(reply) * token_delay)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _stream(self, messages, stop=None, run_manager=None, tools=None, tool_choice=None, **kwargs):
+        reply, first_token, token_delay = self._plan(messages, tools, tool_choice)
+        time.sleep(first_token)
+        if isinstance(reply, Exception):
+            raise reply
+        if reply.tool_calls:
+            time.sleep(self._num_tokens(reply) * token_delay)
+            chunks = [AIMessageChunk(content="", tool_call_chunks=[
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                for i, c in enumerate(reply.tool_calls)
+            ])]
+        else:
+            words = reply.content.split(" ")
+            chunks = [AIMessageChunk(content=word if i == 0 else " " + word) for i, word in enumerate(words)]
+        for i, message_chunk in enumerate(chunks):
+            if i:
+                time.sleep(token_delay)
+            chunk = ChatGenerationChunk(message=message_chunk)
+            if run_manager:
+                run_manager.on_llm_new_token(message_chunk.content, chunk=chunk)
+            yield chunk
+
+
+@contextlib.contextmanager
+def fake_chat_openai(llm):
+    """While active, `from langchain_openai import ChatOpenAI` gives a factory that returns `llm`"""
+    fake_module = types.ModuleType("langchain_openai")
+    fake_module.ChatOpenAI = lambda *args, **kwargs: llm
+    previous = sys.modules.get("langchain_openai")
+    sys.modules["langchain_openai"] = fake_module
+    try:
+        yield
+    finally:
+        if previous is None:
+            del sys.modules["langchain_openai"]
+        else:
+            sys.modules["langchain_openai"] = previous
+
+
+def load_script_with_llm(script: str, llm):
+    """Imports a tutorial script by file name, with ChatOpenAI replaced by `llm`"""
+    module_name = "fake_llm_" + script.removesuffix(".py").replace("-", "_")
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, script))
+    module = importlib.util.module_from_spec(spec)
+    with fake_chat_openai(llm):
+        spec.loader.exec_module(module)
+    return module
+
+
+# --- 2. The workflows.md graphs, built around a given llm ---
+class JokeState(TypedDict):
+    topic: str
+    joke: str
+    improved_joke: str
+    final_joke: str
+
+
+def build_prompt_chain(llm):
+    """Prompt chaining: generate_joke -> check_punchline -> improve_joke -> polish_joke"""
+    def generate_joke(state: JokeState):
+        msg = llm.invoke(f"Write a short joke about {state['topic']}")
+        return {"joke": msg.content}
+
+    def check_punchline(state: JokeState):
+        if "?" in state["joke"] or "!" in state["joke"]:
+            return "Pass"
+        return "Fail"
+
+    def improve_joke(state: JokeState):
+        msg = llm.invoke(f"Make this joke funnier by adding wordplay: {state['joke']}")
+        return {"improved_joke": msg.content}
+
+    def polish_joke(state: JokeState):
+        msg = llm.invoke(f"Add a surprising twist to this joke: {state['improved_joke']}")
+        return {"final_joke": msg.content}
+
+    workflow = StateGraph(JokeState)
+    workflow.add_node("generate_joke", generate_joke)
+    workflow.add_node("improve_joke", improve_joke)
+    workflow.add_node("polish_joke", polish_joke)
+    workflow.add_edge(START, "generate_joke")
+    workflow.add_conditional_edges("generate_joke", check_punchline, {"Fail": "improve_joke", "Pass": END})
+    workflow.add_edge("improve_joke", "polish_joke")
+    workflow.add_edge("polish_joke", END)
+    return workflow.compile()
+
+
+class Route(BaseModel):
+    step: Literal["poem", "story", "joke"] = Field(None, description="The next step in the routing process")
+
+
+class RouterState(TypedDict):
+    input: str
+    decision: str
+    output: str
+
+
+def build_router(llm):
+    """Routing: a structured-output call picks story / joke / poem"""
+    router = llm.with_structured_output(Route)
+
+    def llm_call_router(state: RouterState):
+        decision = router.invoke([
+            SystemMessage(content="Route the input to story, joke, or poem based on the user's request."),
+            HumanMessage(content=state["input"]),
+        ])
+        return {"decision": decision.step}
+
+    def write(state: RouterState):
+        return {"output": llm.invoke(state["input"]).content}
+
+    router_builder = StateGraph(RouterState)
+    router_builder.add_node("llm_call_router", llm_call_router)
+    for step in ("story", "joke", "poem"):
+        router_builder.add_node(step, write)
+        router_builder.add_edge(step, END)
+    router_builder.add_edge(START, "llm_call_router")
+    router_builder.add_conditional_edges("llm_call_router", lambda state: state["decision"])
+    return router_builder.compile()
+
+
+@tool
+def multiply(a: int, b: int) -> int:
+    """Multiply a and b."""
+    return a * b
+
+
+@tool
+def add(a: int, b: int) -> int:
+    """Adds a and b."""
+    return a + b
+
+
+@tool
+def divide(a: int, b: int) -> float:
+    """Divide a and b."""
+    return a / b
+
+
+def build_agent(llm):
+    """Agent: the LLM calls arithmetic tools in a loop until it answers in text"""
+    tools = [add, multiply, divide]
+    tools_by_name = {t.name: t for t in tools}
+    llm_with_tools = llm.bind_tools(tools)
+
+    def llm_call(state: MessagesState):
+        system = SystemMessage(
+            content="You are a helpful assistant tasked with performing arithmetic on a set of inputs."
+        )
+        return {"messages": [llm_with_tools.invoke([system] + state["messages"])]}
+
+    def tool_node(state: dict):
+        result = []
+        for tool_call in state["messages"][-1].tool_calls:
+            observation = tools_by_name[tool_call["name"]].invoke(tool_call["args"])
+            result.append(ToolMessage(content=observation, tool_call_id=tool_call["id"]))
+        return {"messages": result}
+
+    def should_continue(state: MessagesState):
+        return "Action" if state["messages"][-1].tool_calls else END
+
+    agent_builder = StateGraph(MessagesState)
+    agent_builder.add_node("llm_call", llm_call)
+    agent_builder.add_node("environment", tool_node)
+    agent_builder.add_edge(START, "llm_call")
+    agent_builder.add_conditional_edges("llm_call", should_continue, {"Action": "environment", END: END})
+    agent_builder.add_edge("environment", "llm_call")
+    return agent_builder.compile()
+
+
+@dataclass
+class LoadTarget:
+    """A graph to load-test, and the input of turn `turn` of session `session`"""
+    build: Callable[[Any], Any]
+    make_input: Callable[[int, int], dict]
+
+
+TARGETS: Dict[str, LoadTarget] = {
+    "05-add_messages": LoadTarget(
+        lambda llm: load_script_with_llm("05-add_messages.py", llm).agent,
+        lambda session, turn: {"messages": [HumanMessage(content=f"Hello there! I am user {session}, turn {turn}")]},
+    ),
+    "prompt-chaining": LoadTarget(build_prompt_chain, lambda session, turn: {"topic": f"topic {session}-{turn}"}),
+    "routing": LoadTarget(build_router, lambda session, turn: {"input": f"Write me something, {session}-{turn}"}),
+    "agent": LoadTarget(
+        build_agent, lambda session, turn: {"messages": [HumanMessage(content=f"Add {session} and {turn}.")]}
+    ),
+}
+
+
+# --- 3. The load-test driver ---
+@dataclass
+class LoadTestReport:
+    """Latencies (seconds) of the requests that succeeded, and the error count"""
+    name: str
+    sessions: int
+    seconds: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.errors.values()) / self.requests if self.requests else 0.0
+
+    def percentile(self, p: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else float("nan")
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+
+def load_test(name: str, graph, make_input: Callable[[int, int], dict], sessions: int = NUM_SESSIONS,
+              duration: float = DURATION, **invoke_kwargs) -> LoadTestReport:
+    """Runs `sessions` concurrent sessions that invoke `graph` back to back for `duration` seconds"""
+    deadline = time.monotonic() + duration
+
+    def run_session(session: int):
+        latencies, errors = [], Counter()
+        turn = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                graph.invoke(make_input(session, turn), **invoke_kwargs)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            turn += 1
+        return latencies, errors
+
+    report = LoadTestReport(name, sessions)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        for latencies, errors in executor.map(run_session, range(sessions)):
+            report.latencies += latencies
+            report.errors += errors
+    # Requests still running at the deadline are allowed to finish, and counted
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def check_model():
+    """The fake is deterministic, and its tool calls and structured output parse"""
+    llm = LoadTestChatModel(latency_median=0.001, tokens_per_second=1e6)
+    twin = LoadTestChatModel(latency_median=0.001, tokens_per_second=1e6)
+    assert llm.invoke("Tell me a joke").content == twin.invoke("Tell me a joke").content
+    assert "".join(chunk.content for chunk in twin.stream("Tell me a joke twice")) == \
+        llm.invoke("Tell me a joke twice").content
+    assert llm.with_structured_output(Route).invoke("Write a poem").step in ("poem", "story", "joke")
+    call = llm.bind_tools([add, multiply, divide]).invoke("What is 2 times 3?").tool_calls[0]
+    assert call["name"] in ("add", "multiply", "divide") and set(call["args"]) == {"a", "b"}
+    flaky = LoadTestChatModel(latency_median=0.001, tokens_per_second=1e6, failure_rate=0.5)
+    outcomes = set()
+    for _ in range(20):
+        try:
+            flaky.invoke("same input")
+            outcomes.add("ok")
+        except FakeLLMError:
+            outcomes.add("error")
+    assert outcomes == {"ok", "error"}, "retries of the same input should not all fail"
+    replies = [llm.invoke("Tell me a story").content for _ in range(3)]
+    llm.reset()
+    assert [llm.invoke("Tell me a story").content for _ in range(3)] == replies
+    small = LoadTestChatModel(latency_median=0.001, tokens_per_second=1e6, max_tracked_inputs=3)
+    for i in range(10):
+        small.invoke(f"input {i}")
+    assert len(small._attempts) == 3
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Load-test the LLM graphs with a fake chat model")
+    parser.add_argument("graphs", nargs="*", help=f"graphs to load-test (default: all of {', '.join(TARGETS)})")
+    parser.add_argument("--sessions", type=int, default=NUM_SESSIONS)
+    parser.add_argument("--duration", type=float, default=DURATION, help="seconds per graph")
+    parser.add_argument("--latency-median", type=float, default=0.3, help="median time to first token (s)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.graphs if name not in TARGETS]
+    if unknown:
+        parser.error(f"unknown graph(s): {', '.join(unknown)} (choose from {', '.join(TARGETS)})")
+
+    check_model()
+    print(f"{args.sessions} sessions x {args.duration:.0f}s, time to first token median {args.latency_median}s "
+          f"(sigma {args.latency_sigma}), {args.tokens_per_second:.0f} tokens/s, "
+          f"failure rate {args.failure_rate:.1%} per LLM call\n")
+    print(f"{'graph':<16} | {'requests':>8} | {'req/s':>6} | {'p50 s':>6} | {'p95 s':>6} | {'p99 s':>6} | "
+          f"{'errors':>6} | {'LLM calls':>9}")
+    for name in args.graphs or TARGETS:
+        llm = LoadTestChatModel(
+            seed=args.seed, latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+            tokens_per_second=args.tokens_per_second, failure_rate=args.failure_rate,
+        )
+        target = TARGETS[name]
+        report = load_test(name, target.build(llm), target.make_input, args.sessions, args.duration)
+        print(f"{name:<16} | {report.requests:>8} | {report.throughput:>6.1f} | {report.percentile(50):>6.2f} | "
+              f"{report.percentile(95):>6.2f} | {report.percentile(99):>6.2f} | {report.error_rate:>6.1%} | "
+              f"{llm.calls:>9}")
+
+
+if __name__ == "__main__":
+    main()
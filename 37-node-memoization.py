@@ -0,0 +1,230 @@
+"""
+Durable per-node memoization for the prompt-chaining workflow.
+
+In the prompt-chaining example of workflows.md, generate_joke -> check_punchline
+-> improve_joke -> polish_joke calls the LLM at every stage it reaches on every
+run, even for a topic (or an intermediate joke) that was already processed.
+
+Here each LLM node is added with a LangGraph `CachePolicy`:
+
+    workflow.add_node("improve_joke", improve_joke, cache_policy=cache_on("joke"))
+
+`cache_on(*fields, ttl=...)` keys the cache on the state fields the node reads,
+and nothing else. A node whose fields are unchanged returns its cached update
+without running. The stages downstream of it then see the same input and hit
+their own caches too. Only the stages after a changed field run again.
+
+The cache is given at compile time:
+    - `LRUCache(max_entries)`: in memory, evicts the least recently used entries
+    - LangGraph's `SqliteCache(path=...)`: a local file, so results survive restarts
+Both honour the policy's `ttl` (seconds).
+
+The key does not include the node's code or prompt: clear the cache (or use a
+new file) after changing them.
+"""
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Mapping, Optional, Sequence, TypedDict
+from langgraph.cache.base import BaseCache, FullKey, Namespace
+from langgraph.cache.sqlite import SqliteCache
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import CachePolicy
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Entries kept by the in-memory cache
+LRU_MAX_ENTRIES = 10_000
+# How long a cached LLM answer stays valid (seconds)
+CACHE_TTL = 24 * 60 * 60
+
+# Benchmark settings
+NUM_TOPICS = 20
+
+
+# --- 1. Declaring what a node reads ---
+def cache_on(*fields: str, ttl: Optional[int] = CACHE_TTL) -> CachePolicy:
+    """A cache policy keyed on `fields` of the node's input state only"""
+    def key_func(state) -> str:
+        return json.dumps([state.get(f) for f in fields], default=str)
+    return CachePolicy(key_func=key_func, ttl=ttl)
+
+
+# --- 2. An in-memory LRU cache ---
+class LRUCache(BaseCache):
+    """Keeps the `max_entries` most recently used entries, with per-entry TTL"""
+
+    def __init__(self, max_entries: int = LRU_MAX_ENTRIES, *, serde=None):
+        super().__init__(serde=serde)
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # (ns, key) -> (encoding, data, expiry)
+        self._lock = threading.Lock()
+
+    def get(self, keys: Sequence[FullKey]) -> dict:
+        now = time.time()
+        values = {}
+        with self._lock:
+            for full_key in keys:
+                entry = self._entries.get(full_key)
+                if entry is None:
+                    continue
+                encoding, data, expiry = entry
+                if expiry is not None and now >= expiry:
+                    del self._entries[full_key]
+                    continue
+                self._entries.move_to_end(full_key)
+                values[full_key] = self.serde.loads_typed((encoding, data))
+        return values
+
+    async def aget(self, keys: Sequence[FullKey]) -> dict:
+        return self.get(keys)
+
+    def set(self, pairs: Mapping[FullKey, tuple]) -> None:
+        now = time.time()
+        with self._lock:
+            for full_key, (value, ttl) in pairs.items():
+                expiry = now + ttl if ttl is not None else None
+                self._entries[full_key] = (*self.serde.dumps_typed(value), expiry)
+                self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def aset(self, pairs: Mapping[FullKey, tuple]) -> None:
+        self.set(pairs)
+
+    def clear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        with self._lock:
+            if namespaces is None:
+                self._entries.clear()
+                return
+            for full_key in [k for k in self._entries if k[0] in set(namespaces)]:
+                del self._entries[full_key]
+
+    async def aclear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        self.clear(namespaces)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# --- 3. The workflows.md prompt chain, with cached nodes ---
+class State(TypedDict):
+    topic: str
+    # Who the final twist is written for (read by polish_joke only)
+    audience: str
+    joke: str
+    improved_joke: str
+    final_joke: str
+
+
+def build_workflow(llm, cache: Optional[BaseCache] = None):
+    """The prompt chain; its LLM nodes are memoized when a cache is given"""
+    def generate_joke(state: State):
+        """First LLM call to generate initial joke"""
+        msg = llm.invoke(f"Write a short joke about {state['topic']}")
+        return {"joke": msg.content}
+
+    def check_punchline(state: State):
+        """Gate function to check if the joke has a punchline"""
+        if "?" in state["joke"] or "!" in state["joke"]:
+            return "Pass"
+        return "Fail"
+
+    def improve_joke(state: State):
+        """Second LLM call to improve the joke"""
+        msg = llm.invoke(f"Make this joke funnier by adding wordplay: {state['joke']}")
+        return {"improved_joke": msg.content}
+
+    def polish_joke(state: State):
+        """Third LLM call for final polish"""
+        msg = llm.invoke(f"Add a surprising twist for {state['audience']} to this joke: {state['improved_joke']}")
+        return {"final_joke": msg.content}
+
+    workflow = StateGraph(State)
+    workflow.add_node("generate_joke", generate_joke, cache_policy=cache_on("topic"))
+    workflow.add_node("improve_joke", improve_joke, cache_policy=cache_on("joke"))
+    workflow.add_node("polish_joke", polish_joke, cache_policy=cache_on("improved_joke", "audience"))
+
+    workflow.add_edge(START, "generate_joke")
+    workflow.add_conditional_edges("generate_joke", check_punchline, {"Fail": "improve_joke", "Pass": END})
+    workflow.add_edge("improve_joke", "polish_joke")
+    workflow.add_edge("polish_joke", END)
+    return workflow.compile(cache=cache)
+
+
+def load_fake_llm():
+    """The deterministic fake model of 36-fake-llm-load-test.py, with a short latency"""
+    spec = importlib.util.spec_from_file_location("fake_llm_load_test",
+                                                  os.path.join(SCRIPTS_DIR, "36-fake-llm-load-test.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Short replies and a short latency keep the benchmark quick
+    return module.LoadTestChatModel(latency_median=0.01, latency_sigma=0.2, tokens_per_second=5_000,
+                                    max_tokens=10)
+
+
+# --- 4. Benchmark ---
+def run_scenario(graph, llm, inputs: list) -> tuple[int, float, list]:
+    """
+    LLM calls, seconds and final states for one batch of inputs.
+
+    The model is reset first, so the same input always gets the same reply:
+    otherwise the fake gives a repeated input a fresh draw, and the no-cache
+    baseline would change between identical scenarios.
+    """
+    llm.reset()
+    start = time.perf_counter()
+    states = [graph.invoke(i) for i in inputs]
+    return llm.calls, time.perf_counter() - start, states
+
+
+if __name__ == "__main__":
+    topics = [f"topic {i}" for i in range(NUM_TOPICS)]
+    new_topics = [f"new topic {i}" for i in range(NUM_TOPICS // 2)]
+    scenarios = [
+        ("first run", [{"topic": t, "audience": "kids"} for t in topics]),
+        ("same inputs again", [{"topic": t, "audience": "kids"} for t in topics]),
+        ("half the topics new", [{"topic": t, "audience": "kids"} for t in topics[:NUM_TOPICS // 2] + new_topics]),
+        ("audience changed", [{"topic": t, "audience": "engineers"} for t in topics]),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_path = os.path.join(tmp_dir, "node-cache.sqlite")
+        setups = {
+            "no cache": (llm := load_fake_llm(), build_workflow(llm)),
+            "LRU": (llm := load_fake_llm(), build_workflow(llm, LRUCache())),
+            "SQLite": (llm := load_fake_llm(), build_workflow(llm, SqliteCache(path=cache_path))),
+        }
+
+        print(f"--- LLM calls for {NUM_TOPICS} jokes per scenario ---")
+        print(f"{'scenario':>20} | " + " | ".join(f"{name:>14}" for name in setups))
+        baseline_calls = []
+        for scenario, inputs in scenarios:
+            cells = []
+            for name, (llm, graph) in setups.items():
+                calls, seconds, _ = run_scenario(graph, llm, inputs)
+                cells.append(f"{calls:>4} ({seconds:>5.2f}s)")
+                if name == "no cache":
+                    baseline_calls.append(calls)
+            print(f"{scenario:>20} | " + " | ".join(f"{cell:>14}" for cell in cells))
+        # Identical inputs cost the same without a cache
+        assert baseline_calls[0] == baseline_calls[1]
+
+        # The SQLite cache outlives the process: a new graph on the same file runs nothing
+        llm = load_fake_llm()
+        restarted = build_workflow(llm, SqliteCache(path=cache_path))
+        calls, seconds, states = run_scenario(restarted, llm, scenarios[0][1])
+        print(f"\nSQLite cache after a restart, first run again: {calls} LLM calls ({seconds:.2f}s)")
+        _, _, expected = run_scenario(setups["SQLite"][1], setups["SQLite"][0], scenarios[0][1])
+        assert states == expected
+
+        # A small LRU only keeps the most recent entries
+        llm = load_fake_llm()
+        small = build_workflow(llm, LRUCache(max_entries=10))
+        run_scenario(small, llm, scenarios[0][1])
+        calls, _, _ = run_scenario(small, llm, scenarios[0][1])
+        print(f"LRU with 10 entries, same inputs again: {calls} LLM calls")